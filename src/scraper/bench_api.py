@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+
+from course_api import CourseService, serve
+from course_store import add_store_arguments, store_from_args
+
+# Load test for course_api.py: starts the service in-process and has
+# concurrent advisors (keep-alive connections) send eligibility and
+# unlocked-course queries for a pool of transcripts, which repeat the way an
+# advisor re-checks a plan while editing it. Reports throughput, latency
+# percentiles and the transcript cache's hit rate.
+#
+#   python bench_api.py --clients 16 --requests 500 --transcripts 200
+
+parser = argparse.ArgumentParser(description="Load-test the course API with concurrent clients")
+parser.add_argument('--clients', type=int, default=16, help="concurrent connections (default %(default)s)")
+parser.add_argument('--requests', type=int, default=500, help="requests per client (default %(default)s)")
+parser.add_argument('--transcripts', type=int, default=200, help="distinct transcripts queried (default %(default)s)")
+parser.add_argument('--port', type=int, default=8799, help="port for the service (default %(default)s)")
+parser.add_argument('--seed', type=int, default=0, help="random seed (default %(default)s)")
+add_store_arguments(parser)
+args = parser.parse_args()
+
+with store_from_args(args) as store:
+    service = CourseService.from_store(store)
+codes = sorted(service.courses)
+rng = random.Random(args.seed)
+transcripts = [{"completed": rng.sample(codes, rng.randrange(1, 30))} for _ in range(args.transcripts)]
+
+loop = asyncio.new_event_loop()
+threading.Thread(target=loop.run_until_complete, args=(serve(service, port=args.port),), daemon=True).start()
+time.sleep(0.5)
+
+
+def advisor(seed):
+    client_rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", args.port)
+    latencies = []
+    for _ in range(args.requests):
+        transcript = client_rng.choice(transcripts)
+        if client_rng.random() < 0.5:
+            path, body = "/eligibility", {"transcript": transcript, "courses": client_rng.sample(codes, 5)}
+        else:
+            path, body = "/unlocked", {"transcript": transcript}
+        start = time.perf_counter()
+        connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        assert response.status == 200
+    connection.close()
+    return latencies
+
+
+start = time.perf_counter()
+with ThreadPoolExecutor(max_workers=args.clients) as pool:
+    latencies = sorted(latency for result in pool.map(advisor, range(args.clients)) for latency in result)
+elapsed = time.perf_counter() - start
+
+cache = service.stats()['cache']
+print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+print(f"latency ms: p50 {statistics.median(latencies) * 1000:.2f}, "
+      f"p90 {latencies[int(0.9 * len(latencies))] * 1000:.2f}, p99 {latencies[int(0.99 * len(latencies))] * 1000:.2f}")
+print(f"transcript cache: {cache['hits']} hits, {cache['misses']} misses")
@@ -0,0 +1,51 @@
+import argparse
+import contextlib
+import io
+import time
+
+from http_client import AdaptiveRateLimiter, HttpClient
+from prerequisites import fetch_all_prerequisites
+from standin_server import StandInCatalog
+
+# Runs the prerequisite fetch stage against a local stand-in catalog that
+# injects throttling, server errors, slow responses and a capacity limit,
+# and checks that every lookup still succeeds through the shared HTTP client.
+#
+#   python bench_client.py --courses 60 --rate 50 --concurrency 8
+
+parser = argparse.ArgumentParser(description="Exercise the HTTP client against a misbehaving stand-in catalog")
+parser.add_argument('--courses', type=int, default=60, help="number of synthetic courses (default %(default)s)")
+parser.add_argument('--concurrency', type=int, default=8, help="lookups in flight (default %(default)s)")
+parser.add_argument('--rate', type=float, default=50, help="client's maximum requests per second (default %(default)s)")
+parser.add_argument('--timeout', type=float, default=0.5, help="client's request timeout (default %(default)s)")
+args = parser.parse_args()
+
+codes = [f"CSCE {100 + n}" for n in range(args.courses)]
+pages = {
+    f"/search/?P={code}": f"<html><body><p>Prerequisites: Grade of C or better in MATH {n}.</p></body></html>"
+    for n, code in enumerate(codes)
+}
+
+SCENARIOS = [
+    ("healthy", {}),
+    ("10% 429 + Retry-After", {"throttle_rate": 0.1, "retry_after": 1}),
+    ("10% 503", {"error_rate": 0.1}),
+    ("10% slow (0.3s)", {"slow_rate": 0.1, "slow_latency": 0.3}),
+    ("5% timeouts", {"slow_rate": 0.05, "slow_latency": args.timeout * 3}),
+    ("capacity 20/s", {"capacity": 20, "retry_after": None}),
+]
+
+print(f"{'scenario':24}{'seconds':>8}{'requests':>9}{'retried':>8}{'failed':>7}{'end rate':>9}  faults")
+for name, faults in SCENARIOS:
+    client = HttpClient(AdaptiveRateLimiter(args.rate), timeout=args.timeout)
+    with StandInCatalog(pages, latency=0.02, **faults) as catalog:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # silence per-course progress lines
+            prereqs = fetch_all_prerequisites(codes, concurrency=args.concurrency, catalog_url=catalog.url,
+                                              client=client)
+        elapsed = time.perf_counter() - start
+    failed = len(codes) - len(prereqs)
+    assert all(prereqs.values())
+    injected = ', '.join(f"{count} {fault}" for fault, count in catalog.faults.items() if count)
+    print(f"{name:24}{elapsed:>8.2f}{client.requests:>9}{client.retried:>8}{failed:>7}"
+          f"{client.limiter.rate:>9.1f}  {injected or '-'}")
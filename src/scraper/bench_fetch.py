@@ -0,0 +1,37 @@
+import argparse
+import contextlib
+import io
+import time
+
+from prerequisites import fetch_all_prerequisites
+from standin_server import StandInCatalog
+
+# Times the concurrent prerequisite fetch stage against a local stand-in catalog
+# with a fixed per-request latency, for a range of concurrency settings.
+#
+#   python bench_fetch.py --courses 40 --latency 0.1 --concurrency 1 2 4 8
+
+parser = argparse.ArgumentParser(description="Benchmark concurrent prerequisite fetching against a stand-in catalog")
+parser.add_argument('--courses', type=int, default=40, help="number of synthetic courses (default %(default)s)")
+parser.add_argument('--latency', type=float, default=0.1, help="stand-in server latency in seconds (default %(default)s)")
+parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8], help="concurrency settings to time")
+parser.add_argument('--rate', type=float, default=0, help="requests per second limit, 0 for unlimited (default %(default)s)")
+args = parser.parse_args()
+
+codes = [f"CSCE {100 + n}" for n in range(args.courses)]
+pages = {
+    f"/search/?P={code}": f"<html><body><p>Prerequisites: Grade of C or better in MATH {n}.</p></body></html>"
+    for n, code in enumerate(codes)
+}
+
+with StandInCatalog(pages, latency=args.latency) as catalog:
+    baseline = None
+    print(f"{'concurrency':>11}  {'seconds':>8}  {'speedup':>7}")
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # silence per-course progress lines
+            prereqs = fetch_all_prerequisites(codes, concurrency=concurrency, rate=args.rate, catalog_url=catalog.url)
+        elapsed = time.perf_counter() - start
+        assert list(prereqs) == codes and all(prereqs.values())
+        baseline = baseline or elapsed
+        print(f"{concurrency:>11}  {elapsed:>8.2f}  {baseline / elapsed:>6.1f}x")
@@ -0,0 +1,62 @@
+from bs4 import BeautifulSoup
+from urllib.parse import unquote
+import argparse
+import time
+import tracemalloc
+
+from course_blocks import extract_course_requisites, extract_prerequisites, requisite_text
+from http_cache import DEFAULT_CACHE_DIR, HttpCache
+
+# Compares per-course prerequisite parsing on saved catalog search pages:
+#   before - whole-page BeautifulSoup tree + get_text() + regex scans
+#   after  - SoupStrainer-limited parse of the matching course block
+#
+# Pages are read from the scrapers' HTTP cache, so run a scrape once first:
+#
+#   python bench_parse.py --cache-dir .cache/http --repeat 20
+
+parser = argparse.ArgumentParser(description="Benchmark prerequisite extraction on saved catalog search pages")
+parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="HTTP cache holding saved pages (default %(default)s)")
+parser.add_argument('--repeat', type=int, default=10, help="timing repetitions per page (default %(default)s)")
+args = parser.parse_args()
+
+
+def before(html, course_code):
+    return extract_prerequisites(BeautifulSoup(html, "html.parser").get_text())
+
+
+def after(html, course_code):
+    requisites = extract_course_requisites(html, course_code)
+    return requisite_text(requisites) if requisites is not None else before(html, course_code)
+
+
+def measure(extract, pages):
+    """Mean seconds per page and peak traced memory of a single parse"""
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for code, html in pages:
+            extract(html, code)
+    elapsed = (time.perf_counter() - start) / (args.repeat * len(pages))
+
+    peak = 0
+    for code, html in pages:
+        tracemalloc.start()
+        extract(html, code)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+pages = [(unquote(url.split("P=", 1)[1]), html)
+         for url, html in HttpCache(args.cache_dir, offline=True).pages() if "/search/?P=" in url]
+if not pages:
+    raise SystemExit(f"No saved search pages in {args.cache_dir}; run a scraper with the cache enabled first")
+
+changed = sum(before(html, code) != after(html, code) for code, html in pages)
+print(f"{len(pages)} saved search pages, {changed} with different prerequisite text after the change")
+print(f"{'':8}{'ms/course':>10}{'peak KiB':>10}")
+results = {name: measure(extract, pages) for name, extract in [('before', before), ('after', after)]}
+for name, (elapsed, peak) in results.items():
+    print(f"{name:8}{elapsed * 1000:>10.3f}{peak / 1024:>10.1f}")
+print(f"speedup {results['before'][0] / results['after'][0]:.1f}x, "
+      f"peak memory {results['after'][1] / results['before'][1]:.0%} of before")
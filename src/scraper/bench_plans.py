@@ -0,0 +1,44 @@
+import argparse
+import os
+import random
+import time
+
+from course_store import add_store_arguments, store_from_args
+from degree_plan import DEFAULT_PROGRAM, Planner, load_program, plan_all
+
+# Times batch plan generation on synthetic transcripts: each student has
+# finished the first few semesters of the program's own plan, minus a random
+# course or two, with a random hour limit. Reports plans per second for each
+# process count.
+#
+#   python bench_plans.py --students 20000 --processes 1 2 4 8
+
+parser = argparse.ArgumentParser(description="Benchmark batch degree-plan generation on synthetic transcripts")
+parser.add_argument('--students', type=int, default=20000, help="transcripts to plan (default %(default)s)")
+parser.add_argument('--processes', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                    help="process counts to time (default %(default)s)")
+parser.add_argument('--program', default=DEFAULT_PROGRAM, help="program export to plan for (default %(default)s)")
+parser.add_argument('--seed', type=int, default=0, help="random seed for the transcripts (default %(default)s)")
+add_store_arguments(parser)
+args = parser.parse_args()
+
+with store_from_args(args) as store:
+    program = load_program(store, args.program)
+reference = Planner(program).plan({"id": "reference"})['semesters']
+
+rng = random.Random(args.seed)
+transcripts = []
+for n in range(args.students):
+    done = [course['course'] for semester in reference[:rng.randrange(len(reference) + 1)] for course in semester['courses']]
+    for _ in range(rng.randrange(3)):
+        if done:
+            done.remove(rng.choice(done))
+    transcripts.append({"id": str(n), "completed": {code: rng.choice("ABC") for code in done},
+                        "max_hours": rng.choice([12, 15, 16, 18])})
+
+print(f"{'processes':>9}{'seconds':>9}{'plans/s':>10}{'unscheduled':>12}")
+for processes in args.processes:
+    start = time.perf_counter()
+    plans = list(plan_all(transcripts, program, processes))
+    elapsed = time.perf_counter() - start
+    print(f"{processes:>9}{elapsed:>9.2f}{len(plans) / elapsed:>10.0f}{sum('unscheduled' in plan for plan in plans):>12}")
@@ -0,0 +1,81 @@
+import argparse
+import random
+import statistics
+import time
+
+from course_store import add_store_arguments, store_from_args
+from search_index import SearchIndex, build_index
+
+# Times search-index lookups on a synthetic whole-catalog dataset: the store's
+# courses plus generated ones (real department codes, titles and prerequisite
+# text recombined from real words) up to --courses, against the linear scan
+# the planner does today (substring match over code and title of every course).
+#
+#   python bench_search.py --courses 12000
+
+parser = argparse.ArgumentParser(description="Benchmark search-index lookups on a catalog-sized dataset")
+parser.add_argument('--courses', type=int, default=12000, help="courses in the dataset (default %(default)s)")
+parser.add_argument('--queries', type=int, default=200, help="queries per kind (default %(default)s)")
+parser.add_argument('--seed', type=int, default=0, help="random seed (default %(default)s)")
+add_store_arguments(parser)
+args = parser.parse_args()
+
+with store_from_args(args) as store:
+    courses = [{"code": course['code'], "title": course['title'] or "", "prereqs": course['prereqs'] or ""}
+               for course in store.courses()]
+rng = random.Random(args.seed)
+departments = sorted({course['code'].split()[0] for course in courses})
+title_words = sorted({word for course in courses for word in course['title'].split()})
+prereq_words = sorted({word for course in courses for word in course['prereqs'].split()})
+codes = {course['code'] for course in courses}
+while len(courses) < args.courses:
+    code = f"{rng.choice(departments)[:3]}{rng.choice('ABCDEFGH')} {rng.randrange(100, 1000)}"
+    if code in codes:
+        continue
+    codes.add(code)
+    courses.append({"code": code, "title": ' '.join(rng.sample(title_words, rng.randrange(2, 6))),
+                    "prereqs": ' '.join(rng.sample(prereq_words, rng.randrange(0, 15)))})
+
+start = time.perf_counter()
+index = SearchIndex(build_index(courses))
+print(f"{len(courses)} courses indexed in {time.perf_counter() - start:.2f}s")
+
+
+def typo(word):
+    if len(word) < 5:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1:]
+
+
+samples = rng.sample(courses, args.queries)
+queries = {
+    "prefix": [course['code'][:rng.randrange(2, len(course['code']))] for course in samples],
+    "text": [' '.join(course['title'].split()[:2])[:-1] for course in samples],
+    "fuzzy": [' '.join(typo(word) for word in course['title'].split()[:2]) for course in samples],
+}
+searches = {"prefix": index.prefix, "text": index.text, "fuzzy": index.fuzzy}
+
+
+def linear_scan(query):
+    needle = query.lower()
+    return [course for course in courses if needle in course['code'].lower() or needle in course['title'].lower()]
+
+
+print(f"{'query':>8}{'median us':>11}{'p99 us':>9}{'scan us':>9}{'hits':>7}")
+for kind, kind_queries in queries.items():
+    latencies = []
+    hits = 0
+    for query in kind_queries:
+        begin = time.perf_counter()
+        results = searches[kind](query)
+        latencies.append(time.perf_counter() - begin)
+        hits += bool(results)
+    scans = []
+    for query in kind_queries[:20]:
+        begin = time.perf_counter()
+        linear_scan(query)
+        scans.append(time.perf_counter() - begin)
+    latencies.sort()
+    print(f"{kind:>8}{statistics.median(latencies) * 1e6:>11.0f}{latencies[int(0.99 * len(latencies))] * 1e6:>9.0f}"
+          f"{statistics.median(scans) * 1e6:>9.0f}{hits:>7}")
@@ -0,0 +1,359 @@
+from urllib.parse import unquote, urlsplit
+import argparse
+import contextlib
+import glob
+import hashlib
+import html as html_lib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from catalog import PROGRAMS
+from course_store import COURSE_CODE_RE, DATA_DIR
+from http_cache import DEFAULT_CACHE_DIR, HttpCache
+from http_client import HttpClient
+from prerequisites import fetch_prerequisites
+from program_tables import REQUIREMENTS_DIV_RE, available_backends, read_program_tables
+from standin_server import StandInCatalog
+from table_walk import walk_degree_plan, walk_program_tables
+
+# Offline benchmark suite: replays recorded catalog pages through a local
+# stand-in server and times
+#   e2e/<program>           whole `catalog.py <program>` runs, one per catalog.PROGRAMS entry
+#   tables/<backend>        parsing and walking the program requirement tables
+#   fetch_prerequisites     one prerequisite lookup, request included
+# Results are saved as JSON so runs can be compared between commits, and the
+# run fails if any benchmark got slower than a baseline result file.
+#
+#   python bench_suite.py record                      # fixtures from the HTTP cache of a live scrape
+#   python bench_suite.py generate                    # synthetic fixtures from the data files
+#   python bench_suite.py run --output base.json      # on the reference commit
+#   python bench_suite.py run --baseline base.json    # later: exits 1 on a regression
+#
+# Fixture layout: <fixtures>/index.json maps catalog paths (with query, e.g.
+# "/search/?P=CSCE 120") to files under <fixtures>/pages/. The committed
+# fixtures are synthetic: catalog-style pages rebuilt from src/data by
+# `generate`, so the suite runs without a live scrape.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(script_dir, "fixtures")
+DEFAULT_OUTPUT = os.path.join(script_dir, ".cache", "bench", "results.json")
+DEFAULT_TOLERANCE = 0.2  # fractional slowdown of the median that counts as a regression
+MIN_REGRESSION = 0.001  # seconds; smaller slowdowns are timer noise
+
+# Program page each scraped program is read from, relative to the catalog root
+PROGRAM_PAGES = {name: program.path for name, program in PROGRAMS.items()}
+
+
+def catalog_path(url):
+    """Stand-in server path for a catalog URL: path and query, unquoted, without the fragment"""
+    parts = urlsplit(url)
+    return unquote(parts.path + (f"?{parts.query}" if parts.query else ""))
+
+
+def save_fixtures(pages, fixtures_dir):
+    """Write {catalog path: html} as a fixture directory, replacing its index; returns the number of pages"""
+    index = {}
+    os.makedirs(os.path.join(fixtures_dir, "pages"), exist_ok=True)
+    for path, html in pages:
+        name = "pages/" + hashlib.sha256(path.encode('utf-8')).hexdigest()[:16] + ".html"
+        with open(os.path.join(fixtures_dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        index[path] = name
+    with open(os.path.join(fixtures_dir, "index.json"), "w") as f:
+        json.dump(dict(sorted(index.items())), f, indent=1)
+    return len(index)
+
+
+def record_fixtures(cache_dir, fixtures_dir):
+    """Copy every page in the HTTP cache into a fixture directory; returns the number of pages"""
+    return save_fixtures(((catalog_path(url), html) for url, html in HttpCache(cache_dir, offline=True).pages()),
+                         fixtures_dir)
+
+
+def _course_row(code, title, hours):
+    link = f'<a href="/search/?P={code}" class="bubblelink code">{html_lib.escape(code)}</a>' if '-' not in code else code
+    return (f'<tr><td class="codecol">{link}</td><td class="titlecol">{html_lib.escape(title)}</td>'
+            f'<td class="hourscol">{hours}</td></tr>\n')
+
+
+def _names(entry):
+    """(code, title) of a record's options"""
+    alternatives = entry.get('alternatives') or [entry]
+    names = entry['name'] if isinstance(entry['name'], list) else [entry['name']] * len(alternatives)
+    return [(alternative['course'], alternative.get('name') if isinstance(alternative.get('name'), str) else title)
+            for alternative, title in zip(alternatives, names)]
+
+
+def _plan_page(entries):
+    """A degree-plan grid (table.sc_plangrid) listing course records by semester"""
+    rows = ['<table class="sc_plangrid">']
+    year = term = None
+    for entry in entries:
+        entry_year, _, entry_term = entry['semester'].rpartition(' ')
+        if entry_year != year:
+            rows.append(f'<tr class="plangridyear"><th class="year" colspan="3">{entry_year}</th></tr>\n')
+        if (entry_year, entry_term) != (year, term):
+            rows.append(f'<tr class="plangridterm"><th class="hourscol">{entry_term}</th><th></th>'
+                        f'<th class="hourscol">Semester Credit Hours</th></tr>\n')
+            year, term = entry_year, entry_term
+        options = _names(entry)
+        if isinstance(entry['name'], list):
+            rows.append(f'<tr><td colspan="2">Select one of the following:</td>'
+                        f'<td class="hourscol">{entry["credits"]}</td></tr>\n')
+            rows.extend(_course_row(code, title, entry['credits']) for code, title in options)
+        else:
+            rows.append(_course_row('/'.join(code for code, _ in options), entry['name'], entry['credits']))
+    rows.append('<tr class="plangridtotal"><td colspan="2">Total Semester Credit Hours</td>'
+                f'<td class="hourscol">{sum(entry["credits"] or 0 for entry in entries)}</td></tr></table>')
+    return rows
+
+
+def _course_list_page(entries):
+    """A course list (table.sc_courselist) of "Select ..." groups"""
+    rows = ['<table class="sc_courselist"><tr class="areaheader"><td colspan="2">'
+            '<span class="courselistcomment areaheader">Required Courses</span></td><td></td></tr>\n']
+    for entry in entries:
+        selection = ("Select one of the following" if entry['credits'] == 3
+                     else f"Select {entry['credits']} hours from the following")
+        rows.append(f'<tr><td colspan="2"><span class="courselistcomment">{selection}:</span></td>'
+                    f'<td class="hourscol">{entry["credits"]}</td></tr>\n')
+        rows.extend(_course_row(code, title if '-' not in code else '', 3 if '-' not in code else '')
+                    for code, title in _names(entry))
+    rows.append('<tr class="listsum"><td colspan="2">Total Semester Credit Hours</td>'
+                f'<td class="hourscol">{sum(entry["credits"] or 0 for entry in entries)}</td></tr></table>')
+    return rows
+
+
+def _course_block(code, title, credits, prereqs):
+    department, number = code.split()
+    block = (f'<div class="courseblock"><h2 class="courseblocktitle noindent"><strong>{department}&#160;{number}'
+             f'&#160;{html_lib.escape(title)}</strong></h2><p class="hours noindent"><strong>Credits {credits}. '
+             f'<br>{credits} Lecture Hours.</strong></p><p class="courseblockdesc noindent">Topics of {code}. <br><br>')
+    if prereqs:
+        block += f'<strong>Prerequisites: </strong>{html_lib.escape(prereqs)}.'
+    return block + '</p></div>\n'
+
+
+def synthetic_pages(data_dir=DATA_DIR):
+    """(catalog path, html) of stand-in catalog pages rebuilt from the programs' data files
+
+    Each program page gets its requirement tables, and every course they
+    list a search page and a block on its department's course-description page.
+    """
+    courses = {}
+    for program in PROGRAMS.values():
+        with open(os.path.join(data_dir, program.export), encoding="utf-8") as f:
+            entries = json.load(f)[program.name]
+        tables = _plan_page(entries) if program.walk is walk_degree_plan else _course_list_page(entries)
+        yield program.path, ('<html><body><h1 class="page-title">' + program.name + '</h1>'
+                             '<div id="programrequirementstextcontainer">' + ''.join(tables) + '</div></body></html>')
+        for entry in entries:
+            for alternative, (code, title) in zip(entry.get('alternatives') or [entry], _names(entry)):
+                if COURSE_CODE_RE.match(code):
+                    courses.setdefault(code, (title, alternative.get('credits') or entry['credits'] or 3,
+                                              alternative.get('prereqs') or ''))
+    departments = {}
+    for code, details in sorted(courses.items()):
+        block = _course_block(code, *details)
+        departments.setdefault(code.split()[0], []).append(block)
+        yield f"/search/?P={code}", ('<html><body><div id="fssearchresults" class="searchresults">'
+                                      '<div class="searchresult search-courseresult">' + block + '</div></div></body></html>')
+    for department, blocks in departments.items():
+        yield (f"/undergraduate/course-descriptions/{department.lower()}/",
+               '<html><body><div id="coursescontainer" class="sc_sccoursedescs">' + ''.join(blocks) + '</div></body></html>')
+
+
+def load_fixtures(fixtures_dir):
+    """{catalog path: html} of a fixture directory"""
+    try:
+        with open(os.path.join(fixtures_dir, "index.json")) as f:
+            index = json.load(f)
+    except OSError:
+        raise SystemExit(f"No fixtures in {fixtures_dir}; run `bench_suite.py generate`, or `bench_suite.py record` "
+                         f"after a scrape with the cache enabled")
+    pages = {}
+    for path, name in index.items():
+        with open(os.path.join(fixtures_dir, name), encoding="utf-8") as f:
+            pages[path] = f.read()
+    return pages
+
+
+def timings(samples, unit="s"):
+    return {"unit": unit, "median": statistics.median(samples), "min": min(samples),
+            "samples": [round(sample, 6) for sample in samples]}
+
+
+def bench_scripts(pages, catalog, repeat):
+    """Wall time of each scraper run end to end, in a scratch copy of the scraper directory"""
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        work_dir = os.path.join(scratch, "scraper")
+        os.makedirs(work_dir)
+        os.makedirs(os.path.join(scratch, "data"))
+        for source in glob.glob(os.path.join(script_dir, "*.py")):
+            shutil.copy(source, work_dir)
+        for name, path in PROGRAM_PAGES.items():
+            if path not in pages:
+                print(f"  skipping {name}: its program page is not among the fixtures")
+                continue
+            report_file = os.path.join(scratch, "report.json")
+            samples = []
+            stages = {}
+            for _ in range(repeat):
+                command = [sys.executable, "catalog.py", name, '--catalog-url', catalog.url, '--no-cache', '--full',
+                           '--rate', '0', '--report', report_file]
+                start = time.perf_counter()
+                run = subprocess.run(command, cwd=work_dir, capture_output=True, text=True)
+                samples.append(time.perf_counter() - start)
+                if run.returncode != 0:
+                    raise SystemExit(f"catalog.py {name} failed against the fixtures:\n{run.stdout[-2000:]}{run.stderr[-2000:]}")
+                with open(report_file) as f:
+                    for stage, seconds in json.load(f)['stages'].items():
+                        stages.setdefault(stage, []).append(seconds)
+            results[f"e2e/{name}"] = timings(samples)
+            for stage, stage_samples in stages.items():
+                results[f"e2e/{name}/{stage}"] = timings(stage_samples)
+    return results
+
+
+def bench_tables(pages, repeat):
+    """Seconds per program page to read and walk its requirement tables, per installed backend"""
+    programs = [html for html in pages.values() if REQUIREMENTS_DIV_RE.search(html)]
+    if not programs:
+        return {}
+    results = {}
+    for backend in available_backends():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for html in programs:
+                walk_program_tables(read_program_tables(html, backend))
+            samples.append((time.perf_counter() - start) / len(programs))
+        results[f"tables/{backend}"] = timings(samples)
+    return results
+
+
+def bench_fetch(pages, catalog, repeat):
+    """Seconds per fetch_prerequisites() call over the recorded search pages, uncached and unpaced"""
+    codes = [path.split("P=", 1)[1] for path in pages if path.startswith("/search/?P=")]
+    if not codes:
+        return {}
+    client = HttpClient()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # silence per-course progress lines
+            for code in codes:
+                fetch_prerequisites(code, catalog.url, client=client)
+        samples.append((time.perf_counter() - start) / len(codes))
+    return {"fetch_prerequisites": timings(samples)}
+
+
+def compare(results, baseline, tolerance):
+    """Benchmarks whose median got slower than the baseline's by more than `tolerance`"""
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            continue
+        ratio = result['median'] / before['median'] if before['median'] else 1.0
+        slower = result['median'] - before['median']
+        marker = ""
+        if ratio > 1 + tolerance and slower > MIN_REGRESSION:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print(f"{name:48}{before['median'] * 1000:>10.2f}{result['median'] * 1000:>10.2f}{ratio:>8.2f}x{marker}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=script_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers offline against recorded catalog pages")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES,
+                        help="directory of recorded catalog pages (default %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help="save the pages in the HTTP cache as fixtures")
+    record.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="HTTP cache holding pages from a live scrape (default %(default)s)")
+    generate = commands.add_parser('generate', help="write synthetic fixtures rebuilt from the data files")
+    generate.add_argument('--data-dir', default=DATA_DIR, help="directory of the data files (default %(default)s)")
+
+    run = commands.add_parser('run', help="run the benchmarks against the fixtures")
+    run.add_argument('--repeat', type=int, default=5, help="timing repetitions per benchmark (default %(default)s)")
+    run.add_argument('--latency', type=float, default=0.0,
+                     help="stand-in server latency per request in seconds (default %(default)s)")
+    run.add_argument('--only', nargs='+', choices=['e2e', 'tables', 'fetch'], default=['e2e', 'tables', 'fetch'],
+                     help="benchmark groups to run (default all)")
+    run.add_argument('--output', default=DEFAULT_OUTPUT, help="file to save the results in (default %(default)s)")
+    run.add_argument('--baseline', help="results file to compare against; exit 1 on a regression")
+    run.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                     help="allowed slowdown of a benchmark's median, as a fraction (default %(default)s)")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        count = record_fixtures(args.cache_dir, args.fixtures)
+        print(f"Recorded {count} pages into {args.fixtures}")
+        return
+    if args.command == 'generate':
+        count = save_fixtures(synthetic_pages(args.data_dir), args.fixtures)
+        print(f"Generated {count} pages into {args.fixtures}")
+        return
+
+    pages = load_fixtures(args.fixtures)
+    print(f"{len(pages)} fixture pages from {args.fixtures}")
+    benchmarks = {}
+    with StandInCatalog(pages, latency=args.latency) as catalog:
+        if 'e2e' in args.only:
+            benchmarks.update(bench_scripts(pages, catalog, args.repeat))
+        if 'tables' in args.only:
+            benchmarks.update(bench_tables(pages, args.repeat))
+        if 'fetch' in args.only:
+            benchmarks.update(bench_fetch(pages, catalog, args.repeat))
+
+    results = {
+        "commit": git_commit(),
+        "date": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "fixtures": len(pages),
+        "repeat": args.repeat,
+        "latency": args.latency,
+        "benchmarks": benchmarks,
+    }
+    print(f"{'benchmark':48}{'median ms':>10}{'min ms':>10}")
+    for name, result in benchmarks.items():
+        print(f"{name:48}{result['median'] * 1000:>10.2f}{result['min'] * 1000:>10.2f}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.baseline} (commit {baseline.get('commit')}), tolerance {args.tolerance:.0%}:")
+        print(f"{'benchmark':48}{'before ms':>10}{'after ms':>10}{'ratio':>9}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} benchmarks regressed: {', '.join(regressions)}")
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
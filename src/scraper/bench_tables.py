@@ -0,0 +1,33 @@
+import argparse
+import time
+
+from http_cache import DEFAULT_CACHE_DIR, HttpCache
+from program_tables import available_backends, read_program_tables
+
+# Times each installed parser backend on the program pages saved in the HTTP
+# cache and checks that they all read the requirement tables identically.
+#
+#   python bench_tables.py --cache-dir .cache/http --repeat 50
+
+parser = argparse.ArgumentParser(description="Benchmark program-table parser backends on saved program pages")
+parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="HTTP cache holding saved pages (default %(default)s)")
+parser.add_argument('--repeat', type=int, default=20, help="timing repetitions per page (default %(default)s)")
+args = parser.parse_args()
+
+pages = [(url, html) for url, html in HttpCache(args.cache_dir, offline=True).pages()
+         if "/search/?P=" not in url and "/course-descriptions/" not in url]
+if not pages:
+    raise SystemExit(f"No saved program pages in {args.cache_dir}; run a scraper with the cache enabled first")
+
+backends = available_backends()
+reference = [read_program_tables(html, 'bs4') for _, html in pages]
+print(f"{len(pages)} saved program pages, backends: {', '.join(backends)}")
+print(f"{'backend':12}{'ms/page':>10}{'identical':>11}")
+for backend in backends:
+    identical = [read_program_tables(html, backend) for _, html in pages] == reference
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, html in pages:
+            read_program_tables(html, backend)
+    elapsed = (time.perf_counter() - start) / (args.repeat * len(pages))
+    print(f"{backend:12}{elapsed * 1000:>10.3f}{'yes' if identical else 'NO':>11}")
@@ -0,0 +1,63 @@
+import argparse
+import time
+
+from program_tables import Cell, Row
+from table_walk import walk_course_list, walk_degree_plan
+
+# Times the requirement-table walks on synthetic tables of growing size to
+# check that the cost per row stays flat (linear overall) as tables grow to
+# whole-catalog program lists.
+#
+#   python bench_walk.py --rows 1000 2000 5000 10000
+
+
+def course_code(n):
+    # Distinct codes such as "ABCD 101", so every row is a new course for the dedup index
+    dept = ''.join(chr(ord('A') + (n // 900 // 26 ** k) % 26) for k in range(4))
+    return f"{dept} {100 + n % 900}"
+
+
+def degree_plan_table(size):
+    rows = []
+    n = 0
+    while len(rows) < size:
+        if n % 40 == 0:
+            rows.append(Row([Cell('th', ('year',), f"Year {n // 40 + 1}")], f"Year {n // 40 + 1}"))
+        if n % 20 == 0:
+            rows.append(Row([Cell('th', ('hourscol',), "Fall"), Cell('th', (), ""), Cell('th', ('hourscol',), "Semester Credit Hours")], "Fall"))
+        if n % 15 == 0:
+            rows.append(Row([Cell('td', (), "Select one of the following:")], "Select one of the following:"))
+            for k in range(3):
+                rows.append(Row([Cell('td', ('codecol',), course_code(n + k)), Cell('td', ('titlecol',), f"Option {k}1,2"),
+                                 Cell('td', ('hourscol',), "3")], course_code(n + k)))
+            # A row without a course code ends the group
+            rows.append(Row([Cell('td', (), ""), Cell('td', (), "Semester Credit Hours"), Cell('td', ('hourscol',), "15")],
+                            "Semester Credit Hours 15"))
+            n += 3
+        elif n % 7 == 0:
+            code = f"{course_code(n)} or {course_code(n + 1)}"
+            rows.append(Row([Cell('td', ('codecol',), code), Cell('td', ('titlecol',), "Either course3"),
+                             Cell('td', ('hourscol',), "4")], code))
+            n += 2
+        else:
+            code = course_code(n)
+            rows.append(Row([Cell('td', ('codecol',), code), Cell('td', ('titlecol',), f"Course {n}1"),
+                             Cell('td', ('hourscol',), "3")], code))
+            n += 1
+    return [rows[:size]]
+
+
+parser = argparse.ArgumentParser(description="Benchmark the requirement-table walks on synthetic tables")
+parser.add_argument('--rows', type=int, nargs='+', default=[1000, 2000, 5000, 10000], help="table sizes to time")
+parser.add_argument('--repeat', type=int, default=5, help="timing repetitions per size (default %(default)s)")
+args = parser.parse_args()
+
+print(f"{'rows':>7}{'walk':>14}{'ms':>9}{'us/row':>9}{'records':>9}")
+for size in args.rows:
+    tables = degree_plan_table(size)
+    for name, walk in [('degree plan', walk_degree_plan), ('course list', walk_course_list)]:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            records = walk(tables)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{size:>7}{name:>14}{elapsed * 1000:>9.2f}{elapsed / size * 1e6:>9.2f}{len(records):>9}")
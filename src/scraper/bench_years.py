@@ -0,0 +1,76 @@
+import argparse
+import copy
+import json
+import random
+import time
+
+from catalog_years import CatalogYears, store_records
+from course_store import CourseStore, add_store_arguments, store_from_args
+
+# Times catalog-year storage on synthetic cohorts: the store's content as the
+# oldest year, then --years later years that each change a fraction of the
+# courses (prerequisites, credits) and requirement rows, and add new courses.
+# Works on an in-memory copy, so the store itself is left alone. Reports the
+# stored size against full copies, and how long rebuilding and diffing take.
+#
+#   python bench_years.py --years 6 --churn 0.05
+
+parser = argparse.ArgumentParser(description="Benchmark delta-encoded catalog years")
+parser.add_argument('--years', type=int, default=6, help="catalog years to save (default %(default)s)")
+parser.add_argument('--churn', type=float, default=0.05,
+                    help="share of courses and requirements changed each year (default %(default)s)")
+parser.add_argument('--seed', type=int, default=0, help="random seed (default %(default)s)")
+add_store_arguments(parser)
+args = parser.parse_args()
+
+store = CourseStore(":memory:")
+with store_from_args(args) as source:
+    source.db.backup(store.db)
+years = CatalogYears(store, path=None)
+rng = random.Random(args.seed)
+names = [f"{2020 + n}-{2021 + n}" for n in range(args.years)]
+
+records = store_records(store)
+full_bytes = 0
+for n, year in enumerate(names):
+    if n:
+        records = copy.deepcopy(records)
+        keys = sorted(records)
+        for key in rng.sample(keys, int(len(keys) * args.churn)):
+            kind = json.loads(key)[0]
+            if kind == "course":
+                records[key]['prereqs'] = f"{records[key]['prereqs'] or ''} or approval of instructor".strip()
+                records[key]['credits'] = rng.choice([1, 2, 3, 4])
+            elif kind == "requirement":
+                records[key]['values']['note'] = f"Revised for {year}"
+                records[key]['keys'] = list(dict.fromkeys(records[key]['keys'] + ['note']))
+        for number in range(int(len(keys) * args.churn / 4)):
+            code = f"NEW{n} {100 + number}"
+            records[json.dumps(["course", code], separators=(',', ':'))] = {
+                "title": f"New Course {number}", "credits": 3, "prereqs": "", "prereq_tree": None}
+    full_bytes += len(json.dumps(records, separators=(',', ':')))
+    years.save(year, records)
+
+stored_bytes = store.db.execute("SELECT SUM(LENGTH(key) + IFNULL(LENGTH(value), 0)) FROM year_changes").fetchone()[0]
+print(f"{args.years} years: {stored_bytes / 1024:.0f} KB of changes stored vs {full_bytes / 1024:.0f} KB "
+      f"as full copies ({stored_bytes / full_bytes:.0%})")
+
+
+def timed(function, *arguments):
+    start = time.perf_counter()
+    result = function(*arguments)
+    return result, (time.perf_counter() - start) * 1000
+
+
+print(f"{'year':>10}{'changes':>9}{'rebuild ms':>12}{'files ms':>10}")
+for year, _, changed in years.summary():
+    cold = CatalogYears(store, path=None)
+    _, rebuild = timed(cold.materialize, year)
+    _, files = timed(cold.documents, year)
+    print(f"{year:>10}{changed:>9}{rebuild:>12.1f}{files:>10.1f}")
+for old, new in [(names[-2], names[-1]), (names[0], names[-1])] if len(names) > 1 else []:
+    diff, elapsed = timed(years.diff, old, new)
+    requirements = sum(len(section['changed']) + len(section['added']) + len(section['removed'])
+                       for groups in diff['requirements'].values() for section in groups.values())
+    print(f"diff {old} -> {new}: {len(diff['courses']['changed'])} courses changed, "
+          f"{len(diff['courses']['added'])} added, {requirements} requirement changes in {elapsed:.1f} ms")
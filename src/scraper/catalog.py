@@ -0,0 +1,351 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import sys
+import threading
+
+from catalog_years import add_year_arguments, save_year_from_args
+from checkpoint import add_checkpoint_arguments, checkpoint_from_args
+from course_index import DepartmentIndex
+from course_ranges import resolve_course_ranges, save_departments
+from course_store import DATA_DIR, add_store_arguments, store_from_args
+from http_cache import HttpCache, add_cache_arguments, cache_from_args, fetch_page
+from http_client import AdaptiveRateLimiter, HttpClient, client_from_args
+from manifest import add_manifest_arguments, manifest_from_args, print_change_report, write_if_changed
+from metrics import METRICS, add_metrics_arguments, metrics_from_args
+from prereq_compiler import annotate_courses
+from prerequisites import (CATALOG_URL, DEFAULT_CONCURRENCY, DEFAULT_RATE, add_fetch_arguments,
+                           fetch_all_prerequisites, pending_course_codes, resolve_prerequisites)
+from program_tables import add_parser_arguments, read_program_tables, requirements_fragment
+from search_index import write_index
+from table_walk import walk_course_list, walk_degree_plan, walk_program_tables
+
+# Library interface to the catalog scrapers. Importing it does no I/O, and a
+# CatalogScraper keeps its HTTP client, page cache, manifest and department
+# pages between calls, so a long-running worker scrapes job after job over
+# one warm session:
+#
+#   from catalog import CatalogScraper, fetch_course, scrape_program
+#   courses = scrape_program("https://catalog.tamu.edu/undergraduate/arts-and-sciences/mathematics/minor/")
+#   fetch_course("CSCE 221")  # {"title", "credits", "prereqs", "coreqs", "concurrent", "description"}
+#
+# It also runs the named scrapes that write the data files (scrape_ce.py and
+# scrape_math_minor.py are shorthands for them) and the job worker:
+#
+#   python catalog.py ce --offline
+#   python catalog.py math-minor --bulk
+#   python catalog.py --worker < jobs.ndjson
+#
+# A worker job is one line of JSON: {"id": ..., "program": URL, "walk":
+# "degree-plan"} or {"id": ..., "course": "CSCE 221"}. Each answer is a line
+# with the same id and "courses", "course" or "error".
+
+# A program with a data file of its own; path is relative to the catalog root
+Program = namedtuple('Program', 'name export path walk unit')
+
+PROGRAMS = {
+    "ce": Program("Computer Engineering", "ce_courses.json",
+                  "/undergraduate/engineering/computer-science/computer-engineering-bs/", walk_degree_plan, "courses"),
+    "math-minor": Program("Math Minor", "math_minor_courses.json",
+                          "/undergraduate/arts-and-sciences/mathematics/minor/", walk_course_list, "course groups"),
+}
+
+WALKS = {"auto": walk_program_tables, "degree-plan": walk_degree_plan, "course-list": walk_course_list}
+
+
+class ScrapeError(Exception):
+    """Prerequisite lookups failed, so a program's course records would be incomplete"""
+
+    def __init__(self, failed):
+        super().__init__(f"{len(failed)} prerequisite lookups failed ({', '.join(failed)})")
+        self.failed = failed
+
+
+class CatalogScraper:
+    """Scrapes program pages and course details from one catalog, reusing its connections and pages"""
+
+    def __init__(self, catalog_url=CATALOG_URL, cache=None, client=None, manifest=None, parser='auto',
+                 concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, bulk=False):
+        self.catalog_url = catalog_url
+        self.cache = cache
+        self.client = client or HttpClient(AdaptiveRateLimiter(rate))
+        self.manifest = manifest
+        self.parser = parser
+        self.concurrency = concurrency
+        self.bulk = bulk
+        self.index = DepartmentIndex(catalog_url, cache, self.client, manifest)
+
+    @classmethod
+    def from_args(cls, args):
+        """The scraper selected by the fetch, cache, parser and manifest options"""
+        return cls(args.catalog_url, cache_from_args(args), client_from_args(args), manifest_from_args(args),
+                   args.parser, args.concurrency, args.rate, args.bulk)
+
+    def program_url(self, program):
+        return f"{self.catalog_url}{program.path}#programrequirementstext"
+
+    def walk_program(self, url, walk=walk_program_tables, key=None):
+        """Course records of a program page before any lookups, reusing the manifest's walk if its tables are unchanged"""
+        METRICS.stage("fetch program page")
+        html = fetch_page(url, self.cache, self.client)
+        METRICS.stage("walk tables")
+        key = key or url
+        walked, errors = self.walk_pages({key: (url, html)}, walk)
+        if errors:
+            raise errors[key]
+        return walked[key]
+
+    def walk_pages(self, pages, walk=walk_program_tables, processes=1):
+        """Walk the requirement tables of program pages, {key: (url, html)}, into course records
+
+        Pages whose tables are unchanged since the manifest recorded them
+        reuse its walk; the others are parsed in a process pool when
+        processes > 1. A page whose tables list no courses (a moved page, a
+        layout change) is an error rather than an empty program. Returns
+        ({key: course records}, {key: exception}).
+        """
+        fragments = {key: requirements_fragment(html) for key, (_, html) in pages.items()}
+        walked = {}
+        for key, (url, _) in pages.items():
+            if self.manifest is not None:
+                reused, courses = self.manifest.lookup("programs", key, url, fragments[key])
+                if reused:
+                    walked[key] = courses
+        changed = [key for key in pages if key not in walked]
+        errors = {}
+        if processes > 1 and len(changed) > 1:
+            with ProcessPoolExecutor(max_workers=min(processes, len(changed))) as pool:
+                futures = {key: pool.submit(walk_fragment, fragments[key], self.parser, walk) for key in changed}
+                results = {}
+                for key, future in futures.items():
+                    try:
+                        results[key] = future.result()
+                    except Exception as e:
+                        errors[key] = e
+        else:
+            results = {}
+            for key in changed:
+                try:
+                    results[key] = walk_fragment(fragments[key], self.parser, walk)
+                except Exception as e:
+                    errors[key] = e
+        for key, courses in results.items():
+            if not courses:
+                errors[key] = LookupError(f"no courses found in the requirement tables of {pages[key][0]}")
+                continue
+            if self.manifest is not None:
+                self.manifest.record("programs", key, pages[key][0], fragments[key], courses)
+            walked[key] = courses
+        return walked, errors
+
+    def scrape_program(self, url, walk=walk_program_tables, key=None, checkpoint=None, departments=None):
+        """Course records (ce_courses.json schema) of a program page, prerequisites fetched and compiled
+
+        key names the program in the manifest (default: its URL). Finished
+        lookups are streamed to `checkpoint` if one is given. The course lists
+        of the departments that course ranges draw on are added to
+        `departments`, if given, as {department: course records}. Raises
+        ScrapeError when prerequisite lookups fail.
+        """
+        key = key or url
+        completed, failed = self.complete_programs({key: self.walk_program(url, walk, key)}, checkpoint, departments)
+        if failed:
+            raise ScrapeError(failed[key])
+        return completed[key]
+
+    def complete_programs(self, programs, checkpoint=None, departments=None):
+        """Fetch and compile the prerequisites of walked programs, {key: course records}
+
+        Courses listed by several programs are looked up once. Programs whose
+        lookups all succeeded get their ranges expanded and prerequisite
+        trees compiled; returns ({key: course records}, {key: failed codes}).
+        `checkpoint` and `departments` are as for scrape_program().
+        """
+        # Fetch prerequisites for every collected course (alternatives included) concurrently
+        METRICS.stage("fetch prerequisites")
+        codes = pending_course_codes([course for courses in programs.values() for course in courses])
+        prereqs = fetch_all_prerequisites(codes, concurrency=self.concurrency, catalog_url=self.catalog_url,
+                                          cache=self.cache, bulk=self.bulk, manifest=self.manifest,
+                                          checkpoint=checkpoint, client=self.client, index=self.index)
+        self.save_manifest()
+        failed = {}
+        for key, courses in programs.items():
+            missing = [code for code in pending_course_codes(courses) if code not in prereqs]
+            if missing:
+                failed[key] = missing
+        complete = {key: courses for key, courses in programs.items() if key not in failed}
+        if not complete:
+            return {}, failed
+        for courses in complete.values():
+            resolve_prerequisites(courses, prereqs)
+
+        # Read the departments that course ranges (MATH 300-499) draw on and list the courses each range allows
+        METRICS.stage("expand ranges")
+        catalogs = resolve_course_ranges([course for courses in complete.values() for course in courses],
+                                         self.catalog_url, self.cache, self.client, self.manifest,
+                                         self.concurrency, self.index)
+        if departments is not None:
+            departments.update(catalogs)
+        self.save_manifest()
+
+        # Compile each prerequisite string into an AND/OR tree stored next to the text
+        METRICS.stage("compile prerequisites")
+        return {key: annotate_courses(courses) for key, courses in complete.items()}, failed
+
+    def fetch_course(self, code):
+        """Catalog details of a course, or None if its department page doesn't list it
+
+        The department's page is read once and answers every later lookup in it.
+        If it can't be read the fetch error is raised, and the next call tries again.
+        """
+        return self.index.lookup(code)
+
+    def save_manifest(self):
+        if self.manifest is not None:
+            self.manifest.save()
+
+
+def walk_fragment(fragment, parser, walk):
+    """Parse a requirements fragment and walk its tables; a process-pool task"""
+    return walk(read_program_tables(fragment, parser))
+
+
+_default_scraper = None
+_default_lock = threading.Lock()
+
+
+def default_scraper():
+    """The process-wide scraper behind scrape_program() and fetch_course(): live catalog, on-disk page cache"""
+    global _default_scraper
+    with _default_lock:
+        if _default_scraper is None:
+            _default_scraper = CatalogScraper(cache=HttpCache())
+        return _default_scraper
+
+
+def scrape_program(url, walk=walk_program_tables):
+    """Course records (ce_courses.json schema) of a program page"""
+    return default_scraper().scrape_program(url, walk)
+
+
+def fetch_course(code):
+    """Catalog details of a course ({"title", "credits", "prereqs", ...}), or None"""
+    return default_scraper().fetch_course(code)
+
+
+def write_program(program, args):
+    """Scrape a named program, store it and export its data file, leaving the file untouched if nothing changed"""
+    metrics = metrics_from_args(args)
+    scraper = CatalogScraper.from_args(args)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    output_file = os.path.join(DATA_DIR, program.export)
+    url = scraper.program_url(program)
+
+    # Each finished lookup is streamed to the checkpoint, so an interrupted run can --resume
+    checkpoint = checkpoint_from_args(args, output_file, url)
+    departments = {}
+    try:
+        courses = scraper.scrape_program(url, program.walk, program.name, checkpoint, departments)
+    except ScrapeError as e:
+        checkpoint.close()
+        raise SystemExit(f"{e}; {program.export} was not written. Rerun with --resume to retry just those "
+                         f"(progress is kept in {checkpoint.path}).")
+    except (OSError, LookupError) as e:
+        # The program page itself could not be read (requests' errors are OSErrors) or listed no courses
+        checkpoint.close()
+        raise SystemExit(f"Could not scrape {url}: {e}; {program.export} was not written.")
+
+    metrics.stage("write")
+    with store_from_args(args) as store:
+        for export in save_departments(store, departments):
+            print(f"{export} updated")
+        store.save_program(program.export, program.name, courses)
+        courses = store.export_data(program.export)[program.name]
+        write_index(store)
+        save_year_from_args(args, store)
+    written, report = write_if_changed(output_file, program.name, courses)
+    if args.change_report:
+        with open(args.change_report, "w") as f:
+            json.dump({program.name: report}, f, indent=2)
+    checkpoint.remove()
+    metrics.stage(None)
+
+    if written:
+        print(f"{program.export} created with {len(courses)} {program.unit} at {output_file}!")
+    else:
+        print(f"{program.export} unchanged ({len(courses)} {program.unit}) at {output_file}")
+    print(f"Parsed {scraper.manifest.parsed} changed or new fragments, reused {scraper.manifest.reused} unchanged ones")
+    print_change_report(report)
+    print("Note: Prerequisites have been fetched for all courses.")
+
+
+def run_jobs(scraper, lines, output):
+    """Answer worker jobs (one JSON object per line) with one JSON line each; returns how many failed"""
+    failed = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        answer = {}
+        # Each job gets a fresh recorder, so its answer's metrics (and --report) cover that job alone
+        METRICS.reset()
+        try:
+            job = json.loads(line)
+            answer["id"] = job.get('id')
+            if 'course' in job:
+                answer["course"] = scraper.fetch_course(job['course'])
+            elif 'program' not in job:
+                raise ValueError('a job needs a "program" URL or a "course" code')
+            else:
+                answer["courses"] = scraper.scrape_program(job['program'], WALKS[job.get('walk', 'auto')])
+        except Exception as e:
+            answer["error"] = f"{type(e).__name__}: {e}"
+            failed += 1
+        report = METRICS.report()
+        answer["metrics"] = {"elapsed": report['elapsed'], "requests": report['requests']['count'],
+                             "bytes": report['requests']['bytes'], "cache": report['cache']}
+        output.write(json.dumps(answer) + "\n")
+        output.flush()
+    return failed
+
+
+def add_scrape_arguments(parser):
+    """Register the options of a scrape: fetching, caching, parsing, incremental runs, storage and metrics"""
+    add_fetch_arguments(parser)
+    add_cache_arguments(parser)
+    add_parser_arguments(parser)
+    add_manifest_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_store_arguments(parser)
+    add_year_arguments(parser)
+    add_metrics_arguments(parser)
+
+
+def main(argv=None, program=None):
+    """Scrape a named program into its data file, or with --worker answer jobs from stdin"""
+    if program is not None:
+        parser = argparse.ArgumentParser(
+            description=f"Scrape the {PROGRAMS[program].name} requirements from the course catalog")
+    else:
+        parser = argparse.ArgumentParser(description="Scrape a program into its data file, or run scrape jobs")
+        parser.add_argument('program', nargs='?', choices=list(PROGRAMS), help="program to scrape")
+        parser.add_argument('--worker', action='store_true',
+                            help="answer NDJSON jobs from stdin on stdout, reusing one session")
+    add_scrape_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if program is None and args.worker:
+        # Progress messages go to stderr so stdout carries only answers
+        output, sys.stdout = sys.stdout, sys.stderr
+        metrics_from_args(args)
+        if run_jobs(CatalogScraper.from_args(args), sys.stdin, output):
+            raise SystemExit(1)
+        return
+    if program is None and args.program is None:
+        parser.error("name a program to scrape, or pass --worker")
+    write_program(PROGRAMS[program or args.program], args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import re
+
+from course_store import (CANONICAL_COLUMNS, DEFAULT_DB, FACT_KEYS, READERS, WRITERS, CourseStore,
+                          add_store_arguments, format_json, store_from_args)
+
+# Keeps several catalog years of the course data in the course store, so
+# students can be planned under the catalog they entered with.
+#
+# A year is the store's whole content at the time it was saved, flattened to
+# records:
+#   ["course", code]                                 canonical course facts
+#   ["program", export]                              a data file's name, shape, details,
+#                                                    formatting and requirement order
+#   ["requirement", export, label, m, code, n]       one requirement row (the n-th listing of
+#                                                    code in the m-th group called label)
+# Requirement rows leave out course facts equal to the course record, as the
+# store itself does. Only the oldest year is stored whole; every later year
+# is stored as the records that changed since the year before it, and any
+# year is rebuilt by replaying them. The changes of the default store are
+# also kept in src/data/catalog_years.json, which a new store imports; a store
+# elsewhere (--db) keeps its years to itself unless given --years-file.
+#
+#   python catalog_years.py save 2025-2026          # record the store's current content as a catalog year
+#   python catalog_years.py list
+#   python catalog_years.py diff 2024-2025 2025-2026
+#   python catalog_years.py export 2024-2025 --output-dir /tmp/2024-2025
+#
+# The scrapers save a year themselves when given --catalog-year.
+
+YEARS_FILE = "catalog_years.json"  # in the data directory of the default store
+YEAR_RE = re.compile(r'^\d{4}-\d{4}$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_years (
+    year TEXT PRIMARY KEY,        -- e.g. 2025-2026; years are ordered by name
+    saved TEXT NOT NULL           -- when the year was last saved, ISO 8601
+);
+
+CREATE TABLE IF NOT EXISTS year_changes (
+    year TEXT NOT NULL REFERENCES catalog_years (year) ON DELETE CASCADE,
+    key TEXT NOT NULL,            -- the record's key, JSON
+    value TEXT,                   -- the record in this year, JSON; NULL if it was removed
+    PRIMARY KEY (year, key)
+);
+"""
+
+# Each shape's entry key holding the course code
+CODE_KEYS = {shape: next(key for key, column in columns.items() if column == 'code')
+             for shape, columns in FACT_KEYS.items()}
+
+
+def _key(*parts):
+    return json.dumps(parts, separators=(',', ':'))
+
+
+def compact_entry(shape, entry, courses):
+    """A requirement row without the course facts its course record already has"""
+    columns = FACT_KEYS[shape]
+    facts = courses.get(entry[CODE_KEYS[shape]]) or {}
+    values = {}
+    for key, value in entry.items():
+        column = columns.get(key)
+        if key != 'alternatives' and (column not in facts or facts[column] != value):
+            values[key] = value
+    compact = {"keys": list(entry), "values": values}
+    if 'alternatives' in entry:
+        compact['alternatives'] = [compact_entry(shape, alternative, courses) for alternative in entry['alternatives']]
+    return compact
+
+
+def expand_entry(shape, compact, courses):
+    """The requirement row compact_entry() was given"""
+    columns = FACT_KEYS[shape]
+    values = compact['values']
+    facts = courses.get(values[CODE_KEYS[shape]]) or {}
+    entry = {}
+    for key in compact['keys']:
+        if key == 'alternatives':
+            entry[key] = [expand_entry(shape, alternative, courses) for alternative in compact['alternatives']]
+        else:
+            entry[key] = values[key] if key in values else facts[columns[key]]
+    return entry
+
+
+def store_records(store):
+    """The store's content as records, keyed by their JSON keys"""
+    records = {}
+    courses = {}
+    for course in store.courses():
+        courses[course['code']] = {column: course[column] for column in CANONICAL_COLUMNS}
+        records[_key("course", course['code'])] = courses[course['code']]
+    for program in store.db.execute("SELECT export, shape, style FROM programs ORDER BY id").fetchall():
+        export, shape = program['export'], program['shape']
+        name, details, groups = READERS[shape](store.export_data(export))
+        layout = []
+        labels = {}
+        for kind, label, group_details, entries in groups:
+            m = labels[label] = labels.get(label, -1) + 1
+            listings = {}
+            order = []
+            for entry in entries:
+                code = entry[CODE_KEYS[shape]]
+                n = listings[code] = listings.get(code, -1) + 1
+                records[_key("requirement", export, label, m, code, n)] = compact_entry(shape, entry, courses)
+                order.append([code, n])
+            layout.append({"kind": kind, "label": label, "details": group_details, "requirements": order})
+        records[_key("program", export)] = {"name": name, "shape": shape, "details": details,
+                                            "style": json.loads(program['style']), "groups": layout}
+    return records
+
+
+def documents(records):
+    """{export: (JSON document, formatting style)} of the data files in a year's records"""
+    courses = {}
+    programs = {}
+    for key, value in records.items():
+        kind, *parts = json.loads(key)
+        if kind == "course":
+            courses[parts[0]] = value
+        elif kind == "program":
+            programs[parts[0]] = value
+    result = {}
+    for export, program in programs.items():
+        shape = program['shape']
+        groups = []
+        labels = {}
+        for group in program['groups']:
+            m = labels[group['label']] = labels.get(group['label'], -1) + 1
+            entries = [expand_entry(shape, records[_key("requirement", export, group['label'], m, code, n)], courses)
+                       for code, n in group['requirements']]
+            groups.append((group['kind'], group['label'], group['details'], entries))
+        result[export] = (WRITERS[shape](program['name'], program['details'], groups), program['style'])
+    return result
+
+
+def changes(old, new):
+    """Records of `new` that differ from `old`, with None for the ones it dropped"""
+    delta = {key: value for key, value in new.items() if old.get(key) != value}
+    delta.update((key, None) for key in old if key not in new)
+    return delta
+
+
+def _changed_fields(old, new):
+    fields = sorted(key for key in old['values'].keys() | new['values'].keys()
+                    if old['values'].get(key) != new['values'].get(key))
+    if old.get('alternatives') != new.get('alternatives'):
+        fields.append('alternatives')
+    if not fields and old['keys'] != new['keys']:
+        fields.append('keys')
+    return fields
+
+
+def _without_order(program):
+    return {**program, "groups": [{**group, "requirements": None} for group in program['groups']]}
+
+
+def diff_records(old, new):
+    """Course and requirement changes between two years' records
+
+    {"courses": {"added", "removed", "changed": {code: [fields]}},
+     "programs": {"added", "removed", "changed"},
+     "requirements": {export: {group label: {"added", "removed", "changed": {code: [fields]}}}}}
+    Requirement changes only cover what a program says about a course; changes
+    to the course itself (title, credits, prerequisites) are under "courses".
+    """
+    result = {"courses": {"added": [], "removed": [], "changed": {}},
+              "programs": {"added": [], "removed": [], "changed": []},
+              "requirements": {}}
+    for key in sorted(old.keys() | new.keys()):
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        kind, *parts = json.loads(key)
+        if kind == "course":
+            section, name = result['courses'], parts[0]
+        elif kind == "program":
+            section, name = result['programs'], parts[0]
+        else:
+            export, label, m, code, n = parts
+            group = label if m == 0 else f"{label} ({m + 1})"
+            section = result['requirements'].setdefault(export, {}).setdefault(
+                group, {"added": [], "removed": [], "changed": {}})
+            name = code
+        if before is None:
+            section['added'].append(name)
+        elif after is None:
+            section['removed'].append(name)
+        elif kind == "course":
+            section['changed'][name] = [column for column in CANONICAL_COLUMNS if before[column] != after[column]]
+        elif kind == "program":
+            # Changes to the order of requirements are already listed under "requirements"
+            if _without_order(before) != _without_order(after):
+                section['changed'].append(name)
+        else:
+            section['changed'][name] = _changed_fields(before, after)
+    return result
+
+
+def years_file(store):
+    """The years file of a store: src/data/catalog_years.json for the default store, None for any other"""
+    if os.path.abspath(store.path) != os.path.abspath(DEFAULT_DB):
+        return None
+    return os.path.join(store.data_dir, YEARS_FILE)
+
+
+class CatalogYears:
+    """Catalog years saved in a course store, each as its changes against the year before"""
+
+    def __init__(self, store, path=None):
+        """path is the JSON file the years are mirrored to and first loaded from (default: years_file(store))"""
+        self.store = store
+        self.path = path or years_file(store)
+        self.store.db.executescript(SCHEMA)
+        self.materialized = {}  # year -> records, shared by callers, who must not modify them
+        if not self.years() and self.path and os.path.exists(self.path):
+            self.load(self.path)
+
+    def years(self):
+        return [row[0] for row in self.store.db.execute("SELECT year FROM catalog_years ORDER BY year")]
+
+    def _changes(self, year):
+        return {key: json.loads(value) if value is not None else None for key, value in self.store.db.execute(
+            "SELECT key, value FROM year_changes WHERE year = ?", (year,))}
+
+    def _write_changes(self, year, delta):
+        self.store.db.execute("DELETE FROM year_changes WHERE year = ?", (year,))
+        self.store.db.executemany(
+            "INSERT INTO year_changes (year, key, value) VALUES (?, ?, ?)",
+            [(year, key, json.dumps(value, separators=(',', ':')) if value is not None else None)
+             for key, value in sorted(delta.items())])
+
+    def materialize(self, year):
+        """The records of a year, replayed from the nearest earlier year already rebuilt"""
+        if year in self.materialized:
+            return self.materialized[year]
+        years = self.years()
+        if year not in years:
+            raise KeyError(year)
+        position = years.index(year)
+        start = next((n for n in range(position - 1, -1, -1) if years[n] in self.materialized), None)
+        records = dict(self.materialized[years[start]]) if start is not None else {}
+        for replayed in years[(start + 1 if start is not None else 0):position + 1]:
+            for key, value in self._changes(replayed).items():
+                if value is None:
+                    records.pop(key, None)
+                else:
+                    records[key] = value
+            self.materialized[replayed] = dict(records)
+        return self.materialized[year]
+
+    def save(self, year, records=None):
+        """Record a year (by default the store's current content), replacing what was saved for it"""
+        if not YEAR_RE.match(year):
+            raise ValueError(f"catalog years look like 2025-2026, not {year}")
+        records = store_records(self.store) if records is None else records
+        years = [saved for saved in self.years() if saved != year]
+        earlier = [saved for saved in years if saved < year]
+        later = [saved for saved in years if saved > year]
+        base = self.materialize(earlier[-1]) if earlier else {}
+        following = self.materialize(later[0]) if later else None
+        delta = changes(base, records)
+        with self.store.db:
+            self.store.db.execute("INSERT OR REPLACE INTO catalog_years (year, saved) VALUES (?, ?)",
+                                  (year, datetime.now(timezone.utc).isoformat(timespec='seconds')))
+            self._write_changes(year, delta)
+            # The next year was stored against what this year used to be
+            if following is not None:
+                self._write_changes(later[0], changes(records, following))
+        self.materialized = {saved: value for saved, value in self.materialized.items() if saved < year}
+        self.materialized[year] = records
+        if self.path:
+            self.dump(self.path)
+        return len(delta)
+
+    def diff(self, old_year, new_year):
+        return diff_records(self.materialize(old_year), self.materialize(new_year))
+
+    def documents(self, year):
+        return documents(self.materialize(year))
+
+    def year_store(self, year):
+        """An in-memory course store holding one year's data files"""
+        store = CourseStore(":memory:", self.store.data_dir)
+        for export, (data, style) in self.documents(year).items():
+            store.import_data(export, data, style)
+        return store
+
+    def write(self, year, directory):
+        """Write a year's data files under directory; returns their paths"""
+        paths = []
+        for export, (data, style) in self.documents(year).items():
+            path = os.path.join(directory, export)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(format_json(data, style))
+            paths.append(path)
+        return paths
+
+    def summary(self):
+        """(year, saved, records changed) for every year"""
+        return [tuple(row) for row in self.store.db.execute(
+            "SELECT catalog_years.year, saved, COUNT(key) FROM catalog_years "
+            "LEFT JOIN year_changes ON year_changes.year = catalog_years.year "
+            "GROUP BY catalog_years.year ORDER BY catalog_years.year")]
+
+    def dump(self, path):
+        """Write every year's changes to a JSON file, one year per line"""
+        lines = []
+        for year, saved, _ in self.summary():
+            changes_json = json.dumps(dict(sorted(self._changes(year).items())), separators=(',', ':'))
+            lines.append(f'{json.dumps(year)}:{{"saved":{json.dumps(saved)},"changes":{changes_json}}}')
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{\n" + ",\n".join(lines) + "\n}\n")
+
+    def load(self, path):
+        """Replace the saved years with the ones in a file written by dump()"""
+        with open(path, encoding="utf-8") as f:
+            saved_years = json.load(f)
+        with self.store.db:
+            self.store.db.execute("DELETE FROM catalog_years")
+            for year, saved in saved_years.items():
+                self.store.db.execute("INSERT INTO catalog_years (year, saved) VALUES (?, ?)", (year, saved['saved']))
+                self._write_changes(year, saved['changes'])
+        self.materialized = {}
+
+
+def add_years_file_argument(parser):
+    parser.add_argument('--years-file', metavar='FILE',
+                        help="JSON file the catalog years are kept in besides the store (default: "
+                             "src/data/catalog_years.json for the default --db, none otherwise)")
+
+
+def add_year_arguments(parser):
+    """Register the catalog-year options of the scraper scripts"""
+    parser.add_argument('--catalog-year', metavar='YEAR',
+                        help="also save the scraped data as this catalog year, e.g. 2025-2026 (see catalog_years.py)")
+    add_years_file_argument(parser)
+
+
+def years_from_args(args, store):
+    return CatalogYears(store, args.years_file)
+
+
+def save_year_from_args(args, store):
+    if args.catalog_year:
+        changed = years_from_args(args, store).save(args.catalog_year)
+        print(f"Saved catalog year {args.catalog_year} ({changed} records changed since the year before)")
+
+
+def print_diff(diff):
+    courses = diff['courses']
+    for change in ["added", "removed"]:
+        if courses[change]:
+            print(f"Courses {change} ({len(courses[change])}): {', '.join(courses[change])}")
+    for code, fields in courses['changed'].items():
+        print(f"Course {code}: {', '.join(fields)} changed")
+    for change in ["added", "removed", "changed"]:
+        if diff['programs'][change]:
+            print(f"Data files {change}: {', '.join(diff['programs'][change])}")
+    for export, groups in diff['requirements'].items():
+        for group, section in groups.items():
+            print(f"{export}, {group}:")
+            for change in ["added", "removed"]:
+                if section[change]:
+                    print(f"  {change}: {', '.join(section[change])}")
+            for code, fields in section['changed'].items():
+                print(f"  {code}: {', '.join(fields)} changed")
+    if not any(courses[change] for change in courses) and not any(diff['programs'].values()) \
+            and not diff['requirements']:
+        print("No changes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save, compare and export catalog years of the course data")
+    add_store_arguments(parser)
+    add_years_file_argument(parser)
+    commands = parser.add_subparsers(dest='command', required=True)
+    save = commands.add_parser('save', help="record the store's current content as a catalog year")
+    save.add_argument('year', help="catalog year, e.g. 2025-2026")
+    commands.add_parser('list', help="list the saved catalog years")
+    diff = commands.add_parser('diff', help="course and requirement changes between two catalog years")
+    diff.add_argument('old_year')
+    diff.add_argument('new_year')
+    diff.add_argument('--json', action='store_true', help="print the changes as JSON")
+    export = commands.add_parser('export', help="write a catalog year's data files")
+    export.add_argument('year')
+    export.add_argument('--output-dir', required=True, help="directory to write the files to")
+    args = parser.parse_args(argv)
+
+    with store_from_args(args) as store:
+        years = years_from_args(args, store)
+        if args.command == 'save':
+            try:
+                changed = years.save(args.year)
+            except ValueError as e:
+                parser.error(str(e))
+            print(f"Saved {args.year}: {changed} records changed since the year before")
+            return
+        if args.command == 'list':
+            for year, saved, changed in years.summary():
+                print(f"{year}  saved {saved}  {changed} records changed")
+            return
+        try:
+            if args.command == 'diff':
+                result = years.diff(args.old_year, args.new_year)
+                if args.json:
+                    print(json.dumps(result, indent=2))
+                else:
+                    print_diff(result)
+            else:
+                for path in years.write(args.year, args.output_dir):
+                    print(path)
+        except KeyError as e:
+            parser.error(f"no catalog year {e.args[0]}; saved: {', '.join(years.years()) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
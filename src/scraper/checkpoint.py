@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+
+# Append-only NDJSON checkpoint of a scrape run. The first line identifies the
+# run, then every finished prerequisite lookup is appended as soon as it
+# completes:
+#
+#   {"run": "https://catalog.tamu.edu/undergraduate/.../computer-engineering-bs/"}
+#   {"course": "CSCE 221", "prereqs": "Grade of C or better in CSCE 120 ..."}
+#   {"course": "MATH 251", "error": "HTTPSConnectionPool(...): Read timed out."}
+#
+# A later line for the same course supersedes earlier ones, so retrying a
+# failed lookup just appends its new result.
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "checkpoints")
+
+
+class Checkpoint:
+    """Completed and failed lookups of a run, streamed to an NDJSON file
+
+    With resume=True the lookups already in the file are loaded (when it was
+    written for the same run) and new ones are appended; otherwise the file
+    starts over.
+    """
+
+    def __init__(self, path, run, resume=False):
+        self.path = path
+        self.completed = {}
+        self.failed = {}
+        self.lock = threading.Lock()
+        if resume and self._read(run):
+            self.file = open(path, "a")
+            if self.partial_line:
+                self.file.write("\n")
+        else:
+            if resume:
+                print(f"No checkpoint for this run at {path}; starting from scratch")
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.file = open(path, "w")
+            self._append({"run": run})
+
+    def _read(self, run):
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+        try:
+            if json.loads(lines[0]).get("run") != run:
+                return False
+        except (IndexError, ValueError):
+            return False
+        self.partial_line = not lines[-1].endswith("\n")
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            self._apply(entry)
+        return True
+
+    def _apply(self, entry):
+        code = entry['course']
+        if 'error' in entry:
+            self.completed.pop(code, None)
+            self.failed[code] = entry['error']
+        else:
+            self.failed.pop(code, None)
+            self.completed[code] = entry['prereqs']
+
+    def _append(self, entry):
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def record(self, course_code, prereqs):
+        entry = {"course": course_code, "prereqs": prereqs}
+        with self.lock:
+            self._apply(entry)
+            self._append(entry)
+
+    def fail(self, course_code, error):
+        entry = {"course": course_code, "error": str(error)}
+        with self.lock:
+            self._apply(entry)
+            self._append(entry)
+
+    def close(self):
+        self.file.close()
+
+    def remove(self):
+        """Close and delete the checkpoint once its results have been written out"""
+        self.close()
+        os.remove(self.path)
+
+
+def add_checkpoint_arguments(parser):
+    """Register the checkpoint/resume options shared by the scraper scripts"""
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted or failed run, skipping lookups its checkpoint already completed")
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help=f"NDJSON checkpoint file (default: <output name>.ndjson in {DEFAULT_CHECKPOINT_DIR})")
+
+
+def checkpoint_from_args(args, output_file, run):
+    """Open the Checkpoint selected by add_checkpoint_arguments() options for an output file"""
+    name = os.path.splitext(os.path.basename(output_file))[0] + ".ndjson"
+    path = args.checkpoint or os.path.join(DEFAULT_CHECKPOINT_DIR, name)
+    return Checkpoint(path, run, resume=args.resume)
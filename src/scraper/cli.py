@@ -0,0 +1,56 @@
+import argparse
+import importlib
+import os
+import sys
+
+# One entry point for the scraper tools, a subcommand per tool:
+#
+#   python cli.py scrape ce --bulk
+#   python cli.py store export --check
+#   python cli.py plan transcripts.csv --processes 4
+#   python cli.py scrape ce --help
+#
+# A subcommand's module is imported only once it runs, and the scraping
+# libraries (bs4, requests, lxml, selectolax) only once a page is fetched or
+# parsed. --help, cache and store commands therefore start without them.
+
+COMMANDS = {
+    # name: (module, function taking the remaining arguments, summary)
+    "scrape": ("catalog", "main", "scrape a program (ce, math-minor) into its data file, or run jobs with --worker"),
+    "crawl": ("crawler", "main", "scrape many program pages into src/data/programs"),
+    "store": ("course_store", "main", "build, export and query the SQLite course store"),
+    "bundle": ("data_bundle", "main", "export the sharded, compressed data bundle"),
+    "search": ("search_index", "main", "build or query the course search index"),
+    "ranges": ("course_ranges", "main", "list the courses of a range such as \"MATH 300-499\""),
+    "years": ("catalog_years", "main", "save, compare and export catalog years"),
+    "plan": ("degree_plan", "main", "generate degree plans for a batch of transcripts"),
+    "serve": ("course_api", "main", "serve course details and eligibility checks over HTTP"),
+    "graph": ("prereq_graph", "main", "build the precomputed prerequisite graph"),
+    "compile": ("prereq_compiler", "main", "add compiled prerequisite trees to course files"),
+    "cache": ("http_cache", "main", "inspect or prune the on-disk HTTP cache"),
+}
+
+
+def run(command, argv=()):
+    """Run a subcommand with its arguments"""
+    module, function, _ = COMMANDS[command]
+    return getattr(importlib.import_module(module), function)(list(argv))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Scrape, store and serve the course catalog data",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:10}{summary}" for name, (_, _, summary) in COMMANDS.items())
+               + "\n\nRun a command with --help for its options.")
+    parser.add_argument('command', choices=list(COMMANDS), metavar='command', help="one of the commands below")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="the command's arguments")
+    args = parser.parse_args(argv)
+
+    # The command's own usage and errors read "cli.py <command>"
+    sys.argv[0] = f"{os.path.basename(sys.argv[0])} {args.command}"
+    return run(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+
+from course_store import add_store_arguments, store_from_args
+from degree_plan import DEFAULT_CREDITS, classification
+from prereq_compiler import (CLASS_LEVELS, MET, REVIEW, UNMET, course_codes, evaluate, grade_passes,
+                             unmet_clauses)
+
+# Local HTTP API over the course data for planners shared by many advisors.
+# The courses are loaded from the store once at startup, together with a
+# reverse prerequisite index, and answers for a transcript are kept in an LRU
+# cache keyed by a hash of the transcript, so repeated checks while an advisor
+# edits a plan cost a dictionary lookup.
+#
+#   python course_api.py --port 8765
+#
+#   GET  /courses?codes=CSCE 221,MATH 151   course details, null for unknown codes
+#   POST /eligibility                       {"transcript": {...}, "courses": ["CSCE 221", ...]}
+#                                           -> {"CSCE 221": {"eligible": false, "status": "unmet",
+#                                                            "missing": ["CSCE 120", "CSCE 121"]}}
+#   POST /unlocked                          {"transcript": {...}}
+#                                           -> courses the transcript now qualifies for that build on it
+#   GET  /stats                             request and cache counters
+#
+# A transcript is {"completed": {code: grade or null} or [codes], "enrolled":
+# [codes], "placements": [...], "classification": "junior", "strict": false}.
+# enrolled lists the courses taken this semester, for prerequisites that allow
+# concurrent enrollment; classification defaults to the one its credit hours
+# give. status is "met", "unmet" or "review" (only approval, equivalent or
+# free-text prerequisites are left), and review counts as eligible unless
+# strict. missing lists the courses of the unmet requirements, where any one
+# of a requirement's alternatives would do.
+#
+# Standard library only: asyncio streams and a minimal HTTP/1.1 parser with
+# keep-alive, meant to run on localhost or behind a reverse proxy.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 4096  # transcripts whose answers are kept
+MAX_BODY = 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used key"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+def _codes(data, field):
+    values = data.get(field) or []
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise HttpError(400, f"{field} must be a list of strings")
+    return values
+
+
+class Transcript:
+    """A request's transcript, normalized so equal transcripts hash alike"""
+
+    def __init__(self, data, credits):
+        if not isinstance(data, dict):
+            raise HttpError(400, "transcript must be an object")
+        completed = data.get('completed') or {}
+        if isinstance(completed, list) and all(isinstance(code, str) for code in completed):
+            completed = dict.fromkeys(completed)
+        elif not (isinstance(completed, dict)
+                  and all(grade is None or isinstance(grade, str) for grade in completed.values())):
+            raise HttpError(400, "completed must be a list of course codes or an object of codes to grades")
+        self.completed = dict(sorted(completed.items()))
+        self.enrolled = sorted(set(_codes(data, 'enrolled')))
+        self.placements = sorted(set(_codes(data, 'placements')))
+        level = data.get('classification')
+        if level is not None and (not isinstance(level, str) or level.lower() not in CLASS_LEVELS):
+            raise HttpError(400, f"classification must be one of {', '.join(CLASS_LEVELS)}")
+        self.classification = level.lower() if level else classification(
+            sum(credits.get(code, DEFAULT_CREDITS) for code, grade in self.completed.items() if grade_passes(grade)))
+        self.strict = data.get('strict', False)
+        if not isinstance(self.strict, bool):
+            raise HttpError(400, "strict must be true or false")
+        self.accepted = {MET} if self.strict else {MET, REVIEW}
+        key = [self.completed, self.enrolled, self.placements, self.classification, self.strict]
+        self.hash = hashlib.sha256(json.dumps(key, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+class CourseService:
+    """Course lookups and eligibility answers over an in-memory copy of the store"""
+
+    def __init__(self, courses, cache_size=DEFAULT_CACHE_SIZE):
+        self.courses = courses
+        self.credits = {code: course['credits'] for code, course in courses.items() if course['credits'] is not None}
+        # code -> courses whose prerequisites mention it
+        self.unlocks = {}
+        self.prereq_codes = {}
+        for code, course in courses.items():
+            self.prereq_codes[code] = course_codes(course['prereq_tree'])
+            for prereq in self.prereq_codes[code]:
+                self.unlocks.setdefault(prereq, []).append(code)
+        # transcript hash -> {"eligibility": {code: answer}, "unlocked": [...] once computed}
+        self.cache = LRUCache(cache_size)
+        self.requests = 0
+
+    @classmethod
+    def from_store(cls, store, cache_size=DEFAULT_CACHE_SIZE):
+        return cls({course['code']: course for course in store.courses()}, cache_size)
+
+    def _answers(self, transcript):
+        answers = self.cache.get(transcript.hash)
+        if answers is None:
+            answers = {"eligibility": {}, "unlocked": None}
+            self.cache.put(transcript.hash, answers)
+        return answers
+
+    def _eligibility(self, code, transcript):
+        course = self.courses[code]
+        student = (transcript.completed, transcript.enrolled, transcript.classification, transcript.placements)
+        status = evaluate(course['prereq_tree'], *student)
+        answer = {"eligible": status in transcript.accepted, "status": status}
+        if status == UNMET:
+            answer["missing"] = [prereq for clause in unmet_clauses(course['prereq_tree'], *student)
+                                 for prereq in course_codes(clause)]
+        return answer
+
+    def course_details(self, codes):
+        return {code: self.courses.get(code) for code in codes}
+
+    def eligibility(self, transcript, codes, answers=None):
+        """{code: {"eligible", "missing"}} for each code; unknown codes map to None"""
+        cached = (answers or self._answers(transcript))['eligibility']
+        result = {}
+        for code in codes:
+            if code not in self.courses:
+                result[code] = None
+                continue
+            if code not in cached:
+                cached[code] = self._eligibility(code, transcript)
+            result[code] = cached[code]
+        return result
+
+    def unlocked(self, transcript):
+        """Courses not yet taken whose prerequisites the transcript meets and mention one of its courses"""
+        answers = self._answers(transcript)
+        if answers['unlocked'] is None:
+            candidates = sorted({code for completed in transcript.completed for code in self.unlocks.get(completed, ())
+                                 if code not in transcript.completed})
+            answers['unlocked'] = [code for code, answer in self.eligibility(transcript, candidates, answers).items()
+                                   if answer['eligible']]
+        return answers['unlocked']
+
+    def stats(self):
+        return {"courses": len(self.courses), "requests": self.requests,
+                "cache": {"transcripts": len(self.cache.entries), "size": self.cache.size,
+                          "hits": self.cache.hits, "misses": self.cache.misses}}
+
+    def handle(self, method, target, body):
+        """(status, JSON-ready result) for one request"""
+        self.requests += 1
+        url = urlsplit(target)
+        if url.path == "/courses":
+            if method != "GET":
+                raise HttpError(405, "use GET")
+            codes = [code.strip() for value in parse_qs(url.query).get('codes', []) for code in value.split(',')]
+            return 200, self.course_details([code for code in codes if code])
+        if url.path == "/stats":
+            return 200, self.stats()
+        if url.path not in ("/eligibility", "/unlocked"):
+            raise HttpError(404, f"no such endpoint: {url.path}")
+        if method != "POST":
+            raise HttpError(405, "use POST")
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError as e:
+            raise HttpError(400, f"invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise HttpError(400, "request body must be an object")
+        transcript = Transcript(data.get('transcript', {}), self.credits)
+        if url.path == "/eligibility":
+            if not isinstance(data.get('courses'), list):
+                raise HttpError(400, "courses must be a list of course codes")
+            return 200, self.eligibility(transcript, _codes(data, 'courses'))
+        return 200, self.unlocked(transcript)
+
+
+async def read_request(reader):
+    """(method, target, keep_alive, body) of the next request on a connection, or None once it closes"""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HttpError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b''
+    keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+    return method, target, keep_alive, body
+
+
+def response(status, result, keep_alive):
+    body = json.dumps(result, separators=(',', ':')).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def serve_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, keep_alive, body = request
+                status, result = service.handle(method, target, body)
+            except HttpError as e:
+                status, result, keep_alive = e.status, {"error": str(e)}, False
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                status, result, keep_alive = 500, {"error": f"{type(e).__name__}: {e}"}, False
+            writer.write(response(status, result, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = await asyncio.start_server(lambda reader, writer: serve_connection(service, reader, writer), host, port)
+    print(f"Serving {len(service.courses)} courses on http://{host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve course details and eligibility checks over HTTP")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on (default %(default)s)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on (default %(default)s)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help="transcripts whose eligibility answers are cached (default %(default)s)")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with store_from_args(args) as store:
+        service = CourseService.from_store(store, args.cache_size)
+    print(f"Loaded the course data in {time.perf_counter() - start:.2f}s")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
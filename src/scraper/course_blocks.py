@@ -0,0 +1,190 @@
+import html as html_lib
+import re
+
+from metrics import METRICS
+
+# Whole-page search patterns for prerequisite text, tried in order. Only used
+# for pages that have no course blocks to target.
+LEGACY_PREREQ_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in [
+    r'prerequisite[s]?[:\s]*(.*?)(?:\n|\.|$)',
+    r'prereq[s]?[:\s]*(.*?)(?:\n|\.|$)',
+    r'corequisite[s]?[:\s]*(.*?)(?:\n|\.|$)',
+    r'co-requisite[s]?[:\s]*(.*?)(?:\n|\.|$)',
+    r'concurrent[s]?[:\s]*(.*?)(?:\n|\.|$)'
+]]
+
+# A labelled requisite statement runs to the end of its sentence, its line or the next label
+_STATEMENT_END = r'(?=\n|\.(?:\s|$)|\b(?:prerequisites?|co-?requisites?|cross[- ]listings?)\s*:|$)'
+PREREQ_FIELD_RE = re.compile(r'\bprerequisites?\s*:\s*(.*?)' + _STATEMENT_END, re.IGNORECASE | re.DOTALL)
+COREQ_FIELD_RE = re.compile(r'\bco-?requisites?\s*:\s*(.*?)' + _STATEMENT_END, re.IGNORECASE | re.DOTALL)
+CONCURRENT_CLAUSE_RE = re.compile(r'concurrent(?:ly)?\s+enrol|registration\s+therein', re.IGNORECASE)
+CAMPUS_RE = re.compile(r';?\s*also taught at[^;]*?campus(?:es)?\.?', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+COURSE_CODE_RE = re.compile(r'([A-Z]{2,4})\s*(\d{3})')
+# Leading "CSCE 222/ECEN 222" style code list of a course block heading
+HEADING_CODES_RE = re.compile(r'^\s*([A-Z]{2,4}\s*\d{3}(?:\s*/\s*[A-Z]{2,4}\s*\d{3})*)')
+CREDITS_RE = re.compile(r'Credits?\s+(\d+(?:\.\d+)?)', re.IGNORECASE)
+# Raw-markup scanning for course_block_fragments(), which never builds a tree
+COURSEBLOCK_START_RE = re.compile(r'<div\b[^>]*\bclass\s*=\s*["\'][^"\']*\bcourseblock\b(?!-)', re.IGNORECASE)
+DIV_TAG_RE = re.compile(r'<(/?)div\b', re.IGNORECASE)
+TITLE_START_RE = re.compile(r'\bcourseblocktitle\b[^>]*>', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]*>')
+DESCRIPTION_END_RE = re.compile(r'\b(?:prerequisites?|co-?requisites?|cross[- ]listings?)\s*:', re.IGNORECASE)
+
+
+def _clean(text):
+    return WHITESPACE_RE.sub(' ', text.replace('\u200b', '').replace('\u00a0', ' ')).strip()
+
+
+def _clean_requisite(text):
+    # Remove campus location information and dangling separators
+    return CAMPUS_RE.sub('', _clean(text)).strip(' ;,')
+
+
+@METRICS.timed("regex extract")
+def extract_prerequisites(text):
+    """Pull the first prerequisite statement out of a whole page of catalog text"""
+    for pattern in LEGACY_PREREQ_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return _clean_requisite(match.group(1))
+
+    return ""
+
+
+@METRICS.timed("regex extract")
+def extract_requisites(text):
+    """Split a course block's text into prerequisite, corequisite and concurrent-enrollment statements
+
+    Returns {"prereqs", "coreqs", "concurrent"}; "concurrent" holds the
+    prerequisite clauses that may be satisfied by concurrent enrollment.
+    """
+    prereq_match = PREREQ_FIELD_RE.search(text)
+    coreq_match = COREQ_FIELD_RE.search(text)
+    prereqs = _clean_requisite(prereq_match.group(1)) if prereq_match else ""
+    coreqs = _clean_requisite(coreq_match.group(1)) if coreq_match else ""
+    concurrent = "; ".join(
+        clause.strip() for clause in prereqs.split(';') if CONCURRENT_CLAUSE_RE.search(clause)
+    )
+    return {"prereqs": prereqs, "coreqs": coreqs, "concurrent": concurrent}
+
+
+def requisite_text(requisites):
+    """Text stored in a course record's `prereqs` field: the prerequisites, or the corequisites if that's all there is"""
+    return requisites['prereqs'] or requisites['coreqs']
+
+
+def _block_heading(block):
+    """Return (codes, title) from a course block's heading, or (None, None)"""
+    title_tag = block.find(class_='courseblocktitle')
+    if title_tag is None:
+        return None, None
+    heading = _clean(title_tag.get_text(' '))
+    heading_match = HEADING_CODES_RE.match(heading)
+    if not heading_match:
+        return None, None
+    codes = [f"{dept} {num}" for dept, num in COURSE_CODE_RE.findall(heading_match.group(1))]
+    return list(dict.fromkeys(codes)), heading[heading_match.end():].strip(' :-')
+
+
+def _block_text(block):
+    # Line breaks separate the description, requisites and cross listings
+    for br in block.find_all('br'):
+        br.replace_with('\n')
+    desc_tag = block.find(class_='courseblockdesc')
+    return (desc_tag or block).get_text(), desc_tag is not None
+
+
+@METRICS.timed("html parse")
+def _course_blocks(html):
+    # Skip the page chrome ahead of the first course block before tokenizing anything
+    first = html.find('courseblock')
+    if first == -1:
+        return []
+    start = max(html.rfind('<div', 0, first), 0)
+    # bs4 is only imported once a page needs a tree; only its course blocks are built
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html[start:], "html.parser", parse_only=SoupStrainer('div', class_='courseblock'))
+    return soup.find_all('div', class_='courseblock')
+
+
+def div_fragment(html, start):
+    """Raw markup of the <div> element opening at `start`, found by counting nested div tags"""
+    depth = 0
+    for match in DIV_TAG_RE.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return html[start:html.find('>', match.end()) + 1]
+    return html[start:]
+
+
+@METRICS.timed("regex extract")
+def course_block_fragments(html):
+    """Map each course code on a page to the raw markup of its course block
+
+    Only string scanning is done here, so callers can hash a course's block
+    and skip parsing it when it hasn't changed. Cross-listed courses map to
+    the same fragment; the page's first block for a code wins.
+    """
+    fragments = {}
+    for match in COURSEBLOCK_START_RE.finditer(html):
+        fragment = div_fragment(html, match.start())
+        title_match = TITLE_START_RE.search(fragment)
+        if not title_match:
+            continue
+        heading = _clean(html_lib.unescape(TAG_RE.sub(' ', fragment[title_match.end():title_match.end() + 500])))
+        heading_match = HEADING_CODES_RE.match(heading)
+        if heading_match:
+            for dept, num in COURSE_CODE_RE.findall(heading_match.group(1)):
+                fragments.setdefault(f"{dept} {num}", fragment)
+    return fragments
+
+
+def extract_course_requisites(html, course_code):
+    """Requisites of one course, read only from its own course block on a catalog page
+
+    Returns None when the page has no course blocks at all, and empty
+    statements when none of its blocks belongs to course_code.
+    """
+    blocks = _course_blocks(html)
+    if not blocks:
+        return None
+    for block in blocks:
+        codes, _ = _block_heading(block)
+        if codes and course_code in codes:
+            text, _ = _block_text(block)
+            return extract_requisites(text)
+    return {"prereqs": "", "coreqs": "", "concurrent": ""}
+
+
+def parse_course_blocks(html):
+    """Parse every `div.courseblock` on a catalog page into {code: details}
+
+    details is {"title", "credits", "prereqs", "coreqs", "concurrent",
+    "description"}; cross-listed courses ("CSCE 222/ECEN 222") are indexed
+    under each of their codes.
+    """
+    courses = {}
+
+    for block in _course_blocks(html):
+        codes, title = _block_heading(block)
+        if not codes:
+            continue
+
+        credits = None
+        hours_tag = block.find(class_='hours')
+        credit_match = CREDITS_RE.search(hours_tag.get_text(' ')) if hours_tag else None
+        if credit_match:
+            value = float(credit_match.group(1))
+            credits = int(value) if value.is_integer() else value
+
+        text, has_description = _block_text(block)
+        description = _clean(DESCRIPTION_END_RE.split(text, maxsplit=1)[0]) if has_description else ""
+
+        details = {"title": title, "credits": credits, **extract_requisites(text), "description": description}
+        for code in codes:
+            courses.setdefault(code, details)
+
+    return courses
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from course_blocks import course_block_fragments, parse_course_blocks
+from http_cache import fetch_page
+
+
+def department_url(department, catalog_url):
+    """URL of a department's course-description page, e.g. .../course-descriptions/csce/"""
+    return f"{catalog_url}/undergraduate/course-descriptions/{department.lower()}/"
+
+
+class DepartmentIndex:
+    """In-memory index of course code -> {title, credits, prereqs, description}
+
+    Built from one course-description page per department, so resolving N
+    courses costs one request per department instead of one per course.
+    Departments are loaded on first use; load() fetches several at once.
+    A department whose page can't be read is not marked loaded, so the next
+    load() or lookup() tries it again; its error is kept in `errors`. With a
+    manifest, only course blocks that changed since the last run are parsed.
+    """
+
+    def __init__(self, catalog_url, cache=None, client=None, manifest=None):
+        self.catalog_url = catalog_url
+        self.cache = cache
+        self.client = client
+        self.manifest = manifest
+        self.courses = {}
+        self.loaded = set()
+        self.errors = {}  # department -> exception of its last failed load
+        self.lock = threading.Lock()
+
+    def _load_department(self, department):
+        try:
+            print(f"  Fetching course descriptions for {department}...")
+            url = department_url(department, self.catalog_url)
+            html = fetch_page(url, self.cache, self.client)
+            if self.manifest is None:
+                courses = parse_course_blocks(html)
+            else:
+                courses = {}
+                for code, fragment in course_block_fragments(html).items():
+                    details = self.manifest.parse("courses", code, url, fragment,
+                                                  lambda: parse_course_blocks(fragment).get(code))
+                    if details is not None:
+                        courses[code] = details
+        except Exception as e:
+            print(f"Error fetching course descriptions for {department}: {e}")
+            with self.lock:
+                self.errors[department] = e
+            return
+        with self.lock:
+            for code, details in courses.items():
+                self.courses.setdefault(code, details)
+            self.loaded.add(department)
+            self.errors.pop(department, None)
+
+    def load(self, departments, concurrency=1):
+        """Fetch every department page not loaded yet, `concurrency` at a time; failures are left in `errors`"""
+        pending = [dept for dept in dict.fromkeys(departments) if dept not in self.loaded]
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            list(pool.map(self._load_department, pending))
+
+    def lookup(self, course_code):
+        """Details for a course code, or None if its department page doesn't list it
+
+        Raises the fetch error when the department's page can't be read.
+        """
+        department = course_code.split()[0]
+        if department not in self.loaded:
+            self.load([department])
+            if department not in self.loaded:
+                raise self.errors[department]
+        return self.courses.get(course_code)
@@ -0,0 +1,218 @@
+from bisect import bisect_left, bisect_right, insort
+import argparse
+import os
+import re
+
+from course_blocks import requisite_text
+from course_index import DepartmentIndex
+from course_store import COURSE_CODE_RE, add_store_arguments, store_from_args
+from manifest import write_if_changed
+from prereq_compiler import annotate_courses
+
+# Resolves course-range requirements such as "MATH 300-499" to the concrete
+# courses they allow.
+#
+# Each department's course numbers are kept sorted, so a range is a bisect
+# slice and "does MATH 409 satisfy MATH 300-499 or MATH 221" is an O(log n)
+# lookup. During a scrape, the departments that ranges point at are read in
+# bulk (one course-description page each, see course_index.py) and:
+#   - written as data files of their own, src/data/departments/<DEPT>.json in
+#     the ce_courses.json schema, so every course in a range has its
+#     prerequisites in the course store
+#   - used to list the courses a range allows, in a "courses" key next to the
+#     range's placeholder prerequisites
+#
+#   python course_ranges.py "MATH 300-499"
+#   python course_ranges.py "MATH 300-499" --check "MATH 409"
+
+RANGE_RE = re.compile(r'^([A-Z]{2,4}) (\d{3})-(\d{3})$')
+DEPARTMENTS_DIR = "departments"  # under src/data
+
+
+def parse_range(code):
+    """(department, low, high) of a range such as "MATH 300-499", or None"""
+    match = RANGE_RE.match(code)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def department_export(department):
+    """Data file of a department's courses, relative to src/data"""
+    return f"{DEPARTMENTS_DIR}/{department}.json"
+
+
+class CourseNumbers:
+    """Sorted course numbers per department, for range queries by bisection"""
+
+    def __init__(self, codes=()):
+        self.numbers = {}
+        for code in codes:
+            self.add(code)
+
+    @classmethod
+    def from_store(cls, store, departments=None):
+        """Index of the store's courses, of every department or just the given ones"""
+        numbers = cls()
+        for department in departments if departments is not None else store.departments():
+            # Rows come in number order, so the lists are built already sorted
+            numbers.numbers[department] = [course['number'] for course in store.department(department)]
+        return numbers
+
+    def add(self, code):
+        match = COURSE_CODE_RE.match(code)
+        if not match:
+            return
+        numbers = self.numbers.setdefault(match.group(1), [])
+        number = int(match.group(2))
+        position = bisect_left(numbers, number)
+        if position == len(numbers) or numbers[position] != number:
+            insort(numbers, number)
+
+    def in_range(self, department, low, high):
+        """Codes of the department's courses numbered low to high, in order"""
+        numbers = self.numbers.get(department, [])
+        return [f"{department} {number}"
+                for number in numbers[bisect_left(numbers, low):bisect_right(numbers, high)]]
+
+    def contains(self, code):
+        match = COURSE_CODE_RE.match(code)
+        if not match:
+            return False
+        numbers = self.numbers.get(match.group(1), [])
+        number = int(match.group(2))
+        position = bisect_left(numbers, number)
+        return position < len(numbers) and numbers[position] == number
+
+    def expand(self, code):
+        """Courses a requirement code stands for: a range's courses, or the code itself"""
+        bounds = parse_range(code)
+        return self.in_range(*bounds) if bounds else [code]
+
+    def satisfies(self, code, options):
+        """True when a course fulfils one of a group's options (codes or ranges)"""
+        match = COURSE_CODE_RE.match(code)
+        for option in options:
+            if option == code:
+                return True
+            bounds = parse_range(option)
+            if (bounds and match and match.group(1) == bounds[0] and bounds[1] <= int(match.group(2)) <= bounds[2]
+                    and self.contains(code)):
+                return True
+        return False
+
+
+def _options(courses):
+    """Plain course rows and the alternatives of choices (a choice's own code is just its first option's)"""
+    for course in courses:
+        yield from course.get('alternatives') or [course]
+
+
+def range_departments(courses):
+    """Departments that the range options of walked course records draw on, in order"""
+    departments = []
+    for entry in _options(courses):
+        bounds = parse_range(entry['course'])
+        if bounds and bounds[0] not in departments:
+            departments.append(bounds[0])
+    return departments
+
+
+def department_courses(index, department):
+    """Course records (ce_courses.json schema, prerequisite trees compiled) of a loaded department, by number"""
+    entries = []
+    for code, details in sorted(index.courses.items()):
+        match = COURSE_CODE_RE.match(code)
+        if not match or match.group(1) != department:
+            continue
+        entries.append({"course": code, "name": details['title'], "credits": details['credits'],
+                        "prereqs": requisite_text(details)})
+    return annotate_courses(entries)
+
+
+def expand_course_ranges(courses, numbers):
+    """List the concrete courses of every range option in walked course records; returns how many ranges"""
+    expanded = 0
+    for entry in _options(courses):
+        bounds = parse_range(entry['course'])
+        if bounds and bounds[0] in numbers.numbers:
+            entry['courses'] = numbers.in_range(*bounds)
+            expanded += 1
+    return expanded
+
+
+def resolve_course_ranges(courses, catalog_url, cache=None, client=None, manifest=None, concurrency=1, index=None):
+    """Read the departments the courses' ranges draw on and expand the ranges
+
+    Returns {department: course records} for the departments whose
+    course-description page could be read; ranges into any other department
+    are left as they were. Pages already in `index` (a DepartmentIndex) are
+    not read again.
+    """
+    departments = range_departments(courses)
+    if not departments:
+        return {}
+    index = index or DepartmentIndex(catalog_url, cache, client, manifest)
+    index.load(departments, concurrency)
+    catalogs = {}
+    for department in departments:
+        entries = department_courses(index, department)
+        if entries:
+            catalogs[department] = entries
+        else:
+            print(f"No courses found for {department}; its ranges are kept as placeholders")
+    numbers = CourseNumbers(entry['course'] for entries in catalogs.values() for entry in entries)
+    expand_course_ranges(courses, numbers)
+    return catalogs
+
+
+def department_program(department):
+    """Program name a department's courses are stored under"""
+    return f"{department} Courses"
+
+
+def save_departments(store, catalogs):
+    """Store each department's course records and write its data file, if changed; returns the files written"""
+    os.makedirs(os.path.join(store.data_dir, DEPARTMENTS_DIR), exist_ok=True)
+    written = []
+    for department, entries in catalogs.items():
+        export = department_export(department)
+        store.save_program(export, department_program(department), entries)
+        entries = store.export_data(export)[department_program(department)]
+        if write_if_changed(os.path.join(store.data_dir, export), department_program(department), entries)[0]:
+            written.append(export)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the courses a range such as \"MATH 300-499\" allows")
+    parser.add_argument('range', help="course range, e.g. \"MATH 300-499\"")
+    parser.add_argument('--check', metavar='CODE', help="only report whether this course satisfies the range")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    bounds = parse_range(args.range)
+    if bounds is None:
+        parser.error(f"{args.range} is not a course range like \"MATH 300-499\"")
+    with store_from_args(args) as store:
+        numbers = CourseNumbers.from_store(store, [bounds[0]])
+        if args.check:
+            satisfied = numbers.satisfies(args.check, [args.range])
+            print(f"{args.check} {'satisfies' if satisfied else 'does not satisfy'} {args.range}")
+            if not satisfied:
+                raise SystemExit(1)
+            return
+        codes = numbers.in_range(*bounds)
+        for code in codes:
+            course = store.course(code)
+            print(f"{code:10}{course['credits'] if course['credits'] is not None else '':>4}  {course['title']}")
+            if course['prereqs']:
+                print(f"{'':14}Prerequisites: {course['prereqs']}")
+        print(f"{len(codes)} courses in {args.range}")
+        if not os.path.exists(os.path.join(store.data_dir, department_export(bounds[0]))):
+            print(f"Only courses some program lists are known; scraping a program with a {bounds[0]} range "
+                  f"adds the whole department")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,578 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+
+# Canonical SQLite store for the course data in src/data.
+#
+# The data files list the same courses in different shapes:
+#   program     {"Computer Engineering": [{"course", "name", "credits", "prereqs", ...}]}
+#               (ce_courses.json, math_minor_courses.json, crawler output)
+#   categories  {"University Core Curriculum": {category: {..., "courses": [{"code", "title", "hours"}]}}}
+#   tracks      {"Computer Engineering Area Electives": {"Overview", "Depth Tracks": [{"Track Name",
+#               "Courses": [{"Course", "Name", "Credits"}]}]}}
+#   plan        {"name", ..., "courses": [{"year", "semester", "totalHours", "courses": [{"code", "title", "hours"}]}]}
+#
+# The store keeps one row per course in `courses` (title, credits,
+# prerequisites; indexed by code, department and level), and each file as a
+# program whose requirement groups (categories, tracks, semesters) list
+# requirement rows pointing at course codes. A requirement only stores the
+# facts that differ from the course's canonical row, so a course is stored
+# once however many programs list it. The JSON files are exports of the
+# store and come out byte for byte as they were imported.
+#
+#   python course_store.py build            # (re)import every JSON file in src/data
+#   python course_store.py export --check   # regenerate the JSON files, or just check they're current
+#   python course_store.py course "CSCE 221"
+#   python course_store.py department CSCE --level 400
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+DEFAULT_DB = os.path.join(DATA_DIR, "courses.sqlite")
+
+# Files imported by `build`, in order; program files under programs/ follow
+DATA_FILES = ["ce_courses.json", "math_minor_courses.json", "cpen.json", "area_cpen.json", "core_curriculum.json"]
+
+COURSE_CODE_RE = re.compile(r'^([A-Z]{2,4}) (\d{3})$')
+
+# Course facts kept in the canonical courses row; prereq_tree is stored as JSON text
+CANONICAL_COLUMNS = ["title", "credits", "prereqs", "prereq_tree"]
+JSON_COLUMNS = {"prereq_tree"}
+
+# Each shape's entry keys for the canonical course columns
+FACT_KEYS = {
+    "program": {"course": "code", "name": "title", "credits": "credits", "prereqs": "prereqs",
+                "prereq_tree": "prereq_tree"},
+    "categories": {"code": "code", "title": "title", "hours": "credits"},
+    "tracks": {"Course": "code", "Name": "title", "Credits": "credits"},
+    "plan": {"code": "code", "title": "title", "hours": "credits"},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    code TEXT PRIMARY KEY,
+    department TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    title TEXT,
+    credits NUMERIC,
+    prereqs TEXT,
+    prereq_tree TEXT
+);
+CREATE INDEX IF NOT EXISTS courses_department ON courses (department, number);
+CREATE INDEX IF NOT EXISTS courses_level ON courses (level, department);
+
+CREATE TABLE IF NOT EXISTS programs (
+    id INTEGER PRIMARY KEY,
+    export TEXT NOT NULL UNIQUE,  -- data file path relative to src/data
+    name TEXT NOT NULL,
+    shape TEXT NOT NULL,
+    details TEXT,                 -- the file's non-course content, JSON
+    style TEXT                    -- how the file is formatted, JSON
+);
+
+CREATE TABLE IF NOT EXISTS requirement_groups (
+    id INTEGER PRIMARY KEY,
+    program_id INTEGER NOT NULL REFERENCES programs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,           -- requirements, category, track or semester
+    label TEXT NOT NULL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS requirement_groups_program ON requirement_groups (program_id, position);
+
+CREATE TABLE IF NOT EXISTS requirements (
+    id INTEGER PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES requirement_groups (id) ON DELETE CASCADE,
+    parent_id INTEGER REFERENCES requirements (id) ON DELETE CASCADE,  -- set for the alternatives of a choice
+    position INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    keys TEXT NOT NULL,           -- the entry's keys in file order, JSON
+    overrides TEXT,               -- course facts that differ from the courses row, JSON
+    details TEXT                  -- the entry's other fields, JSON
+);
+CREATE INDEX IF NOT EXISTS requirements_code ON requirements (code);
+CREATE INDEX IF NOT EXISTS requirements_group ON requirements (group_id, parent_id, position);
+
+-- Which programs, categories and tracks list each course
+CREATE VIEW IF NOT EXISTS memberships AS
+SELECT requirements.code, programs.name AS program, requirement_groups.kind, requirement_groups.label,
+       requirements.parent_id IS NOT NULL AS alternative
+FROM requirements
+JOIN requirement_groups ON requirement_groups.id = requirements.group_id
+JOIN programs ON programs.id = requirement_groups.program_id;
+"""
+
+
+def course_level(number):
+    return number // 100 * 100
+
+
+def detect_shape(data):
+    """Which of the data file shapes a loaded JSON document has"""
+    if isinstance(data, dict) and isinstance(data.get('courses'), list) and 'name' in data:
+        return "plan"
+    if isinstance(data, dict) and len(data) == 1:
+        body = next(iter(data.values()))
+        if isinstance(body, list):
+            return "program"
+        if isinstance(body, dict) and 'Depth Tracks' in body:
+            return "tracks"
+        if isinstance(body, dict) and all(isinstance(group, dict) and 'courses' in group for group in body.values()):
+            return "categories"
+    raise ValueError("not a course data file this store understands")
+
+
+# --- JSON formatting -------------------------------------------------------
+#
+# The hand-maintained files keep each course entry on one line. A file's style
+# is detected on import so its export reproduces the same text.
+
+INLINE_WIDTH = 120  # lists of plain values are written on one line if it fits
+
+
+def _scalar(value):
+    return not isinstance(value, (dict, list))
+
+
+def _compact(value, indent, pad, ensure_ascii, level=0, in_list=False):
+    dump = lambda v: json.dumps(v, ensure_ascii=ensure_ascii)
+    inner = " " * (indent * (level + 1))
+    outer = " " * (indent * level)
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        if in_list and all(_scalar(v) for v in value.values()):
+            return "{" + pad + ", ".join(f"{dump(k)}: {dump(v)}" for k, v in value.items()) + pad + "}"
+        items = [f"{inner}{dump(k)}: {_compact(v, indent, pad, ensure_ascii, level + 1)}" for k, v in value.items()]
+        return "{\n" + ",\n".join(items) + "\n" + outer + "}"
+    if isinstance(value, list):
+        if not value:
+            return "[]"
+        if all(_scalar(v) for v in value):
+            line = "[" + ", ".join(dump(v) for v in value) + "]"
+            if len(inner) + len(line) <= INLINE_WIDTH:
+                return line
+        items = [inner + _compact(v, indent, pad, ensure_ascii, level + 1, in_list=True) for v in value]
+        return "[\n" + ",\n".join(items) + "\n" + outer + "]"
+    return dump(value)
+
+
+def format_json(data, style):
+    if style.get('compact'):
+        body = _compact(data, 2, style.get('pad', ''), style.get('ensure_ascii', True))
+    else:
+        body = json.dumps(data, indent=2, ensure_ascii=style.get('ensure_ascii', True))
+    return style.get('leading', '') + body + style.get('trailing', '')
+
+
+def detect_style(text, data):
+    """The formatting options under which format_json() reproduces `text`, or a plain indent=2 style"""
+    body = text.strip()
+    base = {"leading": text[:len(text) - len(text.lstrip())], "trailing": text[len(text.rstrip()):]}
+    candidates = [{"compact": compact, "pad": pad, "ensure_ascii": ensure_ascii}
+                  for compact in (False, True) for pad in ("", " ") for ensure_ascii in (True, False)
+                  if compact or not pad]
+    for candidate in candidates:
+        if format_json(data, candidate) == body:
+            return dict(candidate, **base)
+    return {"compact": False, "ensure_ascii": True, "leading": "", "trailing": "\n"}
+
+
+# --- The store -------------------------------------------------------------
+
+class CourseStore:
+    """SQLite store of canonical courses, programs and their requirement groups"""
+
+    def __init__(self, path=DEFAULT_DB, data_dir=DATA_DIR):
+        self.path = path
+        self.data_dir = data_dir
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_empty(self):
+        return self.db.execute("SELECT NOT EXISTS (SELECT 1 FROM programs)").fetchone()[0]
+
+    # Canonical courses
+
+    def _course_facts(self, code):
+        row = self.db.execute(f"SELECT {', '.join(CANONICAL_COLUMNS)} FROM courses WHERE code = ?",
+                              (code,)).fetchone()
+        if row is None:
+            return None
+        return {column: json.loads(row[column]) if column in JSON_COLUMNS and row[column] is not None else row[column]
+                for column in row.keys()}
+
+    def _update_course(self, code, facts, authoritative):
+        """Add a course or bring its canonical facts up to date
+
+        Authoritative facts (looked up in the catalog) replace the canonical
+        values; requirements that relied on the old values get them as
+        overrides so their exports don't change. Other facts only fill in
+        values the course doesn't have yet.
+        """
+        match = COURSE_CODE_RE.match(code)
+        if not match:
+            return
+        current = self._course_facts(code)
+        if current is None:
+            number = int(match.group(2))
+            self.db.execute("INSERT INTO courses (code, department, number, level) VALUES (?, ?, ?, ?)",
+                            (code, match.group(1), number, course_level(number)))
+            current = dict.fromkeys(CANONICAL_COLUMNS)
+        changed = {column: value for column, value in facts.items() if current[column] != value
+                   and (column in authoritative or current[column] is None)}
+        if not changed:
+            return
+        rows = self.db.execute(
+            "SELECT requirements.id, keys, overrides, shape FROM requirements "
+            "JOIN requirement_groups ON requirement_groups.id = requirements.group_id "
+            "JOIN programs ON programs.id = requirement_groups.program_id WHERE code = ?", (code,)).fetchall()
+        for row in rows:
+            old_overrides = json.loads(row['overrides'] or '{}')
+            listed = {FACT_KEYS[row['shape']].get(key) for key in json.loads(row['keys'])}
+            overrides = {column: value for column, value in old_overrides.items()
+                         if column not in changed or value != changed[column]}
+            overrides.update((column, current[column]) for column in changed
+                             if column in listed and column not in old_overrides)
+            if overrides != old_overrides:
+                self.db.execute("UPDATE requirements SET overrides = ? WHERE id = ?",
+                                (json.dumps(overrides) if overrides else None, row['id']))
+        assignments = ", ".join(f"{column} = ?" for column in changed)
+        values = [json.dumps(value) if column in JSON_COLUMNS and value is not None else value
+                  for column, value in changed.items()]
+        self.db.execute(f"UPDATE courses SET {assignments} WHERE code = ?", (*values, code))
+
+    def course(self, code):
+        """Canonical facts of a course, or None"""
+        row = self.db.execute("SELECT * FROM courses WHERE code = ?", (code,)).fetchone()
+        return self._course_dict(row) if row is not None else None
+
+    def department(self, department, level=None):
+        """Courses of a department in number order, optionally of one level (100, 200, ...)"""
+        if level is None:
+            rows = self.db.execute("SELECT * FROM courses WHERE department = ? ORDER BY number", (department,))
+        else:
+            rows = self.db.execute("SELECT * FROM courses WHERE department = ? AND number BETWEEN ? AND ? "
+                                   "ORDER BY number", (department, level, level + 99))
+        return [self._course_dict(row) for row in rows]
+
+    def courses(self):
+        """Every course in code order"""
+        return [self._course_dict(row) for row in self.db.execute("SELECT * FROM courses ORDER BY code")]
+
+    def level(self, level):
+        """Courses of every department at one level"""
+        rows = self.db.execute("SELECT * FROM courses WHERE level = ? ORDER BY department, number", (level,))
+        return [self._course_dict(row) for row in rows]
+
+    def memberships(self, code):
+        """(program, kind, label, alternative) for every listing of a course code"""
+        return [tuple(row) for row in self.db.execute(
+            "SELECT program, kind, label, alternative FROM memberships WHERE code = ?", (code,))]
+
+    def _course_dict(self, row):
+        course = dict(row)
+        if course['prereq_tree'] is not None:
+            course['prereq_tree'] = json.loads(course['prereq_tree'])
+        return course
+
+    # Import
+
+    def import_file(self, path, export=None):
+        """Import a data file, replacing what the store had for it; returns the program name"""
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        data = json.loads(text)
+        export = export or os.path.relpath(path, self.data_dir)
+        return self.import_data(export, data, detect_style(text, data))
+
+    def save_program(self, export, program, courses):
+        """Store a scraped program (the ce_courses.json schema) as the export `export`"""
+        return self.import_data(export, {program: courses}, {"compact": False, "ensure_ascii": True})
+
+    def import_data(self, export, data, style):
+        shape = detect_shape(data)
+        name, details, groups = READERS[shape](data)
+        with self.db:
+            self.db.execute("DELETE FROM programs WHERE export = ?", (export,))
+            program_id = self.db.execute(
+                "INSERT INTO programs (export, name, shape, details, style) VALUES (?, ?, ?, ?, ?)",
+                (export, name, shape, json.dumps(details), json.dumps(style))).lastrowid
+            for position, (kind, label, group_details, entries) in enumerate(groups):
+                group_id = self.db.execute(
+                    "INSERT INTO requirement_groups (program_id, position, kind, label, details) VALUES (?, ?, ?, ?, ?)",
+                    (program_id, position, kind, label, json.dumps(group_details))).lastrowid
+                self._insert_entries(shape, group_id, None, entries)
+        return name
+
+    def _insert_entries(self, shape, group_id, parent_id, entries):
+        fact_keys = FACT_KEYS[shape]
+        for position, entry in enumerate(entries):
+            facts = {fact_keys[key]: value for key, value in entry.items() if key in fact_keys}
+            code = facts.pop('code')
+            alternatives = entry.get('alternatives')
+            if shape == "program":
+                # Catalog lookups are authoritative for prerequisites; names and credits
+                # only for plain course rows (alternatives share their choice's name)
+                authoritative = {"prereqs", "prereq_tree"}
+                if alternatives is None and parent_id is None:
+                    authoritative |= {"title", "credits"}
+            else:
+                authoritative = set()
+            # A choice's name may be the list of its alternatives' names, which is no course title
+            self._update_course(code, {column: value for column, value in facts.items()
+                                       if column != 'title' or isinstance(value, str)}, authoritative)
+            canonical = self._course_facts(code) or {}
+            overrides = {column: value for column, value in facts.items()
+                         if column not in canonical or canonical[column] != value}
+            details = {key: value for key, value in entry.items() if key not in fact_keys and key != 'alternatives'}
+            requirement_id = self.db.execute(
+                "INSERT INTO requirements (group_id, parent_id, position, code, keys, overrides, details) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (group_id, parent_id, position, code, json.dumps(list(entry)),
+                 json.dumps(overrides) if overrides else None, json.dumps(details) if details else None)).lastrowid
+            if alternatives is not None:
+                self._insert_entries(shape, group_id, requirement_id, alternatives)
+
+    # Export
+
+    def exports(self):
+        return [row[0] for row in self.db.execute("SELECT export FROM programs ORDER BY id")]
+
+    def export_data(self, export):
+        """Rebuild the JSON document of an export"""
+        program = self.db.execute("SELECT * FROM programs WHERE export = ?", (export,)).fetchone()
+        if program is None:
+            raise KeyError(export)
+        shape = program['shape']
+        groups = []
+        for group in self.db.execute("SELECT * FROM requirement_groups WHERE program_id = ? ORDER BY position",
+                                     (program['id'],)).fetchall():
+            groups.append((group['kind'], group['label'], json.loads(group['details']),
+                           self._entries(shape, group['id'], None)))
+        return WRITERS[shape](program['name'], json.loads(program['details']), groups)
+
+    def program_layout(self, export):
+        """A program as stored: name, shape, details and its groups with their requirement rows, in order"""
+        program = self.db.execute("SELECT * FROM programs WHERE export = ?", (export,)).fetchone()
+        if program is None:
+            raise KeyError(export)
+        groups = []
+        for group in self.db.execute("SELECT * FROM requirement_groups WHERE program_id = ? ORDER BY position",
+                                     (program['id'],)).fetchall():
+            requirements = [
+                {"id": row['id'], "parent_id": row['parent_id'], "code": row['code'], "keys": json.loads(row['keys']),
+                 "overrides": json.loads(row['overrides'] or '{}'), "details": json.loads(row['details'] or '{}')}
+                for row in self.db.execute("SELECT * FROM requirements WHERE group_id = ? ORDER BY id", (group['id'],))
+            ]
+            groups.append({"kind": group['kind'], "label": group['label'], "details": json.loads(group['details']),
+                           "requirements": requirements})
+        return {"export": export, "name": program['name'], "shape": program['shape'],
+                "details": json.loads(program['details']), "groups": groups}
+
+    def departments(self):
+        return [row[0] for row in self.db.execute("SELECT DISTINCT department FROM courses ORDER BY department")]
+
+    def export_text(self, export):
+        program = self.db.execute("SELECT style FROM programs WHERE export = ?", (export,)).fetchone()
+        return format_json(self.export_data(export), json.loads(program['style']))
+
+    def _entries(self, shape, group_id, parent_id):
+        columns = FACT_KEYS[shape]
+        rows = self.db.execute(
+            "SELECT requirements.*, courses.title, courses.credits, courses.prereqs, courses.prereq_tree "
+            "FROM requirements LEFT JOIN courses ON courses.code = requirements.code "
+            "WHERE group_id = ? AND parent_id IS ? ORDER BY position", (group_id, parent_id)).fetchall()
+        entries = []
+        for row in rows:
+            overrides = json.loads(row['overrides'] or '{}')
+            details = json.loads(row['details'] or '{}')
+            entry = {}
+            for key in json.loads(row['keys']):
+                column = columns.get(key)
+                if key == 'alternatives':
+                    entry[key] = self._entries(shape, group_id, row['id'])
+                elif column == 'code':
+                    entry[key] = row['code']
+                elif column is None:
+                    entry[key] = details[key]
+                elif column in overrides:
+                    entry[key] = overrides[column]
+                elif column in JSON_COLUMNS and row[column] is not None:
+                    entry[key] = json.loads(row[column])
+                else:
+                    entry[key] = row[column]
+            entries.append(entry)
+        return entries
+
+    def write_exports(self, check=False):
+        """Write every export to its file; with check=True only list the files that are out of date"""
+        stale = []
+        for export in self.exports():
+            path = os.path.join(self.data_dir, export)
+            text = self.export_text(export)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    current = f.read()
+            except OSError:
+                current = None
+            if current == text:
+                continue
+            stale.append(export)
+            if not check:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+        return stale
+
+    def build(self):
+        """Import every data file, then the department course lists and crawled programs, replacing what the store had for them"""
+        paths = [os.path.join(self.data_dir, name) for name in DATA_FILES]
+        for subdir in ["departments", "programs"]:
+            directory = os.path.join(self.data_dir, subdir)
+            if os.path.isdir(directory):
+                paths += [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                          if name.endswith(".json") and name != "crawl.json"]
+        imported = []
+        for path in paths:
+            if os.path.exists(path):
+                self.import_file(path)
+                imported.append(os.path.relpath(path, self.data_dir))
+        return imported
+
+
+# --- Shape readers and writers ---------------------------------------------
+#
+# A reader returns (program name, details, groups) where details is the
+# document without its course lists and each group is (kind, label, details,
+# entries); the writer puts them back together. Course lists are replaced by
+# None in the details so their position among the other keys is kept.
+
+def _without(mapping, key):
+    return {k: (None if k == key else v) for k, v in mapping.items()}
+
+
+def _with(mapping, key, value):
+    return {k: (value if k == key else v) for k, v in mapping.items()}
+
+
+def read_program(data):
+    name, courses = next(iter(data.items()))
+    return name, None, [("requirements", name, None, courses)]
+
+
+def write_program(name, details, groups):
+    return {name: groups[0][3]}
+
+
+def read_categories(data):
+    name, categories = next(iter(data.items()))
+    return name, None, [("category", label, _without(category, 'courses'), category['courses'])
+                        for label, category in categories.items()]
+
+
+def write_categories(name, details, groups):
+    return {name: {label: _with(group_details, 'courses', entries) for _, label, group_details, entries in groups}}
+
+
+def read_tracks(data):
+    name, body = next(iter(data.items()))
+    return name, _without(body, 'Depth Tracks'), [
+        ("track", track['Track Name'], _without(track, 'Courses'), track['Courses']) for track in body['Depth Tracks']]
+
+
+def write_tracks(name, details, groups):
+    tracks = [_with(group_details, 'Courses', entries) for _, _, group_details, entries in groups]
+    return {name: _with(details, 'Depth Tracks', tracks)}
+
+
+def read_plan(data):
+    return data['name'], _without(data, 'courses'), [
+        ("semester", f"Year {term['year']} {term['semester']}", _without(term, 'courses'), term['courses'])
+        for term in data['courses']]
+
+
+def write_plan(name, details, groups):
+    return _with(details, 'courses', [_with(group_details, 'courses', entries) for _, _, group_details, entries in groups])
+
+
+READERS = {"program": read_program, "categories": read_categories, "tracks": read_tracks, "plan": read_plan}
+WRITERS = {"program": write_program, "categories": write_categories, "tracks": write_tracks, "plan": write_plan}
+
+
+def open_store(path=DEFAULT_DB, data_dir=DATA_DIR):
+    """Open the store, importing the existing data files first if it is new"""
+    store = CourseStore(path, data_dir)
+    if store.is_empty():
+        store.build()
+    return store
+
+
+def add_store_arguments(parser):
+    """Register the course store option shared by the scraper scripts"""
+    parser.add_argument('--db', default=DEFAULT_DB,
+                        help="SQLite course store the JSON files are exported from (default %(default)s)")
+
+
+def store_from_args(args):
+    return open_store(args.db)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, export and query the SQLite course store")
+    add_store_arguments(parser)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('build', help="import every JSON file in src/data")
+    export = commands.add_parser('export', help="regenerate the JSON files from the store")
+    export.add_argument('--check', action='store_true', help="only report files that differ from the store")
+    course = commands.add_parser('course', help="show a course and where it is listed")
+    course.add_argument('code')
+    department = commands.add_parser('department', help="list a department's courses")
+    department.add_argument('department')
+    department.add_argument('--level', type=int, help="only this level, e.g. 300")
+    args = parser.parse_args(argv)
+
+    # Every command but build reads a new store's contents from the data files first
+    with (CourseStore(args.db) if args.command == 'build' else open_store(args.db)) as store:
+        if args.command == 'build':
+            imported = store.build()
+            courses = store.db.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+            listings = store.db.execute("SELECT COUNT(*) FROM requirements").fetchone()[0]
+            print(f"Imported {len(imported)} files: {courses} courses, {listings} requirement listings into {args.db}")
+        elif args.command == 'export':
+            if not store.exports():
+                raise SystemExit(f"{args.db} has no programs to export; run build first")
+            stale = store.write_exports(check=args.check)
+            if args.check:
+                if stale:
+                    raise SystemExit(f"Out of date with the store: {', '.join(stale)}")
+                print(f"All {len(store.exports())} exports are up to date")
+            else:
+                print(f"Rewrote {len(stale)} of {len(store.exports())} files" + (f": {', '.join(stale)}" if stale else ""))
+        elif args.command == 'course':
+            course = store.course(args.code)
+            if course is None:
+                raise SystemExit(f"{args.code} is not in the store")
+            print(json.dumps(course, indent=2))
+            for program, kind, label, alternative in store.memberships(args.code):
+                print(f"  {program}: {kind} {label}" + (" (alternative)" if alternative else ""))
+        elif args.command == 'department':
+            for course in store.department(args.department, args.level):
+                print(f"{course['code']:10}{course['credits'] if course['credits'] is not None else '':>4}  {course['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+import argparse
+import html as html_lib
+import json
+import os
+import re
+
+from catalog import CatalogScraper, add_scrape_arguments
+from catalog_years import save_year_from_args
+from checkpoint import checkpoint_from_args
+from course_ranges import save_departments
+from course_store import DATA_DIR, store_from_args
+from http_cache import fetch_page
+from manifest import print_change_report, write_if_changed
+from metrics import metrics_from_args
+from prerequisites import pending_course_codes
+from search_index import write_index
+
+# Scrapes any number of degree programs in one run:
+#
+#   python crawler.py https://catalog.tamu.edu/undergraduate/engineering/computer-science/computer-engineering-bs/ ...
+#   python crawler.py --discover https://catalog.tamu.edu/undergraduate/engineering/
+#
+# 1. program pages are fetched concurrently over pooled keep-alive connections;
+#    a page that can't be fetched or parsed is reported and the rest go on
+# 2. their requirement tables are parsed and walked in a process pool
+#    (skipped for pages whose tables are unchanged since the last run)
+# 3. the course codes of every program go into one deduplicated store, so
+#    each course's prerequisites are looked up once however many programs list it
+# 4. the departments course ranges draw on are read in bulk, so ranges list
+#    their courses and every course in them has its prerequisites stored
+# 5. each program is written to its own JSON file in the ce_courses.json schema
+#
+# Stages 2-4 are CatalogScraper's (catalog.py), run over all programs at once.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.path.join(script_dir, "../data/programs")
+
+# Links to degree plans and minors, e.g. /undergraduate/engineering/computer-science/computer-engineering-bs/
+PROGRAM_LINK_RE = re.compile(
+    r'href\s*=\s*["\']((?:https?://[^/"\']+)?/undergraduate/(?:[a-z0-9-]+/)+?'
+    r'(?:[a-z0-9-]+-(?:ba|bs|bba|bfa|bla|bed|bsn|bae|bm|bmus)|minor)/)["\'#]', re.IGNORECASE)
+TITLE_RE = re.compile(r'<h1\b[^>]*>(.*?)</h1>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+def discover_programs(index_url, cache=None, client=None):
+    """Program page URLs linked from a catalog index page, in page order"""
+    html = fetch_page(index_url, cache, client)
+    return list(dict.fromkeys(urljoin(index_url, link) for link in PROGRAM_LINK_RE.findall(html)))
+
+
+def program_title(html, url):
+    """The program's page heading, e.g. "Computer Engineering - BS", or its URL slug"""
+    match = TITLE_RE.search(html)
+    title = ' '.join(html_lib.unescape(TAG_RE.sub(' ', match.group(1))).split()) if match else ""
+    return title or program_slug(url)
+
+
+def program_slug(url):
+    """File name stem for a program URL: its last two path components, e.g. mathematics_minor"""
+    parts = [part for part in urlparse(url).path.split('/') if part]
+    return '_'.join(parts[-2:]) or 'program'
+
+
+def fetch_pages(scraper, urls):
+    """Fetch program pages concurrently; returns ({url: html}, {url: error message}) so one bad page doesn't stop the rest"""
+    def fetch(url):
+        try:
+            return fetch_page(url, scraper.cache, scraper.client), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    pages, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(1, scraper.concurrency)) as pool:
+        for url, (html, error) in zip(urls, pool.map(fetch, urls)):
+            if error is None:
+                pages[url] = html
+            else:
+                errors[url] = error
+    return pages, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape the requirements of many degree programs in one run")
+    parser.add_argument('urls', nargs='*', help="program page URLs")
+    parser.add_argument('--url-file', help="file listing program page URLs, one per line")
+    parser.add_argument('--discover', nargs='+', metavar='INDEX_URL', default=[],
+                        help="also scrape every degree plan or minor linked from these catalog pages")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for parsing program pages (default %(default)s)")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="directory for the per-program JSON files (default %(default)s)")
+    add_scrape_arguments(parser)
+    args = parser.parse_args(argv)
+    metrics = metrics_from_args(args)
+    scraper = CatalogScraper.from_args(args)
+
+    urls = list(args.urls)
+    if args.url_file:
+        with open(args.url_file) as f:
+            urls += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    metrics.stage("discover programs")
+    for index_url in args.discover:
+        found = discover_programs(index_url, scraper.cache, scraper.client)
+        print(f"Found {len(found)} programs on {index_url}")
+        urls += found
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        parser.error("no program URLs given or discovered")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # 1. Fetch every program page; pages that fail are reported and the rest carry on
+    metrics.stage("fetch program pages")
+    print(f"Fetching {len(urls)} program pages...")
+    pages, errors = fetch_pages(scraper, urls)
+
+    # 2. Walk the requirement tables, reusing the previous run's walk where they are unchanged
+    metrics.stage("walk tables")
+    titles = {url: program_title(html, url) for url, html in pages.items()}
+    walked, walk_errors = scraper.walk_pages({url: (url, html) for url, html in pages.items()},
+                                             processes=args.processes)
+    errors.update((url, f"{type(e).__name__}: {e}") for url, e in walk_errors.items())
+    programs = {url: walked[url] for url in urls if url in walked}
+
+    # 3-4. One deduplicated lookup per course across all programs, then the departments ranges draw on
+    course_codes = pending_course_codes([course for courses in programs.values() for course in courses])
+    print(f"Looking up prerequisites for {len(course_codes)} distinct courses...")
+    checkpoint = checkpoint_from_args(args, os.path.join(args.output_dir, "crawl.json"), '\n'.join(urls))
+    departments = {}
+    completed, failed = scraper.complete_programs(programs, checkpoint, departments)
+
+    # 5. Store each program whose lookups all succeeded in the course database and export its JSON
+    metrics.stage("write programs")
+    reports = {}
+    with store_from_args(args) as course_store:
+        for export in save_departments(course_store, departments):
+            print(f"{export} updated")
+        for url in urls:
+            if url not in completed:
+                continue
+            output_file = os.path.join(args.output_dir, program_slug(url) + ".json")
+            export = os.path.relpath(output_file, DATA_DIR)
+            course_store.save_program(export, titles[url], completed[url])
+            courses = course_store.export_data(export)[titles[url]]
+            written, report = write_if_changed(output_file, titles[url], courses)
+            reports[titles[url]] = report
+            print(f"{os.path.basename(output_file)}: {len(courses)} courses, {'written' if written else 'unchanged'}")
+            print_change_report(report)
+        write_index(course_store)
+        save_year_from_args(args, course_store)
+
+    if args.change_report:
+        with open(args.change_report, "w") as f:
+            json.dump(reports, f, indent=2)
+    metrics.stage(None)
+    print(f"Scraped {len(completed)} of {len(urls)} programs and {len(course_codes)} distinct courses "
+          f"into {args.output_dir}")
+    problems = [f"{url}: {error}" for url, error in errors.items()]
+    problems += [f"{titles[url]} (prerequisite lookups failed: {', '.join(codes)})" for url, codes in failed.items()]
+    if failed:
+        checkpoint.close()
+    else:
+        checkpoint.remove()
+    if problems:
+        raise SystemExit(f"{len(problems)} programs were not written:\n  " + "\n  ".join(problems) +
+                         (f"\nRerun with --resume to retry the failed lookups (progress is kept in {checkpoint.path})."
+                          if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+
+from course_store import FACT_KEYS, WRITERS, add_store_arguments, open_store
+
+# Optional brotli compression; gzip variants are always written
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Writes the course data as a compact bundle the planner can load piecemeal
+# instead of importing every JSON file:
+#
+#   manifest.json              programs and departments, with their shard files and sizes
+#   programs/<export>.json     one per data file: requirement groups, entries and
+#                              the facts of the courses they list
+#   departments/<DEPT>.json    every course of one department, for browsing electives
+#
+# Planning a program fetches just the manifest and that program's shard.
+# Each shard has its own string table: repeated strings (titles, prerequisite
+# text, semesters) are stored once and referenced by index, and entries and
+# courses are stored as columns. Every file also gets .gz and, with the brotli
+# package installed, .br variants for servers that send pre-compressed files.
+#
+#   python data_bundle.py --output-dir public/data
+#
+# After writing, the bundle is decoded again and checked against the store.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.path.join(script_dir, "../../public/data")
+FORMAT = 1
+
+
+class StringTable:
+    """Deduplicated strings of a shard; values are referenced by their index"""
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def ref(self, value):
+        if value is None:
+            return None
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+
+def encode_column(values, present, strings):
+    """Column of entry values: string columns become table references, others stay as they are"""
+    if all(isinstance(value, str) for value, has in zip(values, present) if has):
+        return {"strings": [strings.ref(value) if has else None for value, has in zip(values, present)]}
+    return {"values": values}
+
+
+def decode_column(column, strings):
+    if "strings" in column:
+        return [strings[ref] if ref is not None else None for ref in column['strings']]
+    return column['values']
+
+
+def course_columns(courses, strings):
+    """Canonical course facts as columns, strings referenced through the table"""
+    return {
+        "code": [strings.ref(course['code']) for course in courses],
+        "title": [strings.ref(course['title']) for course in courses],
+        "credits": [course['credits'] for course in courses],
+        "prereqs": [strings.ref(course['prereqs']) for course in courses],
+        "prereq_tree": [course['prereq_tree'] for course in courses],
+    }
+
+
+def decode_courses(columns, strings):
+    """{code: facts} from course_columns()"""
+    text = lambda ref: strings[ref] if ref is not None else None
+    return {
+        strings[code]: {"title": text(title), "credits": credits, "prereqs": text(prereqs), "prereq_tree": tree}
+        for code, title, credits, prereqs, tree in zip(columns['code'], columns['title'], columns['credits'],
+                                                       columns['prereqs'], columns['prereq_tree'])
+    }
+
+
+def department_shard(store, department):
+    strings = StringTable()
+    shard = {"format": FORMAT, "department": department,
+             "courses": course_columns(store.department(department), strings)}
+    shard["strings"] = strings.strings
+    return shard
+
+
+def program_shard(store, export):
+    layout = store.program_layout(export)
+    fact_keys = FACT_KEYS[layout['shape']]
+    strings = StringTable()
+    keysets = []
+    rows = []
+    for group_index, group in enumerate(layout['groups']):
+        position = {}
+        for requirement in group['requirements']:
+            position[requirement['id']] = len(rows)
+            keys = requirement['keys']
+            if keys not in keysets:
+                keysets.append(keys)
+            rows.append((group_index, position.get(requirement['parent_id'], -1), keysets.index(keys), requirement))
+
+    detail_keys = list(dict.fromkeys(key for keys in keysets for key in keys
+                                     if key not in fact_keys and key != 'alternatives'))
+    columns = {}
+    for key in detail_keys:
+        present = [key in requirement['details'] for _, _, _, requirement in rows]
+        values = [requirement['details'].get(key) for _, _, _, requirement in rows]
+        columns[key] = encode_column(values, present, strings)
+
+    codes = dict.fromkeys(requirement['code'] for _, _, _, requirement in rows)
+    courses = [course for course in map(store.course, codes) if course is not None]
+    shard = {
+        "format": FORMAT,
+        "export": export,
+        "name": layout['name'],
+        "shape": layout['shape'],
+        "details": layout['details'],
+        "departments": sorted({course['department'] for course in courses}),
+        "courses": course_columns(courses, strings),
+        "groups": [{"kind": group['kind'], "label": group['label'], "details": group['details']}
+                   for group in layout['groups']],
+        "keysets": keysets,
+        "entries": {
+            "group": [group for group, _, _, _ in rows],
+            "parent": [parent for _, parent, _, _ in rows],
+            "keys": [keyset for _, _, keyset, _ in rows],
+            "code": [strings.ref(requirement['code']) for _, _, _, requirement in rows],
+            # Course facts that differ from the courses above (all facts for placeholders)
+            "overrides": [requirement['overrides'] or None for _, _, _, requirement in rows],
+            "columns": columns,
+        },
+    }
+    shard["strings"] = strings.strings
+    return shard
+
+
+def decode_program(shard):
+    """The data file a program shard was made from"""
+    strings = shard['strings']
+    courses = decode_courses(shard['courses'], strings)
+    fact_keys = FACT_KEYS[shard['shape']]
+    entries = shard['entries']
+    columns = {key: decode_column(column, strings) for key, column in entries['columns'].items()}
+    built = []
+    children = [[] for _ in entries['group']]
+    for i in range(len(entries['group'])):
+        code = strings[entries['code'][i]]
+        canonical = courses.get(code, {})
+        overrides = entries['overrides'][i] or {}
+        entry = {}
+        for key in shard['keysets'][entries['keys'][i]]:
+            column = fact_keys.get(key)
+            if key == 'alternatives':
+                entry[key] = children[i]
+            elif column == 'code':
+                entry[key] = code
+            elif column is not None:
+                entry[key] = overrides[column] if column in overrides else canonical.get(column)
+            else:
+                entry[key] = columns[key][i]
+        built.append(entry)
+        if entries['parent'][i] >= 0:
+            children[entries['parent'][i]].append(entry)
+    groups = [(group['kind'], group['label'], group['details'],
+               [entry for entry, group_index, parent in zip(built, entries['group'], entries['parent'])
+                if group_index == position and parent < 0])
+              for position, group in enumerate(shard['groups'])]
+    return WRITERS[shard['shape']](shard['name'], shard['details'], groups)
+
+
+def compact_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compressed_sizes(data):
+    """Sizes of the raw, gzip and (if available) brotli encodings of some bytes"""
+    sizes = {"raw": len(data), "gzip": len(gzip.compress(data, 9, mtime=0))}
+    if brotli is not None:
+        sizes["brotli"] = len(brotli.compress(data, quality=11))
+    return sizes
+
+
+def write_file(path, data):
+    """Write a file with its pre-compressed variants; returns the sizes written"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, 9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+    return compressed_sizes(data)
+
+
+def shard_name(export):
+    return export[:-len(".json")] if export.endswith(".json") else export
+
+
+def bundle_files(manifest):
+    """Paths (relative to the bundle) of the files a manifest lists, compressed variants included"""
+    shards = [program['shard'] for program in manifest.get('programs', [])] + \
+             [department['shard'] for department in manifest.get('departments', {}).values()]
+    return [path + suffix for path in shards + ["manifest.json"] for suffix in ("", ".gz", ".br")]
+
+
+def previous_files(output_dir):
+    """Files the bundle last written to output_dir consists of
+
+    Raises ValueError when output_dir holds other files but no bundle
+    manifest, so a mistyped --output-dir can't clobber unrelated data.
+    """
+    if not os.path.isdir(output_dir) or not os.listdir(output_dir):
+        return []
+    try:
+        with open(os.path.join(output_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        raise ValueError(f"{output_dir} is not empty and has no bundle manifest.json; choose an empty directory")
+    root = os.path.realpath(output_dir)
+    files = []
+    for path in bundle_files(manifest):
+        full = os.path.realpath(os.path.join(output_dir, path))
+        if full.startswith(root + os.sep):
+            files.append(full)
+    return files
+
+
+def write_bundle(store, output_dir):
+    """Write the bundle for every export in the store, removing the shards of the previous one; returns the manifest"""
+    previous = previous_files(output_dir)
+    manifest = {"format": FORMAT, "compression": ["gzip"] + (["brotli"] if brotli is not None else []),
+                "programs": [], "departments": {}}
+    for department in store.departments():
+        shard = department_shard(store, department)
+        path = f"departments/{department}.json"
+        data = compact_json(shard)
+        manifest["departments"][department] = {
+            "shard": path, "courses": len(shard['courses']['code']), "hash": hashlib.sha256(data).hexdigest()[:12],
+            "sizes": write_file(os.path.join(output_dir, path), data)}
+    for export in store.exports():
+        shard = program_shard(store, export)
+        path = f"programs/{shard_name(export)}.json"
+        data = compact_json(shard)
+        manifest["programs"].append({
+            "export": export, "name": shard['name'], "shape": shard['shape'], "shard": path,
+            "departments": shard['departments'], "hash": hashlib.sha256(data).hexdigest()[:12],
+            "sizes": write_file(os.path.join(output_dir, path), data)})
+    write_file(os.path.join(output_dir, "manifest.json"), compact_json(manifest))
+
+    # Shards of programs and departments that are gone, and variants no longer written
+    written = {os.path.realpath(os.path.join(output_dir, path)) for path in bundle_files(manifest)}
+    if brotli is None:
+        written = {path for path in written if not path.endswith(".br")}
+    for path in previous:
+        if path not in written and os.path.exists(path):
+            os.remove(path)
+    return manifest
+
+
+def load_program(output_dir, export):
+    """Decode one program from a written bundle the way the planner would: manifest, then its shard"""
+    with open(os.path.join(output_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    entry = next(program for program in manifest['programs'] if program['export'] == export)
+    with open(os.path.join(output_dir, entry['shard']), encoding="utf-8") as f:
+        return decode_program(json.load(f))
+
+
+def load_department(output_dir, department):
+    """{code: facts} of every course in a department, from a written bundle"""
+    with open(os.path.join(output_dir, "departments", f"{department}.json"), encoding="utf-8") as f:
+        shard = json.load(f)
+    return decode_courses(shard['courses'], shard['strings'])
+
+
+def size_report(store, output_dir, manifest):
+    """Print the size of the current data files against the bundle, raw and compressed"""
+    def totals(sizes):
+        result = {}
+        for entry in sizes:
+            for encoding, size in entry.items():
+                result[encoding] = result.get(encoding, 0) + size
+        return result
+
+    before = []
+    for export in store.exports():
+        with open(os.path.join(store.data_dir, export), "rb") as f:
+            before.append(compressed_sizes(f.read()))
+    with open(os.path.join(output_dir, "manifest.json"), "rb") as f:
+        manifest_sizes = compressed_sizes(f.read())
+    shards = [program['sizes'] for program in manifest['programs']] + \
+             [department['sizes'] for department in manifest['departments'].values()]
+
+    rows = [("data files", len(before), totals(before)),
+            ("bundle", len(shards) + 1, totals(shards + [manifest_sizes]))]
+    for program in manifest['programs']:
+        rows.append((f"  load {program['export']}", 2, totals([manifest_sizes, program['sizes']])))
+
+    encodings = ["raw", "gzip"] + (["brotli"] if brotli is not None else [])
+    print(f"{'':40}{'files':>6}" + "".join(f"{encoding + ' KB':>11}" for encoding in encodings))
+    for label, count, sizes in rows:
+        print(f"{label:40}{count:>6}" + "".join(f"{sizes[encoding] / 1024:>11.1f}" for encoding in encodings))
+    if brotli is None:
+        print("(brotli variants skipped: install the brotli package to write .br files)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the course data as a sharded, compressed bundle")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="empty directory, or one holding an earlier bundle, to write the bundle to (default %(default)s)")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with open_store(args.db) as store:
+        try:
+            manifest = write_bundle(store, args.output_dir)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for export in store.exports():
+            if load_program(args.output_dir, export) != store.export_data(export):
+                raise SystemExit(f"The bundle does not decode back to {export}")
+        for department in store.departments():
+            if load_department(args.output_dir, department) != {
+                    course['code']: {column: course[column] for column in ("title", "credits", "prereqs", "prereq_tree")}
+                    for course in store.department(department)}:
+                raise SystemExit(f"The bundle does not decode back to the {department} courses")
+        print(f"Wrote {len(manifest['programs'])} program and {len(manifest['departments'])} department shards "
+              f"to {args.output_dir}")
+        size_report(store, args.output_dir, manifest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from catalog_years import add_years_file_argument, years_from_args
+from course_ranges import CourseNumbers, parse_range, range_departments
+from course_store import COURSE_CODE_RE, add_store_arguments, store_from_args
+from prereq_compiler import MET, REVIEW, course_codes, evaluate, grade_passes
+
+# Batch degree-plan generation for advising: reads a program from the course
+# store and a file of student transcripts, and writes one semester-by-semester
+# plan per student as NDJSON.
+#
+#   python degree_plan.py transcripts.csv --output plans.ndjson --processes 8
+#
+# Transcripts are CSV or NDJSON (by file extension, or --format):
+#   CSV      id,completed,placements,max_hours
+#            s1,"MATH 151:A;ENGL 103:B;CHEM 107",math,15
+#   NDJSON   {"id": "s1", "completed": {"MATH 151": "A", "CHEM 107": null}, "placements": ["math"], "max_hours": 15}
+# `completed` may also be a list of codes, `max_hours` defaults to --max-hours
+# and an optional `hours` gives the completed credit hours when the transcript
+# lists only part of them. Courses with a failing or non-credit grade (F, W,
+# Q, ...) count as not taken and are planned again.
+#
+# Every semester takes outstanding requirements whose recommended semester has
+# come, in the program's order and longest prerequisite chain first, as long
+# as their prerequisite trees hold for the courses completed in earlier
+# semesters (or taken in the same one, where the catalog allows concurrent
+# enrollment) and the semester stays within the student's hour limit. Work
+# that can't be checked from a transcript (approval, "or equivalent", free
+# text) counts as met unless --strict.
+#
+# Transcripts are planned in chunks in a process pool and the plans written
+# in input order as they complete; throughput is reported on stderr.
+
+DEFAULT_PROGRAM = "ce_courses.json"
+DEFAULT_MAX_HOURS = 16
+DEFAULT_MAX_SEMESTERS = 12
+DEFAULT_CREDITS = 3  # for requirements the catalog lists without hours
+CHUNK_SIZE = 64  # transcripts per process-pool task
+
+YEARS = ["First", "Second", "Third", "Fourth", "Fifth", "Sixth", "Seventh", "Eighth"]
+TERMS = ["Fall", "Spring"]
+
+# Completed credit hours at which a student reaches each classification
+CLASSIFICATIONS = [(90, "senior"), (60, "junior"), (30, "sophomore"), (0, "freshman")]
+
+
+def term_name(index):
+    """Name of the index-th semester of a four-year plan, e.g. 2 -> "Second Year Fall" """
+    if index < len(YEARS) * len(TERMS):
+        return f"{YEARS[index // len(TERMS)]} Year {TERMS[index % len(TERMS)]}"
+    return f"Semester {index + 1}"
+
+
+def term_index(name):
+    """Inverse of term_name(); None for blank or unrecognized semesters"""
+    for index in range(len(YEARS) * len(TERMS)):
+        if term_name(index) == name:
+            return index
+    return None
+
+
+def classification(hours):
+    return next(name for threshold, name in CLASSIFICATIONS if hours >= threshold)
+
+
+def load_program(store, export):
+    """A program export as a JSON-ready plan spec for Planner: its requirements and known course credits"""
+    data = store.export_data(export)
+    name, entries = next(iter(data.items()))
+    if not isinstance(entries, list):
+        raise ValueError(f"{export} is not a program file with prerequisites (ce_courses.json schema)")
+
+    def option(entry):
+        code = entry['course']
+        return {"code": code, "credits": entry.get('credits') or DEFAULT_CREDITS,
+                "tree": entry.get('prereq_tree'), "course": bool(COURSE_CODE_RE.match(code))}
+
+    # A range (MATH 300-499) stands for each course in it, listed by the scrape or else found in the store
+    numbers = CourseNumbers.from_store(store, range_departments(entries))
+
+    def options(entry):
+        if not parse_range(entry['course']):
+            return [option(entry)]
+        courses = [store.course(code) for code in entry.get('courses') or numbers.expand(entry['course'])]
+        return [option({"course": course['code'], "credits": course['credits'], "prereq_tree": course['prereq_tree']})
+                for course in courses if course is not None] or [option(entry)]
+
+    requirements = []
+    for entry in entries:
+        requirements.append({
+            "label": entry['course'],
+            "hours": entry.get('credits') or DEFAULT_CREDITS,
+            "term": term_index(entry.get('semester')),
+            # Keyed by code, as a course may be listed both on its own and within a range
+            "options": list({resolved['code']: resolved for alternative in entry.get('alternatives') or [entry]
+                             for resolved in options(alternative)}.values()),
+        })
+    credits = {row[0]: row[1] for row in store.db.execute("SELECT code, credits FROM courses WHERE credits IS NOT NULL")}
+    return {"export": export, "name": name, "requirements": requirements, "credits": credits}
+
+
+class Planner:
+    """Builds semester plans for one program; one instance serves any number of transcripts"""
+
+    def __init__(self, program, max_hours=DEFAULT_MAX_HOURS, max_semesters=DEFAULT_MAX_SEMESTERS, strict=False):
+        self.requirements = program['requirements']
+        self.credits = program['credits']
+        self.max_hours = max_hours
+        self.max_semesters = max_semesters
+        # Results of evaluate() that let a course be scheduled
+        self.accepted = {MET} if strict else {MET, REVIEW}
+        self.last_term = max((requirement['term'] or 0 for requirement in self.requirements), default=0)
+
+        # Longest chain of program courses that depend on each code, so bottleneck courses go first
+        dependents = {}
+        for requirement in self.requirements:
+            for option in requirement['options']:
+                for code in course_codes(option['tree']):
+                    dependents.setdefault(code, set()).add(option['code'])
+        chain = {}
+
+        def chain_length(code, visiting=()):
+            if code not in chain:
+                if code in visiting:  # prerequisite cycle
+                    return 0
+                chain[code] = max((1 + chain_length(dependent, visiting + (code,))
+                                   for dependent in dependents.get(code, ())), default=0)
+            return chain[code]
+
+        self.priority = [
+            (requirement['term'] or 0, -max(chain_length(option['code']) for option in requirement['options']), n)
+            for n, requirement in enumerate(self.requirements)
+        ]
+
+    def plan(self, transcript):
+        """Plan one transcript ({"id", "completed", "placements", "max_hours", "hours"}); returns a JSON-ready dict"""
+        completed = completed_courses(transcript.get('completed'))
+        # Failed and withdrawn courses are still owed and get scheduled again
+        completed = {code: grade for code, grade in completed.items() if grade_passes(grade)}
+        placements = set(transcript.get('placements') or ())
+        max_hours = transcript.get('max_hours') or self.max_hours
+        hours = transcript.get('hours')
+        if hours is None:
+            hours = sum(self.credits.get(code, DEFAULT_CREDITS) for code in completed)
+
+        # Hours still owed per requirement, after what the transcript already covers;
+        # each transcript entry covers one requirement (three core slots need three courses)
+        owed = {}
+        counted = set()
+        for n, requirement in enumerate(self.requirements):
+            remaining = requirement['hours']
+            for option in requirement['options']:
+                if option['code'] in completed and option['code'] not in counted:
+                    remaining -= option['credits']
+                    counted.add(option['code'])
+            if remaining > 0:
+                owed[n] = remaining
+        pending = sorted(owed, key=self.priority.__getitem__)
+        # Plans start at the earliest semester with outstanding work, as the catalog recommends it
+        start = min((self.requirements[n]['term'] or 0 for n in pending), default=0)
+
+        semesters = []
+        term = start
+        while pending and len(semesters) < self.max_semesters:
+            level = classification(hours)
+            chosen = self._fill_semester(pending, owed, term, completed, placements, level, max_hours)
+            if not chosen and term >= self.last_term:
+                break  # nothing left can be taken, however long the student waits
+            semester_hours = 0
+            courses = []
+            for n, option in chosen:
+                requirement = self.requirements[n]
+                owed[n] -= option['credits']
+                semester_hours += option['credits']
+                if option['course']:
+                    completed[option['code']] = None
+                course = {"course": option['code'], "credits": option['credits']}
+                if option['code'] != requirement['label']:
+                    course["requirement"] = requirement['label']
+                courses.append(course)
+            semesters.append({"term": term_name(term), "hours": semester_hours, "courses": courses})
+            hours += semester_hours
+            pending = [n for n in pending if owed[n] > 0]
+            term += 1
+
+        plan = {"id": transcript.get('id'), "semesters": semesters,
+                "hours": sum(semester['hours'] for semester in semesters)}
+        if pending:
+            plan["unscheduled"] = [self.requirements[n]['label'] for n in pending]
+        return plan
+
+    def _eligible(self, option, completed, enrolled, placements, level):
+        return evaluate(option['tree'], completed, enrolled, level, placements) in self.accepted
+
+    def _fill_semester(self, pending, owed, term, completed, placements, level, max_hours):
+        """(requirement index, option) pairs to take in one semester
+
+        Concurrent-enrollment pairs such as CHEM 107 and CHEM 117 each need the
+        other in the same semester, so the pick is made assuming every
+        candidate is taken, then checked against what actually fit; courses
+        whose co-requisite didn't fit are dropped and the semester refilled.
+        """
+        candidates = []
+        for n in pending:
+            if (self.requirements[n]['term'] or 0) > term:
+                continue
+            taken = [option for option in self.requirements[n]['options']
+                     if option['course'] and option['code'] in completed]
+            for option in self.requirements[n]['options']:
+                # Placeholders ("University Core Curriculum", "MATH 300-499") can fill several slots
+                if option not in taken:
+                    candidates.append((n, option))
+        excluded = set()
+        while True:
+            available = [(n, option) for n, option in candidates if (n, option['code']) not in excluded]
+            enrolled = {option['code'] for _, option in available}
+            chosen = []
+            used = set()  # requirements and courses already in the semester
+            semester_hours = 0
+            for n, option in available:
+                if n in used or option['code'] in used:
+                    continue
+                if semester_hours + option['credits'] > max_hours and chosen:
+                    continue
+                if self._eligible(option, completed, enrolled, placements, level):
+                    chosen.append((n, option))
+                    used.add(n)
+                    if option['course']:
+                        used.add(option['code'])
+                    semester_hours += option['credits']
+            enrolled = {option['code'] for _, option in chosen}
+            dropped = [(n, option['code']) for n, option in chosen
+                       if not self._eligible(option, completed, enrolled, placements, level)]
+            if not dropped:
+                return chosen
+            excluded.update(dropped)
+
+
+# Process-pool worker state: each worker builds its Planner once
+
+_planner = None
+
+
+def _init_worker(program, options):
+    global _planner
+    _planner = Planner(program, **options)
+
+
+def _plan_chunk(transcripts):
+    return [plan_or_error(_planner, transcript) for transcript in transcripts]
+
+
+def plan_or_error(planner, transcript):
+    if "error" in transcript:  # a line read_transcripts could not parse
+        return transcript
+    try:
+        return planner.plan(transcript)
+    except Exception as e:
+        return {"id": transcript.get('id'), "error": f"{type(e).__name__}: {e}"}
+
+
+def chunks(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def plan_all(transcripts, program, processes=1, chunk_size=CHUNK_SIZE, **options):
+    """Plans for an iterable of transcripts, yielded in input order as they complete
+
+    Only a few chunks per worker are in flight at a time, so any number of
+    transcripts streams through in bounded memory.
+    """
+    if processes <= 1:
+        planner = Planner(program, **options)
+        for transcript in transcripts:
+            yield plan_or_error(planner, transcript)
+        return
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(program, options)) as pool:
+        in_flight = deque()
+        for chunk in chunks(transcripts, chunk_size):
+            in_flight.append(pool.submit(_plan_chunk, chunk))
+            if len(in_flight) >= processes * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def completed_courses(completed):
+    """A transcript's completed courses as {code: grade}, from a list of codes or a {code: grade} object"""
+    if completed is None:
+        return {}
+    if isinstance(completed, list) and all(isinstance(code, str) for code in completed):
+        completed = dict.fromkeys(completed)
+    if not isinstance(completed, dict):
+        raise ValueError(f"completed must be a list of course codes or an object of codes to grades, "
+                         f"not {type(completed).__name__}")
+    for code, grade in completed.items():
+        if not isinstance(code, str) or not isinstance(grade, (str, type(None))):
+            raise ValueError(f"completed must hold course codes and grades, not {code!r}: {grade!r}")
+    return completed
+
+
+def parse_completed(text):
+    """"MATH 151:A;ENGL 103" -> {"MATH 151": "A", "ENGL 103": None}"""
+    completed = {}
+    for item in text.split(';'):
+        code, _, grade = item.partition(':')
+        if code.strip():
+            completed[code.strip()] = grade.strip() or None
+    return completed
+
+
+def read_transcripts(f, format):
+    """Transcripts from an open CSV or NDJSON file, one at a time
+
+    A row or line that can't be read becomes {"id", "error"}, which
+    plan_or_error() passes through, so one bad record doesn't stop the batch.
+    """
+    if format == 'csv':
+        for n, row in enumerate(csv.DictReader(f)):
+            try:
+                yield {
+                    "id": row.get('id') or str(n + 1),
+                    "completed": parse_completed(row.get('completed') or ''),
+                    "placements": [p.strip() for p in (row.get('placements') or '').split(';') if p.strip()],
+                    "max_hours": float(row['max_hours']) if row.get('max_hours') else None,
+                    "hours": float(row['hours']) if row.get('hours') else None,
+                }
+            except ValueError as e:
+                yield {"id": row.get('id') or str(n + 1), "error": f"row {n + 1}: {type(e).__name__}: {e}"}
+    else:
+        for n, line in enumerate(f):
+            if line.strip():
+                try:
+                    transcript = json.loads(line)
+                    if not isinstance(transcript, dict):
+                        raise ValueError("a transcript must be a JSON object")
+                except ValueError as e:  # json.JSONDecodeError included
+                    yield {"id": str(n + 1), "error": f"line {n + 1}: {type(e).__name__}: {e}"}
+                    continue
+                transcript.setdefault('id', str(n + 1))
+                yield transcript
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate degree plans for a batch of student transcripts")
+    parser.add_argument('transcripts', help="CSV or NDJSON file of transcripts, - for stdin")
+    parser.add_argument('--format', choices=['csv', 'ndjson'],
+                        help="transcript format (default: from the file extension, NDJSON for stdin)")
+    parser.add_argument('--program', default=DEFAULT_PROGRAM,
+                        help="program export in the course store to plan for (default %(default)s)")
+    parser.add_argument('--output', default='-', help="NDJSON file to write the plans to (default stdout)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default %(default)s)")
+    parser.add_argument('--max-hours', type=float, default=DEFAULT_MAX_HOURS,
+                        help="credit hours per semester for transcripts that don't give max_hours (default %(default)s)")
+    parser.add_argument('--max-semesters', type=int, default=DEFAULT_MAX_SEMESTERS,
+                        help="longest plan to build (default %(default)s)")
+    parser.add_argument('--strict', action='store_true',
+                        help="treat approval, equivalent-coursework and free-text prerequisites as unmet")
+    parser.add_argument('--catalog-year', metavar='YEAR',
+                        help="plan under a saved catalog year instead of the current data (see catalog_years.py)")
+    add_store_arguments(parser)
+    add_years_file_argument(parser)
+    args = parser.parse_args(argv)
+
+    with store_from_args(args) as store:
+        if args.catalog_year:
+            years = years_from_args(args, store)
+            if args.catalog_year not in years.years():
+                parser.error(f"no catalog year {args.catalog_year}; saved: {', '.join(years.years()) or 'none'}")
+            # An in-memory store of that year's data files
+            store = years.year_store(args.catalog_year)
+        try:
+            program = load_program(store, args.program)
+        except KeyError:
+            parser.error(f"{args.program} is not in the course store; exports: {', '.join(store.exports())}")
+        except ValueError as e:
+            parser.error(str(e))
+    format = args.format or ('csv' if args.transcripts.lower().endswith('.csv') else 'ndjson')
+
+    source = sys.stdin if args.transcripts == '-' else open(args.transcripts, newline='', encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, "w", encoding='utf-8')
+    count = errors = incomplete = 0
+    start = time.perf_counter()
+    try:
+        plans = plan_all(read_transcripts(source, format), program, args.processes,
+                         max_hours=args.max_hours, max_semesters=args.max_semesters, strict=args.strict)
+        for plan in plans:
+            output.write(json.dumps(plan, separators=(',', ':')) + "\n")
+            count += 1
+            errors += "error" in plan
+            incomplete += "unscheduled" in plan
+            if count % 10000 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {count} plans, {count / elapsed:.0f} plans/s", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f"Planned {count} transcripts for {program['name']} in {elapsed:.2f}s "
+          f"({count / elapsed if elapsed else 0:.0f} plans/s, {args.processes} processes); "
+          f"{incomplete} with unscheduled requirements, {errors} errors", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+from http_client import DEFAULT_CLIENT
+from metrics import METRICS
+
+# Default location of the on-disk cache, next to the scraper scripts
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "http")
+DEFAULT_MAX_MB = 200
+DEFAULT_MAX_AGE = 24 * 60 * 60  # seconds an entry is served without revalidating
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a URL has never been cached"""
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class HttpCache:
+    """Content-addressed on-disk HTTP cache keyed by URL
+
+    Layout under `directory`:
+        index/<sha256(url)>.json   URL, ETag, Last-Modified, fetch time and body hash
+        objects/<sha256(body)>     raw response bodies, shared by identical pages
+
+    Fresh entries (younger than `max_age`) are served directly, stale ones are
+    revalidated with a conditional GET, and the least recently used entries are
+    evicted once the stored bodies exceed `max_bytes`. With `offline=True` only
+    cached entries are served and anything else raises CacheMiss.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024,
+                 max_age=DEFAULT_MAX_AGE, offline=False):
+        self.directory = directory
+        self.index_dir = os.path.join(directory, "index")
+        self.objects_dir = os.path.join(directory, "objects")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.offline = offline
+        self.lock = threading.Lock()
+        os.makedirs(self.index_dir, exist_ok=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.objects_dir))
+
+    def _index_path(self, url):
+        return os.path.join(self.index_dir, _sha256(url.encode('utf-8')) + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest)
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _load(self, url):
+        """Return (metadata, body) for a cached URL, or (None, None)"""
+        index_path = self._index_path(url)
+        try:
+            with open(index_path) as f:
+                meta = json.load(f)
+            with open(self._object_path(meta['body']), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+        # Touch the index entry so eviction sees it as recently used
+        try:
+            os.utime(index_path)
+        except OSError:
+            pass
+        return meta, body
+
+    def _store(self, url, response, body):
+        digest = _sha256(body)
+        meta = {
+            "url": url,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "encoding": response.encoding,
+            "fetched_at": time.time(),
+            "body": digest,
+        }
+        with self.lock:
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                self._write_atomic(object_path, body)
+                self.total_bytes += len(body)
+            self._write_atomic(self._index_path(url), json.dumps(meta).encode('utf-8'))
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+        return meta
+
+    def _refresh(self, url, meta):
+        """Record a successful revalidation (304) so the entry is fresh again"""
+        meta = dict(meta, fetched_at=time.time())
+        with self.lock:
+            self._write_atomic(self._index_path(url), json.dumps(meta).encode('utf-8'))
+        return meta
+
+    def _evict(self):
+        """Drop least recently used index entries until the stored bodies fit in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.index_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path) as f:
+                    digest = json.load(f)['body']
+            except (OSError, ValueError, KeyError):
+                digest = None
+            entries.append((entry.stat().st_mtime, entry.path, digest))
+        entries.sort()
+
+        references = {}
+        for _, _, digest in entries:
+            references[digest] = references.get(digest, 0) + 1
+
+        for _, index_path, digest in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            os.remove(index_path)
+            references[digest] -= 1
+            if digest and references[digest] == 0:
+                object_path = self._object_path(digest)
+                try:
+                    self.total_bytes -= os.path.getsize(object_path)
+                    os.remove(object_path)
+                except OSError:
+                    pass
+
+    def prune(self):
+        """Evict least recently used pages until the bodies fit in max_bytes; returns the bytes freed"""
+        with self.lock:
+            before = self.total_bytes
+            self._evict()
+            return before - self.total_bytes
+
+    def pages(self):
+        """Yield (url, text) for every page currently in the cache"""
+        for name in sorted(os.listdir(self.index_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.index_dir, name)) as f:
+                    meta = json.load(f)
+                with open(self._object_path(meta['body']), "rb") as f:
+                    body = f.read()
+            except (OSError, ValueError, KeyError):
+                continue
+            yield meta['url'], body.decode(meta['encoding'] or 'utf-8', errors='replace')
+
+    def get(self, url, client=None):
+        """Return the page text for url, from the cache when possible
+
+        Requests that do go out are sent through `client` (an HttpClient,
+        DEFAULT_CLIENT if None), so cache hits are never paced. Error
+        statuses raise requests.HTTPError and are never cached.
+        """
+        with METRICS.span("cache read"):
+            meta, body = self._load(url)
+        if meta is not None and (self.offline or time.time() - meta['fetched_at'] < self.max_age):
+            METRICS.count("cache hits")
+            return body.decode(meta['encoding'] or 'utf-8', errors='replace')
+        if self.offline:
+            METRICS.count("cache misses")
+            raise CacheMiss(f"{url} is not in the offline cache")
+
+        # Revalidate what we have with a conditional GET
+        headers = {}
+        if meta is not None:
+            if meta['etag']:
+                headers['If-None-Match'] = meta['etag']
+            if meta['last_modified']:
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = (client or DEFAULT_CLIENT).get(url, headers=headers)
+        if response.status_code == 304:
+            if meta is None:
+                import requests
+
+                raise requests.HTTPError(f"304 Not Modified for {url}, which is not cached", response=response)
+            METRICS.count("cache revalidated")
+            meta = self._refresh(url, meta)
+            return body.decode(meta['encoding'] or 'utf-8', errors='replace')
+
+        METRICS.count("cache misses")
+        if response.status_code == 200:
+            self._store(url, response, response.content)
+        return response.text
+
+
+def fetch_page(url, cache=None, client=None):
+    """Fetch a page's text through `client`, going through the on-disk cache when one is configured
+
+    Raises requests.HTTPError when the catalog answers with an error status such as 404.
+    """
+    if cache is None:
+        return (client or DEFAULT_CLIENT).get(url).text
+    return cache.get(url, client)
+
+
+def add_cache_arguments(parser):
+    """Register the HTTP cache options shared by the scraper scripts"""
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="directory of the on-disk HTTP cache (default %(default)s)")
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB,
+                        help="evict least recently used pages beyond this size (default %(default)s)")
+    parser.add_argument('--cache-max-age', type=float, default=DEFAULT_MAX_AGE,
+                        help="seconds a cached page is used without revalidating (default %(default)s)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="always download pages and leave the cache untouched")
+    parser.add_argument('--offline', action='store_true',
+                        help="serve pages only from the cache and make no network requests")
+
+
+def cache_from_args(args):
+    """Build the HttpCache selected by the command-line options (None with --no-cache)"""
+    if args.no_cache:
+        if args.offline:
+            raise SystemExit("--offline needs the cache; drop --no-cache")
+        return None
+    return HttpCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                     max_age=args.cache_max_age, offline=args.offline)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or shrink the on-disk HTTP cache (no network access)")
+    parser.add_argument('command', choices=['stats', 'prune'],
+                        help="stats: cached pages and size; prune: evict pages beyond --cache-max-mb")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="directory of the on-disk HTTP cache (default %(default)s)")
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB,
+                        help="size to prune the cache to (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    cache = HttpCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    if args.command == 'prune':
+        print(f"Freed {cache.prune() / (1024 * 1024):.1f} MB")
+    pages = sum(1 for name in os.listdir(cache.index_dir) if name.endswith(".json"))
+    print(f"{pages} pages, {cache.total_bytes / (1024 * 1024):.1f} MB in {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import random
+import threading
+import time
+
+from metrics import METRICS
+
+# Shared HTTP client for the scrapers: pooled keep-alive connections,
+# per-request timeouts, retries with jittered exponential backoff, and an
+# adaptive token-bucket limiter that slows down when the catalog struggles
+# (429/5xx, connection errors, latency spikes) and speeds back up when it
+# recovers.
+#
+# requests is imported on first use, so commands that never fetch a page
+# start without it.
+
+DEFAULT_TIMEOUT = 30.0  # seconds to connect, and between bytes of the response
+DEFAULT_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds; attempt n waits a random time up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0
+MAX_RETRY_AFTER = 120.0  # cap on how long a Retry-After header may pause the run
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Keep-alive connections shared by every fetch in the process; sized for the largest worker pools
+POOL_SIZE = 32
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """The process-wide pooled requests.Session"""
+    global _session
+    import requests
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate adapts to how the server is coping
+
+    Starts at `rate` requests per second, which is also the ceiling (0 means
+    no pacing). Throttling responses and errors halve the rate, down to
+    `min_rate`; responses several times slower than usual cut it by a
+    quarter; every other success adds back a small step (AIMD). A
+    Retry-After pauses all workers until it has passed.
+    """
+
+    SLOW_FACTOR = 3.0  # a response this many times slower than the average counts as a slowdown
+
+    def __init__(self, rate, burst=1, min_rate=None):
+        self.max_rate = rate if rate and rate > 0 else 0.0
+        self.rate = self.max_rate
+        self.min_rate = min_rate if min_rate is not None else self.max_rate / 16
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.latency = None  # moving average of successful response times
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may send a request"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                elif not self.rate:
+                    return
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def success(self, latency):
+        with self.lock:
+            slow = self.latency is not None and latency > self.SLOW_FACTOR * self.latency
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if not self.max_rate:
+                return
+            if slow:
+                self.rate = max(self.min_rate, self.rate * 0.75)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def throttled(self, retry_after=None):
+        with self.lock:
+            if self.max_rate:
+                self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+
+class HttpClient:
+    """GETs through the pooled session with timeouts, retries and adaptive pacing
+
+    Retries connection errors, timeouts and RETRY_STATUSES responses up to
+    `retries` times, waiting for Retry-After when the server sends one and a
+    jittered exponential backoff otherwise. When retries run out the last
+    error is raised (requests.HTTPError for a bad status). Any other
+    response that is not a success (2xx) or 304 Not Modified, such as 404,
+    raises requests.HTTPError at once, so an error page is never read as
+    catalog content.
+    """
+
+    def __init__(self, limiter=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+        self.limiter = limiter
+        self.timeout = timeout
+        self.retries = retries
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def get(self, url, headers=None):
+        import requests
+
+        for attempt in range(self.retries + 1):
+            if self.limiter is not None:
+                with METRICS.span("limiter wait"):
+                    self.limiter.wait()
+            with self.lock:
+                self.requests += 1
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = http_session().get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                METRICS.request(url, type(e).__name__, start, time.perf_counter(), 0, attempt)
+                error = e
+            else:
+                end = time.perf_counter()
+                METRICS.request(url, response.status_code, start, end, len(response.content), attempt)
+                if response.status_code not in RETRY_STATUSES:
+                    if self.limiter is not None:
+                        self.limiter.success(end - start)
+                    if not (200 <= response.status_code < 300 or response.status_code == 304):
+                        raise requests.HTTPError(f"{response.status_code} {response.reason} for {url}",
+                                                 response=response)
+                    return response
+                error = requests.HTTPError(f"{response.status_code} {response.reason} for {url}", response=response)
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            if self.limiter is not None:
+                self.limiter.throttled(retry_after)
+            if attempt == self.retries:
+                raise error
+            with self.lock:
+                self.retried += 1
+            METRICS.count("retries")
+            delay = retry_after if retry_after is not None else self.backoff(attempt)
+            print(f"  {error}; retrying in {delay:.1f}s")
+            with METRICS.span("retry backoff"):
+                time.sleep(delay)
+
+
+# Used when callers don't pass a client: retries and timeouts, but no pacing
+DEFAULT_CLIENT = HttpClient()
+
+
+def client_from_args(args):
+    """Build the HttpClient selected by add_fetch_arguments() options"""
+    return HttpClient(AdaptiveRateLimiter(args.rate), timeout=args.timeout, retries=args.retries)
@@ -0,0 +1,142 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+
+# Scrape manifest: remembers, for every program page and course, where it was
+# read from, a hash of the HTML fragment it was parsed from, and the parsed
+# result. A later run hashes the fragments it fetches and only re-parses the
+# ones whose hash changed.
+#
+#   {"programs": {"Computer Engineering": {"url", "hash", "parsed"}},
+#    "courses":  {"CSCE 221": {"url", "hash", "parsed"}}}
+#
+# Program entries hold the table walk output (before prerequisites are
+# filled in); course entries hold the requisites parsed from the course's block.
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/scrape_manifest.json")
+
+
+def fragment_hash(fragment):
+    return hashlib.sha256(fragment.encode('utf-8')).hexdigest()
+
+
+class Manifest:
+    """Thread-safe store of fragment hashes and parse results, saved as JSON"""
+
+    def __init__(self, path=DEFAULT_MANIFEST, entries=None, reuse=True):
+        self.path = path
+        self.entries = entries or {"programs": {}, "courses": {}}
+        self.reuse = reuse
+        self.lock = threading.Lock()
+        self.reused = 0
+        self.parsed = 0
+
+    @classmethod
+    def load(cls, path=DEFAULT_MANIFEST, reuse=True):
+        """Read a manifest, starting empty if the file is missing or unreadable"""
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = None
+        return cls(path, entries, reuse)
+
+    def lookup(self, kind, key, url, fragment):
+        """Return (found, parsed): the stored result if this fragment is unchanged since the last run
+
+        kind is "programs" or "courses". The result is a copy, so callers may
+        modify it without touching the manifest. With reuse=False nothing is
+        found, but record() still updates the manifest.
+        """
+        digest = fragment_hash(fragment)
+        with self.lock:
+            entry = self.entries[kind].get(key)
+            if self.reuse and entry is not None and entry['url'] == url and entry['hash'] == digest:
+                self.reused += 1
+                return True, copy.deepcopy(entry['parsed'])
+        return False, None
+
+    def parse(self, kind, key, url, fragment, parse):
+        """Return the parsed result for a fragment, calling parse() only if it changed since the last run"""
+        found, parsed = self.lookup(kind, key, url, fragment)
+        if found:
+            return parsed
+        parsed = parse()
+        self.record(kind, key, url, fragment, parsed)
+        return copy.deepcopy(parsed)
+
+    def record(self, kind, key, url, fragment, parsed):
+        with self.lock:
+            self.parsed += 1
+            self.entries[kind][key] = {"url": url, "hash": fragment_hash(fragment), "parsed": copy.deepcopy(parsed)}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self.lock, open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def _records_by_code(courses):
+    records = {}
+    for course in courses:
+        records.setdefault(course['course'], []).append(course)
+    return records
+
+
+def change_report(old_courses, new_courses):
+    """Course codes added, removed and changed between two lists of course records"""
+    old, new = _records_by_code(old_courses), _records_by_code(new_courses)
+    return {
+        "added": [code for code in new if code not in old],
+        "removed": [code for code in old if code not in new],
+        "changed": [code for code in new if code in old and new[code] != old[code]],
+    }
+
+
+def write_if_changed(path, program, courses):
+    """Write {program: courses} to path unless the file already holds exactly that
+
+    Returns (written, report), where report is change_report() against the
+    program's courses in the previous file.
+    """
+    text = json.dumps({program: courses}, indent=2)
+    try:
+        with open(path) as f:
+            old_text = f.read()
+        old_courses = json.loads(old_text).get(program, [])
+    except (OSError, ValueError):
+        old_text, old_courses = None, []
+    report = change_report(old_courses, courses)
+    if text == old_text:
+        return False, report
+    with open(path, "w") as f:
+        f.write(text)
+    return True, report
+
+
+def print_change_report(report):
+    if not any(report.values()):
+        print("No course changes since the last run")
+        return
+    for change in ["added", "removed", "changed"]:
+        if report[change]:
+            print(f"  {change.capitalize()} ({len(report[change])}): {', '.join(report[change])}")
+
+
+def add_manifest_arguments(parser):
+    """Register the incremental-scrape options shared by the scraper scripts"""
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST,
+                        help="manifest of fragment hashes from previous runs (default %(default)s)")
+    parser.add_argument('--full', action='store_true',
+                        help="re-parse every page instead of reusing unchanged results (the manifest is still updated)")
+    parser.add_argument('--change-report', metavar='FILE',
+                        help="also write the added/removed/changed course codes to FILE as JSON")
+
+
+def manifest_from_args(args):
+    """Build the Manifest selected by add_manifest_arguments() options"""
+    return Manifest.load(args.manifest, reuse=not args.full)
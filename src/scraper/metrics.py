@@ -0,0 +1,257 @@
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Run instrumentation shared by the scrapers. One process-wide recorder,
+# METRICS, collects:
+#   - every HTTP attempt: URL, status, latency, bytes and retry number
+#   - HTTP cache hits, revalidations and misses, and retries
+#   - time spent in timed sections (HTML parsing, regex extraction, waiting
+#     on the rate limiter, ...), summed over all threads
+#   - wall time of the script's top-level stages
+#   - peak resident memory
+# and writes them as a JSON run report (--report) and, optionally, a trace in
+# the Chrome trace-event format (--trace) that chrome://tracing or
+# https://ui.perfetto.dev opens as a per-thread timeline.
+#
+# Work done inside a process pool (the crawler's table walks) is only seen
+# as the parent's stage time.
+#
+# Request counts, bytes, statuses and latency totals are running aggregates;
+# only the most recent requests and trace events are kept individually, so a
+# long-running worker's recorder stays bounded. The worker also resets the
+# recorder before each job.
+
+SLOWEST_REQUESTS = 10  # listed individually in the report summary
+MAX_LOGGED_REQUESTS = 10000  # most recent requests kept for the request log and latency percentiles
+MAX_TRACE_EVENTS = 200000
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size of this process (or its largest finished child) in MB, if the platform reports it"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(usage.ru_maxrss * scale / (1024 * 1024), 1)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Metrics:
+    """Thread-safe recorder of requests, counters and timings for one run"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = None  # trace events, collected only once tracing is enabled
+        self._clear()
+
+    def _clear(self):
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.requests = deque(maxlen=MAX_LOGGED_REQUESTS)
+        self.request_count = 0
+        self.request_bytes = 0
+        self.request_latency = 0.0
+        self.statuses = Counter()
+        self.counters = Counter()
+        self.timers = {}  # section name -> [calls, seconds]
+        self.stages = {}  # top-level stage name -> seconds
+        self.current_stage = None
+        if self.events is not None:
+            self.events = deque(maxlen=MAX_TRACE_EVENTS)
+        self.thread_names = {}
+
+    def reset(self):
+        """Forget everything recorded so far, e.g. between a worker's jobs; tracing stays as it was"""
+        with self.lock:
+            self._clear()
+
+    def enable_trace(self):
+        with self.lock:
+            if self.events is None:
+                self.events = deque(maxlen=MAX_TRACE_EVENTS)
+
+    def _event(self, name, category, begin, end, args=None):
+        # Complete ("X") event; trace timestamps are microseconds
+        thread = threading.current_thread()
+        self.thread_names.setdefault(thread.ident, thread.name)
+        event = {"name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+                 "ts": round((begin - self.origin) * 1e6, 1), "dur": round((end - begin) * 1e6, 1)}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def add_time(self, name, begin, end, category="section", args=None):
+        """Record a timed section that ran from `begin` to `end` (time.perf_counter() values)"""
+        with self.lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += end - begin
+            if self.events is not None:
+                self._event(name, category, begin, end, args)
+
+    @contextmanager
+    def span(self, name, category="section"):
+        """Time the enclosed block under `name`"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, begin, time.perf_counter(), category)
+
+    def timed(self, name, category="section"):
+        """Decorator timing every call of a function under `name`"""
+        def decorate(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                begin = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.add_time(name, begin, time.perf_counter(), category)
+            return wrapper
+        return decorate
+
+    def request(self, url, status, begin, end, size, attempt=0):
+        """Record one HTTP attempt; `status` is the response code or the exception name"""
+        entry = {"url": url, "status": status, "start": round(begin - self.origin, 4),
+                 "latency": round(end - begin, 4), "bytes": size, "attempt": attempt}
+        with self.lock:
+            self.requests.append(entry)
+            self.request_count += 1
+            self.request_bytes += size
+            self.request_latency += entry['latency']
+            self.statuses[str(status)] += 1
+        self.add_time("http request", begin, end, "http", {"url": url, "status": status, "bytes": size})
+
+    def stage(self, name=None):
+        """End the current top-level stage and start `name` (None just ends it)"""
+        now = time.perf_counter()
+        with self.lock:
+            if self.current_stage is not None:
+                stage, begin = self.current_stage
+                self.stages[stage] = self.stages.get(stage, 0.0) + now - begin
+                if self.events is not None:
+                    self._event(stage, "stage", begin, now)
+            self.current_stage = (name, now) if name is not None else None
+
+    def report(self):
+        """The run report as a JSON-ready dict"""
+        self.stage(None)
+        with self.lock:
+            requests = list(self.requests)
+            latencies = sorted(entry['latency'] for entry in requests)
+            count, size, total = self.request_count, self.request_bytes, self.request_latency
+            statuses = dict(self.statuses)
+            counters = dict(self.counters)
+            timers = {name: {"calls": calls, "seconds": round(seconds, 4)}
+                      for name, (calls, seconds) in sorted(self.timers.items(), key=lambda item: -item[1][1])}
+            stages = {name: round(seconds, 4) for name, seconds in self.stages.items()}
+        return {
+            "script": os.path.basename(sys.argv[0]),
+            "argv": sys.argv[1:],
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.started_at)),
+            "elapsed": round(time.perf_counter() - self.origin, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_child_rss_mb": peak_rss_mb(children=True),
+            "stages": stages,
+            "timers": timers,
+            "requests": {
+                "count": count,
+                "bytes": size,
+                "retries": counters.get("retries", 0),
+                "by_status": statuses,
+                # Percentiles, max and the slowest list cover the logged (most recent) requests
+                "logged": len(requests),
+                "latency": {
+                    "total": round(total, 4),
+                    "mean": round(total / count, 4) if count else 0.0,
+                    "p50": _percentile(latencies, 0.5),
+                    "p90": _percentile(latencies, 0.9),
+                    "p99": _percentile(latencies, 0.99),
+                    "max": latencies[-1] if latencies else 0.0,
+                },
+                "slowest": sorted(requests, key=lambda entry: -entry['latency'])[:SLOWEST_REQUESTS],
+            },
+            "cache": {name: counters.get(f"cache {name}", 0) for name in ("hits", "revalidated", "misses")},
+            "counters": counters,
+            "request_log": requests,
+        }
+
+    def write_report(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_trace(self, path):
+        self.stage(None)
+        with self.lock:
+            events = list(self.events or [])
+            # Metadata events label each timeline row with its thread's name
+            events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                       for tid, name in self.thread_names.items()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self):
+        """One-line digest of the run for the console"""
+        report = self.report()
+        timers = report['timers']
+        parts = [f"{report['elapsed']:.1f}s", f"{report['requests']['count']} requests",
+                 f"{report['requests']['bytes'] / 1024:.0f} KB", f"{report['requests']['retries']} retries",
+                 "cache {hits}/{revalidated}/{misses} hit/revalidated/miss".format(**report['cache'])]
+        for name in ("html parse", "regex extract", "limiter wait"):
+            if name in timers:
+                parts.append(f"{name} {timers[name]['seconds']:.2f}s")
+        if report['peak_rss_mb'] is not None:
+            parts.append(f"peak RSS {report['peak_rss_mb']} MB")
+        return ", ".join(parts)
+
+
+METRICS = Metrics()
+
+
+def add_metrics_arguments(parser):
+    """Register the instrumentation options shared by the scraper scripts"""
+    parser.add_argument('--report', metavar='FILE',
+                        help="write a JSON run report (requests, cache, retries, timings, peak memory) to FILE")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="write a Chrome trace-event timeline of the run to FILE")
+
+
+def metrics_from_args(args):
+    """Set up METRICS for the selected options; the report and trace are written when the script exits"""
+    if args.trace:
+        METRICS.enable_trace()
+
+    def finish():
+        if args.report:
+            METRICS.write_report(args.report)
+        if args.trace:
+            METRICS.write_trace(args.trace)
+        if args.report or args.trace:
+            print(f"Run: {METRICS.summary()}")
+
+    # atexit also covers runs that stop early with SystemExit or Ctrl-C
+    atexit.register(finish)
+    return METRICS
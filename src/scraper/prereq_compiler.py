@@ -0,0 +1,299 @@
+import argparse
+import json
+import re
+
+# Compiles catalog prerequisite text into a normalized AND/OR tree, e.g.
+#
+#   "Grade of C or better in MATH 151 or MATH 150, or concurrent enrollment; junior or senior classification"
+#
+# becomes
+#
+#   {"type": "and", "args": [
+#       {"type": "or", "args": [
+#           {"type": "course", "course": "MATH 151", "min_grade": "C", "concurrent": true},
+#           {"type": "course", "course": "MATH 150", "min_grade": "C", "concurrent": true}]},
+#       {"type": "classification", "levels": ["junior", "senior"]}]}
+#
+# Node types:
+#   and / or         {"args": [...]}
+#   course           {"course", "min_grade" (letter or null), "concurrent" (may be taken alongside)}
+#   placement        {"subject"}              acceptable score on a placement exam
+#   classification   {"levels"}               student classification, e.g. ["junior", "senior"]
+#   approval         {"by"}                   approval of the instructor/department
+#   equivalent       {}                       "or equivalent" coursework
+#   text             {"text"}                 anything else, kept verbatim
+# An empty prerequisite compiles to None.
+
+CLASS_LEVELS = ['freshman', 'sophomore', 'junior', 'senior']
+GRADE_ORDER = 'ABCDF'
+PASSING_GRADES = 'ABCD'
+PASS_GRADES = {'S', 'P'}  # satisfactory / pass
+
+# Results of evaluate()
+MET = "met"
+UNMET = "unmet"
+REVIEW = "review"  # hinges on work a transcript can't show (approval, equivalent coursework, free text)
+UNCHECKED_TYPES = {'approval', 'equivalent', 'text'}
+
+GRADE_RE = re.compile(r'(?:with\s+)?(?:a\s+)?grade\s+(?:of\s+)?([A-D])\s+or\s+better(?:\s+in)?', re.IGNORECASE)
+CONCURRENT_ALLOWED_RE = re.compile(
+    r'\bor\s+(?:concurrent\s+(?:enrollment|registration)|registration\s+therein)s?\b(?!\s+in\b)', re.IGNORECASE)
+CLASSIFICATION_RE = re.compile(
+    r'\b((?:freshman|sophomore|junior|senior)(?:\s*(?:,|or|and)\s*(?:freshman|sophomore|junior|senior))*)\s+classification\b',
+    re.IGNORECASE)
+
+# Tokens of a single clause, tried left to right
+TOKEN_RE = re.compile(r'''
+    (?P<course>(?-i:[A-Z]{2,4}\s*\d{3}(?:\s*/\s*[A-Z]{2,4}\s*\d{3})*))
+  | (?P<concurrent_in>concurrent\s+(?:enrollment|registration)\s+in|registration\s+in)\b
+  | (?P<placement>(?:acceptable\s+scores?\s+on\s+)?(?:(?!or\b|and\b)[\w&.]+\s+){0,5}?placement\s+(?:exam|test)s?)
+  | (?P<approval>approval\s+of\s+(?:the\s+)?(?P<approver>instructor|department|advisor|major\s+department))
+  | (?P<equivalent>equivalent\s+course(?:work|s)?|equivalents?)\b
+  | (?P<connector>,|\bor\b|\band\b)
+  | (?P<word>[^\s,;]+)
+''', re.IGNORECASE | re.VERBOSE)
+CODE_RE = re.compile(r'([A-Z]{2,4})\s*(\d{3})')
+
+# Words that carry no requirement of their own once the tokens above are taken out
+FILLER_WORDS = {'in', 'a', 'an', 'the', 'with', 'of', 's', 'either', 'both', 'credit', 'for', 'completion'}
+
+
+def _course(code, grade, concurrent):
+    return {"type": "course", "course": code, "min_grade": grade, "concurrent": concurrent}
+
+
+def _node(op, args):
+    """Build a normalized and/or node: nested same-type nodes flattened, duplicates dropped, singletons unwrapped"""
+    flat = []
+    for arg in args:
+        if arg is None:
+            continue
+        for item in (arg['args'] if arg['type'] == op else [arg]):
+            if item not in flat:
+                flat.append(item)
+    if not flat:
+        return None
+    if len(flat) == 1:
+        return flat[0]
+    return {"type": op, "args": flat}
+
+
+def _combine(items, connectors):
+    """Join items with their connectors; 'and' binds tighter than 'or', commas follow the next connector"""
+    resolved = []
+    for n, connector in enumerate(connectors):
+        if connector == ',':
+            following = [c for c in connectors[n + 1:] if c != ',']
+            preceding = [c for c in connectors[:n] if c != ',']
+            connector = following[0] if following else (preceding[-1] if preceding else 'or')
+        resolved.append(connector)
+
+    groups = [[items[0]]]
+    for connector, item in zip(resolved, items[1:]):
+        if connector == 'and':
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+    return _node('or', [_node('and', group) for group in groups])
+
+
+def _compile_clause(clause):
+    grade_match = GRADE_RE.search(clause)
+    grade = grade_match.group(1).upper() if grade_match else None
+    clause = GRADE_RE.sub(' ', clause)
+
+    concurrent_allowed = bool(CONCURRENT_ALLOWED_RE.search(clause))
+    clause = CONCURRENT_ALLOWED_RE.sub(' ', clause)
+
+    items, connectors = [], []
+    words = []
+    concurrent_next = False
+    pending_connector = None
+
+    def push(item):
+        nonlocal pending_connector
+        if items:
+            connectors.append(pending_connector or ',')
+        items.append(item)
+        pending_connector = None
+
+    def flush_words():
+        meaningful = [w for w in words if w.lower() not in FILLER_WORDS]
+        if meaningful:
+            push({"type": "text", "text": ' '.join(words).strip(' .')})
+        words.clear()
+
+    # Classification phrases contain "or"/"and", so take them out before tokenizing
+    classification_items = []
+    for match in CLASSIFICATION_RE.finditer(clause):
+        levels = [level for level in CLASS_LEVELS if re.search(rf'\b{level}\b', match.group(1), re.IGNORECASE)]
+        classification_items.append((match.start(), {"type": "classification", "levels": levels}))
+    clause = CLASSIFICATION_RE.sub(lambda m: '\0' * len(m.group(0)), clause)
+
+    for token in TOKEN_RE.finditer(clause.replace('\0', ' ')):
+        while classification_items and classification_items[0][0] <= token.start():
+            flush_words()
+            push(classification_items.pop(0)[1])
+        kind = token.lastgroup if token.lastgroup != 'approver' else 'approval'
+        text = token.group(0)
+        if kind == 'word':
+            words.append(text)
+            continue
+        flush_words()
+        if kind == 'connector':
+            # ", or" / ", and" collapse into the word connector
+            connector = text.lower()
+            if connector != ',' or pending_connector is None:
+                pending_connector = connector
+            if connector == 'and':
+                concurrent_next = False
+            continue
+        if kind == 'concurrent_in':
+            concurrent_next = True
+            continue
+        if kind == 'course':
+            codes = [f"{dept} {num}" for dept, num in CODE_RE.findall(text)]
+            # "concurrent enrollment in X or Y" covers every course in the or-chain
+            push(_node('or', [_course(code, grade, concurrent_allowed or concurrent_next) for code in codes]))
+            continue
+        concurrent_next = False
+        if kind == 'placement':
+            subject = 'math' if re.search(r'\bmath', text, re.IGNORECASE) else 'general'
+            push({"type": "placement", "subject": subject})
+        elif kind == 'approval':
+            push({"type": "approval", "by": token.group('approver').lower()})
+        elif kind == 'equivalent':
+            push({"type": "equivalent"})
+    flush_words()
+    for _, item in classification_items:
+        push(item)
+
+    if not items:
+        return None
+    return _combine(items, connectors)
+
+
+def compile_prerequisites(text):
+    """Compile a prerequisite string into a normalized AND/OR tree (None when there are no prerequisites)"""
+    if not text or not text.strip():
+        return None
+    # Semicolons separate independent requirements
+    return _node('and', [_compile_clause(clause) for clause in text.split(';')])
+
+
+def course_codes(tree):
+    """Every course code mentioned in a compiled tree, in order of appearance"""
+    if tree is None:
+        return []
+    if tree['type'] == 'course':
+        return [tree['course']]
+    codes = []
+    for arg in tree.get('args', []):
+        for code in course_codes(arg):
+            if code not in codes:
+                codes.append(code)
+    return codes
+
+
+def grade_passes(grade, min_grade=None):
+    """True when a transcript grade completes a course, at min_grade or better if one is required
+
+    A missing grade (a transcript that only lists codes) counts as passed.
+    Letter grades may carry a +/- suffix; S and P pass any minimum. F, W, Q,
+    U, I, NG and other non-credit marks don't complete the course.
+    """
+    if grade is None:
+        return True
+    grade = grade.strip().upper()
+    if grade in PASS_GRADES:
+        return True
+    letter = grade.rstrip('+-')
+    if len(letter) != 1 or letter not in PASSING_GRADES:
+        return False
+    return min_grade is None or GRADE_ORDER.index(letter) <= GRADE_ORDER.index(min_grade)
+
+
+def _unchecked(tree):
+    return tree['type'] in UNCHECKED_TYPES
+
+
+def evaluate(tree, completed, enrolled=(), classification=None, placements=()):
+    """Evaluate a compiled tree for one student: MET, UNMET or REVIEW
+
+    completed       {code: letter grade or None} (or any iterable of codes, grades unknown)
+    enrolled        codes being taken in the same semester, for concurrent-enrollment leaves
+    classification  the student's classification, e.g. "junior"
+    placements      placement exam subjects passed, e.g. {"math"}
+
+    Approval, equivalent and free-text leaves can't be checked from a
+    transcript and evaluate to REVIEW. An "or" with course alternatives is
+    only met by one of its checkable alternatives, so "MATH 151 or
+    equivalents" is UNMET without MATH 151 rather than left for review.
+    """
+    if tree is None:
+        return MET
+    if not isinstance(completed, dict):
+        completed = dict.fromkeys(completed)
+    kind = tree['type']
+    if kind in ('and', 'or'):
+        args = tree['args']
+        if kind == 'or' and any(arg['type'] == 'course' for arg in args):
+            args = [arg for arg in args if not _unchecked(arg)]
+        results = {evaluate(arg, completed, enrolled, classification, placements) for arg in args}
+        decisive = UNMET if kind == 'and' else MET
+        if decisive in results:
+            return decisive
+        return REVIEW if REVIEW in results else (MET if kind == 'and' else UNMET)
+    if kind == 'course':
+        if tree['course'] in completed and grade_passes(completed[tree['course']], tree['min_grade']):
+            return MET
+        return MET if tree['concurrent'] and tree['course'] in enrolled else UNMET
+    if kind == 'classification':
+        return MET if classification is not None and classification.lower() in tree['levels'] else UNMET
+    if kind == 'placement':
+        return MET if tree['subject'] in placements else UNMET
+    return REVIEW
+
+
+def unmet_clauses(tree, completed, enrolled=(), classification=None, placements=()):
+    """The requirements joined by a tree's top-level "and" (or the tree itself) that evaluate to UNMET"""
+    if tree is None:
+        return []
+    clauses = tree['args'] if tree['type'] == 'and' else [tree]
+    return [clause for clause in clauses if evaluate(clause, completed, enrolled, classification, placements) == UNMET]
+
+
+def annotate_courses(courses):
+    """Return course records with a `prereq_tree` compiled from `prereqs`, placed right after it"""
+    annotated = []
+    for course in courses:
+        entry = {}
+        for key, value in course.items():
+            if key == 'prereq_tree':
+                continue
+            if key == 'alternatives':
+                value = annotate_courses(value)
+            entry[key] = value
+            if key == 'prereqs':
+                entry['prereq_tree'] = compile_prerequisites(value)
+        annotated.append(entry)
+    return annotated
+
+
+def main(argv=None):
+    """Recompile the prerequisite trees of existing course files in place"""
+    parser = argparse.ArgumentParser(description="Add compiled prerequisite trees to scraped course JSON files")
+    parser.add_argument('files', nargs='+', help="course files such as ../data/ce_courses.json")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        with open(path) as f:
+            data = json.load(f)
+        data = {program: annotate_courses(courses) for program, courses in data.items()}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Compiled prerequisite trees in {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+from collections import deque
+from itertools import product
+import argparse
+import json
+import os
+
+from course_store import COURSE_CODE_RE
+from prereq_compiler import UNCHECKED_TYPES, compile_prerequisites
+
+# Builds a compact prerequisite graph from the scraped course files so planners
+# can answer "what does X unlock" or "are X's prerequisites covered" with a
+# couple of list lookups and bitwise ANDs instead of scanning course lists.
+# Prerequisites are kept as clauses of alternatives ("CSCE 120 or CSCE 121"
+# and "CSCE 222 or ECEN 222"), so X's prerequisites are covered when every
+# clause shares a bit with the transcript.
+#
+# Artifact layout (src/data/prereq_graph.json), course IDs index `courses`:
+#   courses      course codes, sorted
+#   prereqs      id -> ids its prerequisites mention that must be completed in an earlier semester
+#   concurrent   id -> ids its prerequisites mention that may instead be taken in the same semester
+#   clauses      id -> hex bitsets of alternatives, one of each must be completed
+#                (course requirements only; placement, classification and the
+#                like are left to prereq_compiler.evaluate)
+#   unlocks      reverse of prereqs + concurrent
+#   topo_order   ids with every prerequisite before the courses it unlocks
+#   depth        id -> length of the longest prerequisite chain below it
+#   ancestors    id -> hex bitset of every transitive prerequisite
+#   descendants  id -> hex bitset of every course it transitively unlocks
+#   cycles       ids left out of the ordering because their prerequisites loop
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(script_dir, "../data")
+COURSE_FILES = ["ce_courses.json", "math_minor_courses.json"]
+GRAPH_FILE = os.path.join(DATA_DIR, "prereq_graph.json")
+
+
+def _tree_edges(tree, strict, concurrent):
+    """Collect course leaves of a compiled tree, split by whether concurrent enrollment counts"""
+    if tree is None:
+        return
+    if tree['type'] == 'course':
+        (concurrent if tree['concurrent'] else strict).append(tree['course'])
+    for arg in tree.get('args', []):
+        _tree_edges(arg, strict, concurrent)
+
+
+def _satisfiable_without_courses(tree):
+    return tree['type'] in ('placement', 'classification') or tree['type'] in UNCHECKED_TYPES
+
+
+def course_clauses(tree):
+    """A compiled tree's course requirements as an AND of OR clauses (sorted code lists)
+
+    As in evaluate(), unchecked alternatives (approval, equivalent, free
+    text) don't satisfy an "or" that lists courses. Requirements that can be
+    met without a course (placement exams, classification, an "or" offering
+    one of those) add no clause.
+    """
+    if tree is None:
+        return []
+    kind = tree['type']
+    if kind == 'course':
+        return [[tree['course']]]
+    if kind == 'and':
+        clauses = [clause for arg in tree['args'] for clause in course_clauses(arg)]
+    elif kind == 'or':
+        args = tree['args']
+        if any(arg['type'] == 'course' for arg in args):
+            args = [arg for arg in args if arg['type'] not in UNCHECKED_TYPES]
+        if any(_satisfiable_without_courses(arg) for arg in args):
+            return []
+        # (A and B) or C == (A or C) and (B or C)
+        alternatives = [course_clauses(arg) for arg in args]
+        if any(not clauses for clauses in alternatives):
+            return []
+        clauses = [sorted({code for clause in combination for code in clause}) for combination in product(*alternatives)]
+    else:
+        return []
+    unique = []
+    for clause in clauses:
+        if clause not in unique:
+            unique.append(clause)
+    return unique
+
+
+def course_requirements(course_files):
+    """Map every course code in the given files to (strict prereq codes, concurrent-ok codes, clauses)"""
+    requirements = {}
+    for path in course_files:
+        with open(path) as f:
+            data = json.load(f)
+        for courses in data.values():
+            for course in courses:
+                for entry in course.get('alternatives', []) + [course]:
+                    code = entry['course']
+                    # Skip special entries and ranges such as "University Core Curriculum" or "MATH 300-499"
+                    if not COURSE_CODE_RE.match(code) or code in requirements:
+                        continue
+                    tree = entry['prereq_tree'] if 'prereq_tree' in entry else compile_prerequisites(entry['prereqs'])
+                    strict, concurrent = [], []
+                    _tree_edges(tree, strict, concurrent)
+                    requirements[code] = (strict, [c for c in concurrent if c not in strict], course_clauses(tree))
+    return requirements
+
+
+def build_graph(requirements):
+    """Build the graph artifact (a JSON-ready dict) from course_requirements()"""
+    codes = set(requirements)
+    for strict, concurrent, _ in requirements.values():
+        codes.update(strict)
+        codes.update(concurrent)
+    courses = sorted(codes)
+    ids = {code: n for n, code in enumerate(courses)}
+
+    prereqs = [[] for _ in courses]
+    concurrent = [[] for _ in courses]
+    unlocks = [[] for _ in courses]
+    clauses = [[] for _ in courses]
+    for code, (strict_codes, concurrent_codes, code_clauses) in requirements.items():
+        course_id = ids[code]
+        prereqs[course_id] = sorted({ids[c] for c in strict_codes if c != code})
+        concurrent[course_id] = sorted({ids[c] for c in concurrent_codes if c != code})
+        clauses[course_id] = [format(sum(1 << ids[c] for c in clause), 'x') for clause in code_clauses]
+        for prereq_id in prereqs[course_id] + concurrent[course_id]:
+            unlocks[prereq_id].append(course_id)
+    unlocks = [sorted(set(targets)) for targets in unlocks]
+
+    # Kahn's algorithm over the strict edges; concurrent edges may point either way
+    remaining = [len(p) for p in prereqs]
+    strict_unlocks = [[] for _ in courses]
+    for course_id, prereq_ids in enumerate(prereqs):
+        for prereq_id in prereq_ids:
+            strict_unlocks[prereq_id].append(course_id)
+    ready = deque(course_id for course_id, count in enumerate(remaining) if count == 0)
+    topo_order = []
+    while ready:
+        course_id = ready.popleft()
+        topo_order.append(course_id)
+        for target in strict_unlocks[course_id]:
+            remaining[target] -= 1
+            if remaining[target] == 0:
+                ready.append(target)
+    cycles = [course_id for course_id, count in enumerate(remaining) if count > 0]
+
+    depth = [0] * len(courses)
+    for course_id in topo_order:
+        if prereqs[course_id]:
+            depth[course_id] = 1 + max(depth[prereq_id] for prereq_id in prereqs[course_id])
+
+    # Concurrent edges can point backwards in the ordering, so propagate to a fixpoint
+    ancestors = [0] * len(courses)
+    changed = True
+    while changed:
+        changed = False
+        for course_id in topo_order + cycles:
+            bits = ancestors[course_id]
+            for prereq_id in prereqs[course_id] + concurrent[course_id]:
+                bits |= ancestors[prereq_id] | (1 << prereq_id)
+            bits &= ~(1 << course_id)
+            if bits != ancestors[course_id]:
+                ancestors[course_id] = bits
+                changed = True
+
+    descendants = [0] * len(courses)
+    for course_id, bits in enumerate(ancestors):
+        prereq_id = 0
+        while bits:
+            if bits & 1:
+                descendants[prereq_id] |= 1 << course_id
+            bits >>= 1
+            prereq_id += 1
+
+    return {
+        "courses": courses,
+        "prereqs": prereqs,
+        "concurrent": concurrent,
+        "clauses": clauses,
+        "unlocks": unlocks,
+        "topo_order": topo_order,
+        "depth": depth,
+        "ancestors": [format(bits, 'x') for bits in ancestors],
+        "descendants": [format(bits, 'x') for bits in descendants],
+        "cycles": cycles,
+    }
+
+
+class PrereqGraph:
+    """Query API over a graph artifact built by build_graph()"""
+
+    def __init__(self, graph):
+        self.courses = graph['courses']
+        self.ids = {code: n for n, code in enumerate(self.courses)}
+        self.prereqs = graph['prereqs']
+        self.concurrent = graph['concurrent']
+        self.clauses = [[int(bits, 16) for bits in clauses] for clauses in graph['clauses']]
+        self.unlocks = graph['unlocks']
+        self.topo_order = graph['topo_order']
+        self.depth = graph['depth']
+        self.ancestors = [int(bits, 16) for bits in graph['ancestors']]
+        self.descendants = [int(bits, 16) for bits in graph['descendants']]
+
+    @classmethod
+    def load(cls, path=GRAPH_FILE):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def mask(self, codes):
+        """Bitset of the given course codes (unknown codes are ignored)"""
+        bits = 0
+        for code in codes:
+            if code in self.ids:
+                bits |= 1 << self.ids[code]
+        return bits
+
+    def codes(self, bits):
+        """Course codes of a bitset, in ID order"""
+        return [code for n, code in enumerate(self.courses) if bits >> n & 1]
+
+    def directly_unlocks(self, code):
+        """Courses that list `code` as a prerequisite"""
+        return [self.courses[n] for n in self.unlocks[self.ids[code]]] if code in self.ids else []
+
+    def all_unlocked_by(self, code):
+        """Every course that transitively depends on `code`"""
+        return self.codes(self.descendants[self.ids[code]]) if code in self.ids else []
+
+    def missing_prerequisites(self, code, transcript_mask):
+        """Bitsets of the prerequisite clauses of `code` the transcript has none of, each a set of alternatives"""
+        if code not in self.ids:
+            return []
+        return [clause for clause in self.clauses[self.ids[code]] if not clause & transcript_mask]
+
+    def is_reachable(self, code, transcript_mask):
+        """True when the transcript has one course of every prerequisite clause of `code`
+
+        Only course requirements are checked (not grades, placement exams or
+        classification); evaluate the course's prereq_tree for those.
+        """
+        return not self.missing_prerequisites(code, transcript_mask)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed prerequisite graph from scraped course files")
+    parser.add_argument('files', nargs='*', default=[os.path.join(DATA_DIR, name) for name in COURSE_FILES],
+                        help="course JSON files (default: %(default)s)")
+    parser.add_argument('-o', '--output', default=GRAPH_FILE, help="graph file to write (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    graph = build_graph(course_requirements(args.files))
+    with open(args.output, "w") as f:
+        json.dump(graph, f, separators=(',', ':'))
+
+    print(f"{os.path.basename(args.output)} created with {len(graph['courses'])} courses, "
+          f"longest prerequisite chain {max(graph['depth'], default=0)}")
+    if graph['cycles']:
+        print(f"Prerequisite cycles left out of the ordering: {', '.join(graph['courses'][n] for n in graph['cycles'])}")
+
+
+if __name__ == "__main__":
+    main()
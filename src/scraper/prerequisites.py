@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from course_blocks import course_block_fragments, extract_course_requisites, extract_prerequisites, requisite_text
+from course_index import DepartmentIndex
+from http_cache import fetch_page
+from http_client import DEFAULT_RETRIES, DEFAULT_TIMEOUT, AdaptiveRateLimiter, HttpClient
+from metrics import METRICS
+
+# Root of the course catalog; overridable so runs can target a local stand-in server
+CATALOG_URL = "https://catalog.tamu.edu"
+
+# Defaults for the concurrent fetch stage
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 4.0  # maximum requests per second across all workers (0 disables pacing)
+
+
+def page_requisites(html, course_code):
+    """Requisites of a course read from a catalog page (a whole search page or just its course block)"""
+    # Read the requisites from this course's own block on the results page
+    requisites = extract_course_requisites(html, course_code)
+    if requisites is not None:
+        return requisites
+
+    # No course blocks to target: fall back to scanning the whole page text
+    from bs4 import BeautifulSoup
+
+    with METRICS.span("html parse"):
+        text = BeautifulSoup(html, "html.parser").get_text()
+    prereqs = extract_prerequisites(text)
+    return {"prereqs": prereqs, "coreqs": "", "concurrent": ""}
+
+
+def fetch_prerequisites(course_code, catalog_url=CATALOG_URL, cache=None, client=None, manifest=None):
+    """Fetch prerequisites for a given course code
+
+    With a manifest, the course's block is only parsed if its markup changed
+    since the run that recorded it. Fetch errors propagate to the caller.
+    """
+    print(f"  Fetching prerequisites for {course_code}...")
+    # Construct the search URL
+    course_url = f"{catalog_url}/search/?P={course_code.replace(' ', '%20')}"
+
+    html = fetch_page(course_url, cache, client)
+    if manifest is None:
+        return requisite_text(page_requisites(html, course_code))
+
+    # Search pages list other results too; only this course's block matters
+    fragment = course_block_fragments(html).get(course_code, html)
+    return requisite_text(manifest.parse("courses", course_code, course_url, fragment,
+                                         lambda: page_requisites(fragment, course_code)))
+
+
+def pending_course_codes(courses):
+    """List course codes (including alternatives) whose prereqs still need fetching, in table order"""
+    codes = []
+    seen = set()
+    for course in courses:
+        for entry in course.get('alternatives', []) + [course]:
+            code = entry['course']
+            if entry['prereqs'] is None and code not in seen and 'alternatives' not in entry:
+                seen.add(code)
+                codes.append(code)
+    return codes
+
+
+def fetch_all_prerequisites(course_codes, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                            catalog_url=CATALOG_URL, cache=None, bulk=False, manifest=None, checkpoint=None,
+                            client=None, index=None):
+    """Resolve prerequisites for many course codes concurrently
+
+    Returns {code: prereqs} for the lookups that succeeded, in input order;
+    failed lookups are reported and left out. With a checkpoint, codes it has
+    already completed are not looked up again and every result is appended
+    to it as soon as it finishes.
+
+    With bulk=True each department's course-description page is downloaded
+    once and answers every lookup for that department; codes it doesn't list,
+    or whose department page can't be read, fall back to the per-course
+    search; pass a DepartmentIndex as `index` to
+    reuse pages it already read. A manifest, if given, skips parsing course
+    blocks that haven't changed since the last run.
+
+    Requests go through `client`, or a new HttpClient paced at up to `rate`
+    requests per second.
+    """
+    if client is None:
+        client = HttpClient(AdaptiveRateLimiter(rate))
+    prereqs = {}
+    if checkpoint is not None:
+        prereqs.update((code, checkpoint.completed[code]) for code in course_codes if code in checkpoint.completed)
+    remaining = [code for code in course_codes if code not in prereqs]
+
+    def done(course_code, text):
+        prereqs[course_code] = text
+        if checkpoint is not None:
+            checkpoint.record(course_code, text)
+
+    if bulk and remaining:
+        index = index or DepartmentIndex(catalog_url, cache, client, manifest)
+        index.load([code.split()[0] for code in remaining], concurrency)
+        unlisted = []
+        for code in remaining:
+            # A department whose page couldn't be read falls back to the per-course search
+            if code.split()[0] not in index.loaded:
+                unlisted.append(code)
+                continue
+            details = index.lookup(code)
+            if details is None:
+                unlisted.append(code)
+            else:
+                done(code, requisite_text(details))
+        remaining = unlisted
+
+    def fetch(course_code):
+        return fetch_prerequisites(course_code, catalog_url, cache, client, manifest)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = {pool.submit(fetch, code): code for code in remaining}
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                done(code, future.result())
+            except Exception as e:
+                print(f"Error fetching prerequisites for {code}: {e}")
+                if checkpoint is not None:
+                    checkpoint.fail(code, e)
+    finally:
+        # On Ctrl-C don't start the queued lookups; finished ones are already checkpointed
+        pool.shutdown(cancel_futures=True)
+
+    return {code: prereqs[code] for code in course_codes if code in prereqs}
+
+
+def resolve_prerequisites(courses, prereqs):
+    """Fill the placeholder (None) prereqs left by the table walk, keeping key order intact"""
+    for course in courses:
+        alternatives = course.get('alternatives', [])
+        for alt in alternatives:
+            if alt['prereqs'] is None:
+                alt['prereqs'] = prereqs.get(alt['course'], "")
+        if course['prereqs'] is None:
+            if alternatives:
+                # Use first alternative's prereqs as primary
+                course['prereqs'] = alternatives[0]['prereqs']
+            else:
+                course['prereqs'] = prereqs.get(course['course'], "")
+
+
+def add_fetch_arguments(parser):
+    """Register the fetch-stage options shared by the scraper scripts"""
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="number of prerequisite lookups in flight at once (default %(default)s)")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="maximum catalog requests per second; the rate backs off when the catalog "
+                             "throttles or slows down, 0 for unlimited (default %(default)s)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds to wait for a connection or response data (default %(default)s)")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help="retries for throttled, failed or timed-out requests (default %(default)s)")
+    parser.add_argument('--bulk', action='store_true',
+                        help="read each department's course-description page once instead of searching per course")
+    parser.add_argument('--catalog-url', default=CATALOG_URL,
+                        help="catalog root URL, e.g. a local stand-in server (default %(default)s)")
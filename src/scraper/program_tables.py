@@ -0,0 +1,130 @@
+from collections import namedtuple
+from importlib.util import find_spec
+import re
+
+from course_blocks import div_fragment
+from metrics import METRICS
+
+# Optional fast parsers; the BeautifulSoup backend is always available. Parsers
+# are imported when a backend first runs, so importing this module stays cheap.
+HAVE_LXML = find_spec('lxml') is not None
+HAVE_SELECTOLAX = find_spec('selectolax') is not None
+
+# Program pages keep their requirement tables in #programrequirementstextcontainer
+REQUIREMENTS_ID_RE = re.compile(r'^programrequirementstext')
+REQUIREMENTS_XPATH = ('//*[starts-with(@id, "programrequirementstext")]'
+                      '[not(ancestor::*[starts-with(@id, "programrequirementstext")])]')
+REQUIREMENTS_CSS = '[id^="programrequirementstext"]'
+REQUIREMENTS_DIV_RE = re.compile(r'<div\b[^>]*\bid\s*=\s*["\']programrequirementstext', re.IGNORECASE)
+
+# Plain-data view of a table row, identical whichever parser produced it:
+#   Row.cells  every td/th in the row, in document order
+#   Row.text   the row's full text
+#   Cell.tag   'td' or 'th'; Cell.classes is a tuple of class names
+Row = namedtuple('Row', 'cells text')
+Cell = namedtuple('Cell', 'tag classes text')
+
+
+def _bs4_tables(html):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(id=REQUIREMENTS_ID_RE))
+    tables = soup.find_all('table')
+    if not tables:
+        # Not a program page layout we recognize: use every table on the page
+        tables = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer('table')).find_all('table')
+    return [
+        [Row([Cell(cell.name, tuple(cell.get('class', [])), cell.get_text()) for cell in row.find_all(['td', 'th'])],
+             row.get_text())
+         for row in table.find_all('tr')]
+        for table in tables
+    ]
+
+
+def _lxml_tables(html):
+    import lxml.html
+
+    document = lxml.html.fromstring(html)
+    tables = [table for container in document.xpath(REQUIREMENTS_XPATH) for table in container.iter('table')]
+    if not tables:
+        tables = list(document.iter('table'))
+    return [
+        [Row([Cell(cell.tag, tuple(cell.get('class', '').split()), cell.text_content())
+              for cell in row.iter('td', 'th')],
+             row.text_content())
+         for row in table.iter('tr')]
+        for table in tables
+    ]
+
+
+def _within(node, container):
+    parent = node.parent
+    while parent is not None:
+        if parent == container:
+            return True
+        parent = parent.parent
+    return False
+
+
+def _selectolax_tables(html):
+    from selectolax.lexbor import LexborHTMLParser
+
+    document = LexborHTMLParser(html)
+    containers = document.css(REQUIREMENTS_CSS)
+    outermost = [node for node in containers if not any(_within(node, other) for other in containers if other is not node)]
+    tables = [table for container in outermost for table in container.css('table')]
+    if not tables:
+        tables = document.css('table')
+    return [
+        [Row([Cell(cell.tag, tuple((cell.attributes.get('class') or '').split()), cell.text(deep=True))
+              for cell in row.css('td, th')],
+             row.text(deep=True))
+         for row in table.css('tr')]
+        for table in tables
+    ]
+
+
+BACKENDS = {
+    'selectolax': (_selectolax_tables, HAVE_SELECTOLAX),
+    'lxml': (_lxml_tables, HAVE_LXML),
+    'bs4': (_bs4_tables, True),
+}
+
+
+def available_backends():
+    """Names of the parser backends that can run here, fastest first"""
+    return [name for name, (_, available) in BACKENDS.items() if available]
+
+
+def read_program_tables(html, backend='auto'):
+    """Read the requirement tables of a program page as lists of Rows
+
+    backend is 'selectolax', 'lxml', 'bs4' or 'auto' (the fastest installed).
+    """
+    if backend == 'auto':
+        backend = available_backends()[0]
+    reader, available = BACKENDS[backend]
+    if not available:
+        raise RuntimeError(f"The {backend} parser backend is not installed")
+    with METRICS.span("html parse"):
+        return reader(html)
+
+
+def requirements_fragment(html):
+    """Raw markup of a program page's requirement containers, or the whole page if it has none"""
+    fragments = []
+    end = 0
+    with METRICS.span("regex extract"):
+        for match in REQUIREMENTS_DIV_RE.finditer(html):
+            if match.start() < end:
+                continue  # nested inside the previous container
+            fragment = div_fragment(html, match.start())
+            fragments.append(fragment)
+            end = match.start() + len(fragment)
+    return ''.join(fragments) or html
+
+
+def add_parser_arguments(parser):
+    """Register the HTML parser backend option shared by the scraper scripts"""
+    parser.add_argument('--parser', choices=['auto'] + list(BACKENDS), default='auto',
+                        help="HTML parser for program requirement tables; auto picks the fastest installed (default %(default)s)")
@@ -0,0 +1,324 @@
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+
+from course_store import DATA_DIR, DEFAULT_DB, add_store_arguments, store_from_args
+
+# Builds a search index over every course in the store so planners can look
+# courses up without scanning the JSON arrays:
+#   - code prefixes ("CSCE 4", "csce4") by binary search over the sorted codes
+#   - fuzzy title matches ("algoritms") through trigrams of the title words
+#   - full text over titles and prerequisite text, every word required, the
+#     last one matched as a prefix so results narrow as the user types
+#
+# Artifact layout (src/data/search_index.json), course IDs index `codes`:
+#   codes      course codes, sorted
+#   titles     id -> title
+#   terms      words of titles and prerequisite text, sorted
+#   title      term -> delta-encoded ids whose title has the term
+#   prereqs    term -> delta-encoded ids whose prerequisite text has the term
+#   trigrams   {"grams": sorted trigrams of title words, "terms": delta-encoded term ids per trigram}
+#
+#   python search_index.py build
+#   python search_index.py query "data struct"
+
+INDEX_FILE = os.path.join(DATA_DIR, "search_index.json")
+FORMAT = 1
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+CODE_QUERY_RE = re.compile(r'^\s*([A-Za-z]{2,4})\s*(\d{0,3})\s*$')
+STOP_WORDS = {'a', 'an', 'and', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with', 'better', 'grade'}
+TITLE_WEIGHT = 3  # a word in the title counts this many times more than one in the prerequisites
+MIN_SIMILARITY = 0.5  # share of a query word's trigrams a title word must have to be a fuzzy match
+FUZZY_EXPANSIONS = 5  # title words tried for each misspelt query word
+MAX_EXPANSIONS = 50  # words a prefix such as "eng" expands to in full-text search
+DEFAULT_LIMIT = 10
+
+
+def words(text):
+    return [word for word in WORD_RE.findall((text or "").lower()) if word not in STOP_WORDS]
+
+
+def trigrams(text):
+    """Trigrams of each word, padded so word starts and ends count: "data" -> "  d", " da", "dat", "ata", "ta " """
+    grams = set()
+    for word in WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def normalize_code(query):
+    """"csce4" / "CSCE  4" -> "CSCE 4"; None when the query isn't a code prefix"""
+    match = CODE_QUERY_RE.match(query)
+    if not match:
+        return None
+    department, number = match.groups()
+    return f"{department.upper()} {number}" if number else department.upper()
+
+
+def _deltas(ids):
+    previous = 0
+    encoded = []
+    for course_id in ids:
+        encoded.append(course_id - previous)
+        previous = course_id
+    return encoded
+
+
+def _undelta(deltas):
+    ids = []
+    total = 0
+    for delta in deltas:
+        total += delta
+        ids.append(total)
+    return ids
+
+
+def build_index(courses):
+    """Build the index artifact (a JSON-ready dict) from course dicts with code, title and prereqs"""
+    courses = sorted({course['code']: course for course in courses}.values(), key=lambda course: course['code'])
+    title_postings = {}
+    prereq_postings = {}
+    for course_id, course in enumerate(courses):
+        for term in dict.fromkeys(words(course['title'])):
+            title_postings.setdefault(term, []).append(course_id)
+        for term in dict.fromkeys(words(course['prereqs'])):
+            prereq_postings.setdefault(term, []).append(course_id)
+    terms = sorted(set(title_postings) | set(prereq_postings))
+    gram_postings = {}
+    for term_id, term in enumerate(terms):
+        if term in title_postings:
+            for gram in trigrams(term):
+                gram_postings.setdefault(gram, []).append(term_id)
+    grams = sorted(gram_postings)
+    return {
+        "format": FORMAT,
+        "codes": [course['code'] for course in courses],
+        "titles": [course['title'] or "" for course in courses],
+        "terms": terms,
+        "title": [_deltas(title_postings.get(term, [])) for term in terms],
+        "prereqs": [_deltas(prereq_postings.get(term, [])) for term in terms],
+        "trigrams": {"grams": grams, "terms": [_deltas(gram_postings[gram]) for gram in grams]},
+    }
+
+
+def index_file(store):
+    """The index file of a store: src/data/search_index.json for the default store, None for any other"""
+    if os.path.abspath(store.path) != os.path.abspath(DEFAULT_DB):
+        return None
+    return INDEX_FILE
+
+
+def write_index(store, path=None):
+    """Rebuild the index from the store into `path` (default: index_file(store)); returns True if the file changed
+
+    Without a path, a store other than the default writes no index, so
+    scratch and test runs leave the repo's index alone.
+    """
+    path = path or index_file(store)
+    if path is None:
+        return False
+    data = json.dumps(build_index(store.courses()), ensure_ascii=False, separators=(',', ':'))
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data)
+    return True
+
+
+class SearchIndex:
+    """Query API over an index artifact built by build_index()"""
+
+    def __init__(self, index):
+        self.codes = index['codes']
+        self.titles = index['titles']
+        self.terms = index['terms']
+        self.term_ids = {term: n for n, term in enumerate(self.terms)}
+        # term -> {course id: weight}: the term's idf, TITLE_WEIGHT times over in titles
+        count = len(self.codes) or 1
+        self.weights = []
+        self.title_weights = []  # the same, for titles only
+        for title_ids, prereq_ids in zip(index['title'], index['prereqs']):
+            title_ids, prereq_ids = _undelta(title_ids), _undelta(prereq_ids)
+            idf = math.log(1 + count / len(set(title_ids) | set(prereq_ids)))
+            title_weights = dict.fromkeys(title_ids, idf * TITLE_WEIGHT)
+            weights = dict.fromkeys(prereq_ids, idf)
+            weights.update(title_weights)
+            self.weights.append(weights)
+            self.title_weights.append(title_weights)
+        # term -> [(-weight, course id)], best first, for single-word lookups that need only the top
+        self.ranked = [sorted((-weight, course_id) for course_id, weight in weights.items()) for weights in self.weights]
+        self.title_ranked = [sorted((-weight, course_id) for course_id, weight in weights.items())
+                             for weights in self.title_weights]
+        self.grams = {gram: _undelta(ids) for gram, ids in zip(index['trigrams']['grams'], index['trigrams']['terms'])}
+        self.gram_counts = [len(trigrams(term)) for term in self.terms]
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _ranked(self, scores, limit):
+        top = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [{"code": self.codes[course_id], "title": self.titles[course_id], "score": round(score, 3)}
+                for course_id, score in top]
+
+    def _merged(self, term_weights):
+        """{course id: weight} for a word matching several terms, each course at its best weight"""
+        if len(term_weights) == 1:
+            return term_weights[0][0] if term_weights[0][1] == 1 else {
+                course_id: weight * term_weights[0][1] for course_id, weight in term_weights[0][0].items()}
+        merged = {}
+        for weights, factor in term_weights:
+            for course_id, weight in weights.items():
+                if weight * factor > merged.get(course_id, 0):
+                    merged[course_id] = weight * factor
+        return merged
+
+    def prefix(self, query, limit=DEFAULT_LIMIT):
+        """Courses whose code starts with a code prefix such as "CSCE 4", in code order"""
+        prefix = normalize_code(query)
+        if prefix is None:
+            return []
+        start = bisect_left(self.codes, prefix)
+        return [{"code": self.codes[course_id], "title": self.titles[course_id]}
+                for course_id in range(start, min(start + limit, len(self.codes)))
+                if self.codes[course_id].startswith(prefix)]
+
+    def similar_terms(self, word):
+        """(term id, similarity) of the title words closest to a possibly misspelt word, best first
+
+        Candidates must contain at least MIN_SIMILARITY of the word's trigrams
+        and are ranked by trigram (Jaccard) similarity.
+        """
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        similar = [(term_id, count / (len(grams) + self.gram_counts[term_id] - count))
+                   for term_id, count in shared.items() if count >= MIN_SIMILARITY * len(grams)]
+        return heapq.nlargest(FUZZY_EXPANSIONS, similar, key=lambda item: item[1])
+
+    def fuzzy(self, query, limit=DEFAULT_LIMIT):
+        """Courses whose titles have words like the query's, tolerant of typos"""
+        # Title words only, weighted by how close they are to what was typed
+        matches = [similar for similar in map(self.similar_terms, words(query)) if similar]
+        if not matches:
+            return []
+        if len(matches) == 1:
+            return self._ranked(self._top_postings(matches[0], limit, self.title_ranked), limit)
+        # Courses matching every word, else the best matches of any one of them
+        scores = self._all_words(matches, self.title_weights)
+        if not scores:
+            scores = self._top_postings([term for similar in matches for term in similar], limit, self.title_ranked)
+        return self._ranked(scores, limit)
+
+    def _all_words(self, matches, weights):
+        """{course id: score} of courses matching every word, given each word's (term id, factor) pairs
+
+        Only the courses of the rarest word are scored, each looked up in the
+        other words' postings.
+        """
+        matches = sorted(matches, key=lambda terms: sum(len(weights[term_id]) for term_id, _ in terms))
+        scores = self._merged([(weights[term_id], factor) for term_id, factor in matches[0]])
+        for terms in matches[1:]:
+            postings = [(weights[term_id], factor) for term_id, factor in terms]
+            next_scores = {}
+            for course_id, score in scores.items():
+                weight = max(term_weights.get(course_id, 0) * factor for term_weights, factor in postings)
+                if weight:
+                    next_scores[course_id] = score + weight
+            scores = next_scores
+        return scores
+
+    def _matching_terms(self, query):
+        """Term ids each query word matches, the last word (still being typed) as a prefix; None if one matches nothing"""
+        query_words = words(query)
+        matches = []
+        for position, word in enumerate(query_words):
+            if position == len(query_words) - 1 and not query.endswith(' '):
+                start = bisect_left(self.terms, word)
+                term_ids = []
+                for term_id in range(start, min(start + MAX_EXPANSIONS, len(self.terms))):
+                    if not self.terms[term_id].startswith(word):
+                        break
+                    term_ids.append(term_id)
+            else:
+                term_ids = [self.term_ids[word]] if word in self.term_ids else []
+            if not term_ids:
+                return None
+            matches.append(term_ids)
+        return matches
+
+    def _top_postings(self, terms, limit, ranked=None):
+        """Best courses of any of the (term id, factor) pairs, each at its best weight
+
+        Reads only the top `limit` entries of each posting list, which is
+        enough for a single word: a course's score is its best term's weight.
+        """
+        ranked = ranked or self.ranked
+        best = {}
+        for term_id, factor in terms:
+            for weight, course_id in islice(ranked[term_id], limit):
+                if weight * factor < best.get(course_id, 0):
+                    best[course_id] = weight * factor
+        return {course_id: -weight for course_id, weight in best.items()}
+
+    def text(self, query, limit=DEFAULT_LIMIT):
+        """Courses with every query word in their title or prerequisites, the last word as a prefix"""
+        matches = self._matching_terms(query)
+        if not matches:
+            return []
+        matches = [[(term_id, 1) for term_id in term_ids] for term_ids in matches]
+        if len(matches) == 1:
+            return self._ranked(self._top_postings(matches[0], limit), limit)
+        return self._ranked(self._all_words(matches, self.weights), limit)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Code prefix matches for code-like queries, else full-text matches, else fuzzy title matches"""
+        return self.prefix(query, limit) or self.text(query, limit) or self.fuzzy(query, limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the course search index")
+    parser.add_argument('--index', help=f"index file (default {INDEX_FILE}; build needs it when --db is another store)")
+    add_store_arguments(parser)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('build', help="rebuild the index from the course store")
+    query = commands.add_parser('query', help="search the index")
+    query.add_argument('text')
+    query.add_argument('--mode', choices=['auto', 'prefix', 'fuzzy', 'text'], default='auto',
+                       help="kind of search (default %(default)s: code prefix, then full text, then fuzzy)")
+    query.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help="results to show (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        with store_from_args(args) as store:
+            path = args.index or index_file(store)
+            if path is None:
+                parser.error("--db is not the default course store; pass --index FILE to say where its index goes")
+            written = write_index(store, path)
+        index = SearchIndex.load(path)
+        print(f"{os.path.basename(path)} {'written' if written else 'unchanged'}: {len(index.codes)} courses, "
+              f"{len(index.terms)} terms, {len(index.grams)} trigrams")
+        return
+    index = SearchIndex.load(args.index or INDEX_FILE)
+    search = {'auto': index.search, 'prefix': index.prefix, 'fuzzy': index.fuzzy, 'text': index.text}[args.mode]
+    for result in search(args.text, args.limit):
+        score = f"{result['score']:>7.2f}  " if 'score' in result else ""
+        print(f"{score}{result['code']:10}{result['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+import hashlib
+import random
+import threading
+import time
+
+
+class StandInCatalog:
+    """Local HTTP server that answers catalog URLs from an in-memory {path: html} map
+
+    Used to exercise the scrapers without touching catalog.tamu.edu, e.g.:
+
+        with StandInCatalog(pages, latency=0.1) as catalog:
+            fetch_all_prerequisites(codes, catalog_url=catalog.url)
+
+    Faults can be injected to exercise retries and rate adaptation:
+        throttle_rate  fraction of requests answered 429 with Retry-After: retry_after
+        capacity       requests per second served before answering 429 (0 for no limit)
+        error_rate     fraction of requests answered 503 without Retry-After
+        slow_rate      fraction of requests delayed by an extra slow_latency seconds
+    """
+
+    def __init__(self, pages, latency=0.0, port=0, throttle_rate=0.0, retry_after=1, capacity=0.0,
+                 error_rate=0.0, slow_rate=0.0, slow_latency=0.0, seed=0):
+        self.pages = {unquote(path): html for path, html in pages.items()}
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.random = random.Random(seed)
+        self.allowance = capacity
+        self.last_request = time.monotonic()
+        self.requests_served = 0
+        self.faults = {"throttled": 0, "errors": 0, "slowed": 0}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        catalog = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fault = catalog._fault()
+                if fault == "slowed":
+                    time.sleep(catalog.slow_latency)
+                if catalog.latency:
+                    time.sleep(catalog.latency)
+                if fault in ("throttled", "errors"):
+                    self.send_response(429 if fault == "throttled" else 503)
+                    if fault == "throttled" and catalog.retry_after is not None:
+                        self.send_header('Retry-After', str(catalog.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                html = catalog.pages.get(unquote(self.path))
+                status = 200 if html is not None else 404
+                body = (html if html is not None else "<html><body>No results</body></html>").encode('utf-8')
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                if status == 200:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client timed out and hung up
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _fault(self):
+        """Count a request and pick the fault injected into it, if any"""
+        with self.lock:
+            self.requests_served += 1
+            fault = None
+            if self.capacity:
+                # Server-side token bucket: refill at `capacity` per second, one second of burst
+                now = time.monotonic()
+                self.allowance = min(self.capacity, self.allowance + (now - self.last_request) * self.capacity)
+                self.last_request = now
+                if self.allowance < 1:
+                    fault = "throttled"
+                else:
+                    self.allowance -= 1
+            if fault is None:
+                roll = self.random.random()
+                if roll < self.throttle_rate:
+                    fault = "throttled"
+                elif roll < self.throttle_rate + self.error_rate:
+                    fault = "errors"
+                elif roll < self.throttle_rate + self.error_rate + self.slow_rate:
+                    fault = "slowed"
+            if fault is not None:
+                self.faults[fault] += 1
+            return fault
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
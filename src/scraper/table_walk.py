@@ -0,0 +1,325 @@
+import re
+
+from metrics import METRICS
+
+# Table walks that turn a program page's requirement tables (lists of Rows
+# from program_tables.read_program_tables) into course records. Prerequisites
+# are left as None placeholders for the fetch stage to fill in.
+#
+# Both layouts share one single-pass walker: each row is looked at once, in a
+# "scan" state or while collecting the options of a "Select one ..." group,
+# and courses already recorded are found through a dict index rather than by
+# searching the records collected so far.
+
+CODE_RE = re.compile(r'([A-Z]{2,4})\s*(\d+)')
+CODE_OR_RANGE_RE = re.compile(r'([A-Z]{2,4})\s*(\d+(?:-\d+)?)')  # also MATH 300-499
+OR_SPLIT_RE = re.compile(r'\s+or\s+')
+CREDITS_RE = re.compile(r'(\d+)')
+
+# Title cleanup: footnote markers ("Engineering Mathematics I1,4") and whitespace
+FOOTNOTE_RE = re.compile(r'\s*\d+\s*,?\s*')
+WHITESPACE_RE = re.compile(r'\s+')
+
+SEMESTER_NAMES = ['fall', 'spring', 'summer']
+
+
+def clean_code(text):
+    return text.strip().replace('\u200b', '').replace('\u00a0', ' ')
+
+
+def clean_title(text):
+    return WHITESPACE_RE.sub(' ', FOOTNOTE_RE.sub(' ', text.strip())).strip()
+
+
+def cell_credits(cells, default=3):
+    """Credit hours from the third cell of a row, if it has one with a number"""
+    if len(cells) > 2:
+        credit_match = CREDITS_RE.search(cells[2].text.strip())
+        if credit_match:
+            return int(credit_match.group(1))
+    return default
+
+
+class TableWalk:
+    """Single-pass walk over requirement tables; subclasses supply the layout's rules"""
+
+    # Row text that opens a group of alternatives
+    select_patterns = ['select one', 'choose one', 'select from']
+    code_re = CODE_RE
+
+    def __init__(self):
+        self.courses = []
+        self.index = {}  # course code -> first record with that code
+        self.group = None
+
+    @METRICS.timed("table walk")
+    def walk(self, tables):
+        for rows in tables:
+            self.start_table()
+            for row in rows:
+                self.feed(row)
+            self.close_group()
+        return self.courses
+
+    def add(self, record):
+        self.courses.append(record)
+        self.index.setdefault(record['course'], record)
+
+    def start_table(self):
+        pass
+
+    def feed(self, row):
+        if self.group is not None:
+            option = self.option(row)
+            if option is not None:
+                self.group['rows'].append(row)
+                self.group['options'].append(option)
+                return
+            self.close_group()
+        self.scan(row)
+
+    def open_group(self, row, row_text):
+        self.group = {"row": row, "row_text": row_text, "rows": [], "options": []}
+
+    def close_group(self):
+        group, self.group = self.group, None
+        if group is None:
+            return
+        if len(group['options']) > 1:
+            self.add_group(group)
+            return
+        # Not a real group: handle the "select" row as an ordinary row, then replay the rows read after it
+        self.ungrouped(group['row'])
+        for row in group['rows']:
+            self.feed(row)
+
+    def option(self, row):
+        """(code, title) when a row is an option of the open group, otherwise None"""
+        cells = [cell for cell in row.cells if cell.tag == 'td']
+        code = None
+        for cell in cells:
+            if 'codecol' in cell.classes:
+                course_match = self.code_re.search(clean_code(cell.text))
+                if course_match:
+                    code = course_match.group(1) + " " + course_match.group(2)
+                break
+        if code is None:
+            code = self.uncoded_option(cells)
+            if code is None:
+                return None
+        name = self.option_title(code, cells[1].text) if len(cells) > 1 else ""
+        return code, name
+
+    def uncoded_option(self, cells):
+        return None
+
+    def option_title(self, code, text):
+        return clean_title(text)
+
+    def group_details(self, group):
+        """Credits of the first option and the name field of a group record"""
+        first_cells = [cell for cell in group['rows'][0].cells if cell.tag == 'td']
+        credits = cell_credits(first_cells)
+        # Store all names as a list, or as a single string if only one name
+        course_names = [name for _, name in group['options'] if name]
+        return credits, course_names[0] if len(course_names) == 1 else course_names
+
+    def scan(self, row):
+        raise NotImplementedError
+
+    def add_group(self, group):
+        raise NotImplementedError
+
+    def ungrouped(self, row):
+        pass
+
+
+class DegreePlanWalk(TableWalk):
+    """Semester-by-semester degree plan, such as the Computer Engineering BS
+
+    Year and semester header rows set the semester of the courses below them,
+    "Select one" groups become one record with alternatives, and other course
+    rows are recorded once per code.
+    """
+
+    def start_table(self):
+        self.current_year = ""
+        self.current_semester = ""
+
+    def semester(self):
+        return f"{self.current_year} {self.current_semester}".strip()
+
+    def scan(self, row):
+        cells = row.cells
+        if cells:
+            # Year header (has 'year' class) or semester header (first cell names a semester)
+            if 'year' in cells[0].classes:
+                self.current_year = cells[0].text.strip()
+                return
+            first_cell_text = cells[0].text.strip()
+            if any(sem in first_cell_text.lower() for sem in SEMESTER_NAMES):
+                self.current_semester = first_cell_text
+                return
+
+        row_text = row.text.lower()
+        if any(pattern in row_text for pattern in self.select_patterns):
+            self.open_group(row, row_text)
+            return
+        self.course_row(row)
+
+    def ungrouped(self, row):
+        self.course_row(row)
+
+    def add_group(self, group):
+        credits, course_name = self.group_details(group)
+        self.add({
+            "course": group['options'][0][0],
+            "alternatives": [
+                {"course": code, "name": name, "credits": credits, "prereqs": None}
+                for code, name in group['options']
+            ],
+            "name": course_name,
+            "credits": credits,
+            "prereqs": None,  # Filled from the first alternative once prerequisites are fetched
+            "semester": self.semester(),
+            "difficulty": 3
+        })
+
+    def course_row(self, row):
+        cells = row.cells
+        for cell in cells:
+            if 'codecol' not in cell.classes:
+                continue
+            cell_text = clean_code(cell.text)
+
+            # Course code(s): "ENGL 103 or ENGL 104" alternatives, "ENGR 216/PHYS 216" cross listings, or one code
+            if 'or' in cell_text.lower() or '/' in cell_text:
+                parts = OR_SPLIT_RE.split(cell_text) if 'or' in cell_text.lower() else cell_text.split('/')
+                alternatives = []
+                for part in parts:
+                    course_match = CODE_RE.search(part.strip())
+                    if course_match:
+                        alternatives.append(course_match.group(1) + " " + course_match.group(2))
+                course_code = alternatives[0] if alternatives else cell_text
+            else:
+                course_match = CODE_RE.search(cell_text)
+                if not course_match:
+                    continue
+                course_code = course_match.group(1) + " " + course_match.group(2)
+                alternatives = [course_code]
+
+            course_name = clean_title(cells[1].text) if len(cells) > 1 else ""
+            credits = cell_credits(cells)
+
+            # Special entries like "University Core Curriculum" or "Senior Design" are not deduplicated
+            if not CODE_RE.search(course_code):
+                self.add({
+                    "course": cell_text,
+                    "name": course_name,
+                    "credits": credits,
+                    "prereqs": "",
+                    "semester": self.semester(),
+                    "difficulty": 3
+                })
+                continue
+
+            if course_code in self.index:
+                continue
+            record = {"course": course_code}
+            if len(alternatives) > 1:
+                # For now, use the same name and credits for all alternatives
+                record["alternatives"] = [
+                    {"course": alt_course, "name": course_name, "credits": credits, "prereqs": None}
+                    for alt_course in alternatives
+                ]
+            record.update({
+                "name": course_name,
+                "credits": credits,
+                "prereqs": None,  # Filled once prerequisites are fetched
+                "semester": self.semester(),
+                "difficulty": 3
+            })
+            self.add(record)
+
+
+class CourseListWalk(TableWalk):
+    """Requirement list made of "select ..." groups, such as the Math Minor
+
+    Only the groups are recorded. Options may be course ranges such as
+    MATH 300-499, which keep a placeholder instead of fetched prerequisites.
+    """
+
+    select_patterns = TableWalk.select_patterns + ['select 9 hours']
+    code_re = CODE_OR_RANGE_RE
+
+    def scan(self, row):
+        row_text = row.text.lower()
+        if any(pattern in row_text for pattern in self.select_patterns):
+            self.open_group(row, row_text)
+
+    def uncoded_option(self, cells):
+        # No codecol cell: look for a course code in the first cell
+        if cells:
+            course_match = self.code_re.search(clean_code(cells[0].text))
+            if course_match:
+                return course_match.group(1) + " " + course_match.group(2)
+        return None
+
+    def option_title(self, code, text):
+        name = clean_title(text)
+        # Range courses without a title get a descriptive one
+        if not name and '-' in code:
+            if '300-499' in code:
+                name = "Upper-level Mathematics Courses"
+            elif '400-499' in code:
+                name = "Advanced Mathematics Courses"
+            else:
+                name = f"Mathematics Courses {code.split()[-1]}"
+        return name
+
+    def add_group(self, group):
+        row_text = group['row_text']
+        if 'select 9 hours' in row_text or 'select 9 credit hours' in row_text:
+            selection_type = "Select 9 credit hours from the following"
+            required_credits = 9
+        elif 'select one' in row_text:
+            selection_type = "Select one from the following"
+            required_credits = 3  # Assuming each course is 3 credits
+        else:
+            selection_type = "Select from the following"
+            required_credits = 3
+
+        credits, course_name = self.group_details(group)
+        self.add({
+            "course": group['options'][0][0],
+            "alternatives": [
+                # Range courses (e.g., MATH 300-499) aren't looked up; specific courses are fetched after the walk
+                {"course": code, "name": name, "credits": credits,
+                 "prereqs": "See individual course listings" if '-' in code else None}
+                for code, name in group['options']
+            ],
+            "name": course_name,
+            "credits": required_credits,  # Use the required credits (9 for "select 9 hours")
+            "prereqs": None,  # Filled from the first alternative once prerequisites are fetched
+            "semester": "",
+            "difficulty": 3,
+            "selection_requirement": selection_type,
+            "note": f"Must select {required_credits} credit hours from the listed alternatives"
+        })
+
+
+def walk_degree_plan(tables):
+    """Course records of a semester-by-semester degree plan, such as the Computer Engineering BS"""
+    return DegreePlanWalk().walk(tables)
+
+
+def walk_course_list(tables):
+    """Course groups of a requirement list with "select ..." groups, such as the Math Minor"""
+    return CourseListWalk().walk(tables)
+
+
+def walk_program_tables(tables):
+    """Walk a program's tables with the walk that fits its layout: year/semester headers mean a degree plan"""
+    if any('year' in cell.classes for rows in tables for row in rows for cell in row.cells[:1]):
+        return walk_degree_plan(tables)
+    return walk_course_list(tables)
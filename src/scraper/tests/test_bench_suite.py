@@ -0,0 +1,32 @@
+import pytest
+
+from bench_suite import (DEFAULT_FIXTURES, PROGRAM_PAGES, bench_fetch, bench_scripts, bench_tables, load_fixtures,
+                         save_fixtures, synthetic_pages)
+from standin_server import StandInCatalog
+
+
+@pytest.fixture(scope="module")
+def pages():
+    return load_fixtures(DEFAULT_FIXTURES)
+
+
+def test_generated_fixtures_have_every_program_page(tmp_path):
+    save_fixtures(synthetic_pages(), str(tmp_path))
+    generated = load_fixtures(str(tmp_path))
+    assert set(PROGRAM_PAGES.values()) <= set(generated)
+    assert "/search/?P=CSCE 221" in generated
+
+
+def test_tables_and_fetch_benchmarks_run(pages):
+    results = bench_tables(pages, 1)
+    assert "tables/bs4" in results
+    with StandInCatalog(pages) as catalog:
+        results = bench_fetch(pages, catalog, 1)
+    assert results["fetch_prerequisites"]["median"] > 0
+
+
+def test_scrapers_run_against_the_fixtures(pages):
+    with StandInCatalog(pages) as catalog:
+        results = bench_scripts(pages, catalog, 1)
+    for name in PROGRAM_PAGES:
+        assert f"e2e/{name}" in results
@@ -0,0 +1,60 @@
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+import requests
+
+from bench_suite import DEFAULT_FIXTURES, load_fixtures
+from catalog import PROGRAMS, CatalogScraper, ScrapeError
+from checkpoint import Checkpoint
+from standin_server import StandInCatalog
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CE_PATH = PROGRAMS["ce"].path
+
+
+@pytest.fixture(scope="module")
+def pages():
+    return load_fixtures(DEFAULT_FIXTURES)
+
+
+def test_missing_search_page_fails_the_lookup(pages, tmp_path):
+    pages = {path: html for path, html in pages.items() if path != "/search/?P=CSCE 221"}
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.ndjson"), "ce")
+    with StandInCatalog(pages) as catalog:
+        scraper = CatalogScraper(catalog.url, rate=0)
+        with pytest.raises(ScrapeError) as error:
+            scraper.scrape_program(catalog.url + CE_PATH, checkpoint=checkpoint)
+    checkpoint.close()
+    assert error.value.failed == ["CSCE 221"]
+    assert "CSCE 221" in checkpoint.failed and "CSCE 221" not in checkpoint.completed
+
+
+def test_missing_program_page_raises(pages):
+    with StandInCatalog({path: html for path, html in pages.items() if path != CE_PATH}) as catalog:
+        with pytest.raises(requests.HTTPError):
+            CatalogScraper(catalog.url, rate=0).scrape_program(catalog.url + CE_PATH)
+
+
+def test_missing_program_page_leaves_the_data_file_alone(pages, tmp_path):
+    # A scratch copy, so a run that did write would write under tmp_path
+    work_dir = tmp_path / "scraper"
+    work_dir.mkdir()
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for source in glob.glob(os.path.join(SCRAPER_DIR, "*.py")):
+        shutil.copy(source, work_dir)
+    export = data_dir / PROGRAMS["ce"].export
+    export.write_text('{"Computer Engineering": [{"course": "CSCE 221"}]}')
+
+    with StandInCatalog({path: html for path, html in pages.items() if path != CE_PATH}) as catalog:
+        run = subprocess.run([sys.executable, "catalog.py", "ce", "--catalog-url", catalog.url, "--no-cache",
+                              "--rate", "0", "--retries", "0"], cwd=work_dir, capture_output=True, text=True)
+
+    assert run.returncode == 1
+    assert "404" in run.stderr and "was not written" in run.stderr
+    assert export.read_text() == '{"Computer Engineering": [{"course": "CSCE 221"}]}'
+    assert not (data_dir / "courses.sqlite").exists()
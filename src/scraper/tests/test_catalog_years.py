@@ -0,0 +1,37 @@
+import json
+import os
+
+import catalog_years
+from catalog_years import CatalogYears, years_file
+from course_store import DATA_DIR, CourseStore, open_store
+
+
+def snapshot(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_years_file_follows_the_store(tmp_path, monkeypatch):
+    assert years_file(CourseStore(":memory:")) is None
+    db = str(tmp_path / "courses.sqlite")
+    monkeypatch.setattr(catalog_years, "DEFAULT_DB", db)
+    with CourseStore(db, data_dir=str(tmp_path)) as store:
+        assert years_file(store) == str(tmp_path / "catalog_years.json")
+
+
+def test_save_with_another_db_leaves_the_data_file_alone(tmp_path):
+    repo_file = os.path.join(DATA_DIR, "catalog_years.json")
+    before = snapshot(repo_file)
+    db = str(tmp_path / "courses.sqlite")
+    catalog_years.main(["--db", db, "save", "2025-2026"])
+    assert snapshot(repo_file) == before
+    with open_store(db) as store:
+        assert CatalogYears(store).years() == ["2025-2026"]
+
+
+def test_years_file_option(tmp_path):
+    db, path = str(tmp_path / "courses.sqlite"), tmp_path / "years.json"
+    catalog_years.main(["--db", db, "--years-file", str(path), "save", "2025-2026"])
+    assert list(json.loads(path.read_text())) == ["2025-2026"]
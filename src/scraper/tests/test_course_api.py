@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from course_api import CourseService, HttpError
+from prereq_compiler import compile_prerequisites
+
+
+def course(code, prereqs="", credits=3):
+    return {"code": code, "title": code, "credits": credits, "prereqs": prereqs,
+            "prereq_tree": compile_prerequisites(prereqs)}
+
+
+@pytest.fixture
+def service():
+    return CourseService({entry['code']: entry for entry in [
+        course("MATH 151"),
+        course("MATH 152", "Grade of C or better in MATH 151 or equivalents"),
+        course("CHEM 107", "Concurrent enrollment in CHEM 117"),
+        course("CHEM 117", "Concurrent enrollment in CHEM 107"),
+        course("CSCE 221", "Grade C or better in CSCE 120 or CSCE 121; grade of C or better in CSCE 222/ECEN 222 "
+                           "or ECEN 222/CSCE 222, or concurrent enrollment"),
+        course("CSCE 481", "Senior classification or approval of instructor"),
+    ]})
+
+
+def eligibility(service, transcript, codes):
+    status, result = service.handle("POST", "/eligibility", json.dumps({"transcript": transcript, "courses": codes}))
+    assert status == 200
+    return result
+
+
+def test_empty_transcript_is_not_eligible_for_math_152(service):
+    assert eligibility(service, {}, ["MATH 152"]) == {
+        "MATH 152": {"eligible": False, "status": "unmet", "missing": ["MATH 151"]}}
+    assert eligibility(service, {"completed": {"MATH 151": "F"}}, ["MATH 152"])["MATH 152"]["eligible"] is False
+    assert eligibility(service, {"completed": ["MATH 151"]}, ["MATH 152"])["MATH 152"]["eligible"] is True
+
+
+def test_missing_lists_only_unmet_requirements(service):
+    result = eligibility(service, {"completed": ["CSCE 121"]}, ["CSCE 221"])
+    assert result["CSCE 221"]["missing"] == ["CSCE 222", "ECEN 222"]
+
+
+def test_concurrent_enrollment(service):
+    assert eligibility(service, {}, ["CHEM 107"])["CHEM 107"]["eligible"] is False
+    assert eligibility(service, {"enrolled": ["CHEM 117"]}, ["CHEM 107"])["CHEM 107"]["eligible"] is True
+
+
+def test_review_is_eligible_unless_strict(service):
+    assert eligibility(service, {}, ["CSCE 481"])["CSCE 481"] == {"eligible": True, "status": "review"}
+    assert eligibility(service, {"strict": True}, ["CSCE 481"])["CSCE 481"]["eligible"] is False
+
+
+@pytest.mark.parametrize("transcript", [
+    {"completed": "MATH 151"},
+    {"completed": [151]},
+    {"completed": {"MATH 151": 4}},
+    {"classification": 3},
+    {"classification": "graduate"},
+    {"placements": "math"},
+    {"enrolled": "CHEM 117"},
+    {"strict": "yes"},
+])
+def test_invalid_transcripts_are_rejected(service, transcript):
+    with pytest.raises(HttpError) as error:
+        service.handle("POST", "/eligibility", json.dumps({"transcript": transcript, "courses": ["MATH 152"]}))
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize("body", [
+    '{"transcript": {}, "courses": [["MATH 152"]]}',
+    '{"transcript": {}, "courses": [152]}',
+    '{"transcript": {}, "courses": "MATH 152"}',
+    '{"transcript": {}}',
+    '["MATH 152"]',
+    '{"transcript": {}, "courses": [',
+])
+def test_malformed_request_bodies_are_rejected(service, body):
+    with pytest.raises(HttpError) as error:
+        service.handle("POST", "/eligibility", body)
+    assert error.value.status == 400
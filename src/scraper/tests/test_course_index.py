@@ -0,0 +1,21 @@
+import pytest
+import requests
+
+from bench_suite import DEFAULT_FIXTURES, load_fixtures
+from course_index import DepartmentIndex, department_url
+from http_client import HttpClient
+from standin_server import StandInCatalog
+
+
+def test_failed_department_is_retried_on_the_next_lookup():
+    pages = load_fixtures(DEFAULT_FIXTURES)
+    with StandInCatalog({}) as catalog:
+        index = DepartmentIndex(catalog.url, client=HttpClient(retries=0))
+        with pytest.raises(requests.HTTPError):
+            index.lookup("CSCE 221")
+        assert "CSCE" not in index.loaded and "CSCE" in index.errors
+
+        path = department_url("CSCE", "")
+        catalog.pages[path] = pages[path]
+        assert index.lookup("CSCE 221")['title']
+        assert "CSCE" in index.loaded and "CSCE" not in index.errors
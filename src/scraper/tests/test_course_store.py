@@ -0,0 +1,19 @@
+import pytest
+
+import course_store
+from course_store import CourseStore
+
+
+def test_export_check_on_a_new_store_compares_the_data_files(tmp_path, capsys):
+    course_store.main(["--db", str(tmp_path / "courses.sqlite"), "export", "--check"])
+    with CourseStore(str(tmp_path / "courses.sqlite")) as store:
+        exports = store.exports()
+    assert exports
+    assert capsys.readouterr().out.strip() == f"All {len(exports)} exports are up to date"
+
+
+def test_export_check_fails_without_programs(tmp_path, monkeypatch):
+    monkeypatch.setattr(course_store, "open_store", lambda path: CourseStore(path, str(tmp_path)))
+    with pytest.raises(SystemExit) as exit:
+        course_store.main(["--db", str(tmp_path / "courses.sqlite"), "export", "--check"])
+    assert "no programs" in str(exit.value.code)
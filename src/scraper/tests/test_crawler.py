@@ -0,0 +1,33 @@
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+from bench_suite import DEFAULT_FIXTURES, PROGRAM_PAGES, load_fixtures
+from standin_server import StandInCatalog
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_failed_page_does_not_stop_the_crawl(tmp_path):
+    # A scratch copy, so the run writes its data files under tmp_path
+    work_dir = tmp_path / "scraper"
+    work_dir.mkdir()
+    (tmp_path / "data").mkdir()
+    for source in glob.glob(os.path.join(SCRAPER_DIR, "*.py")):
+        shutil.copy(source, work_dir)
+
+    with StandInCatalog(load_fixtures(DEFAULT_FIXTURES)) as catalog:
+        urls = [catalog.url + path for path in PROGRAM_PAGES.values()]
+        missing = catalog.url + "/undergraduate/engineering/missing-bs/"  # answered 404
+        run = subprocess.run([sys.executable, "crawler.py", urls[0], missing, urls[1], "--catalog-url", catalog.url,
+                              "--no-cache", "--rate", "0", "--retries", "0", "--processes", "1"],
+                             cwd=work_dir, capture_output=True, text=True)
+
+    assert run.returncode == 1
+    assert "1 programs were not written" in run.stderr and f"{missing}: HTTPError: 404" in run.stderr
+    assert "Scraped 2 of 3 programs" in run.stdout
+    assert sorted(os.listdir(tmp_path / "data" / "programs")) == [
+        "computer-science_computer-engineering-bs.json",
+        "mathematics_minor.json"]
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from course_store import open_store
+from data_bundle import load_program, write_bundle
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    with open_store(str(tmp_path_factory.mktemp("store") / "courses.sqlite")) as store:
+        yield store
+
+
+def test_refuses_a_directory_without_a_bundle(store, tmp_path):
+    (tmp_path / "notes.txt").write_text("keep me")
+    with pytest.raises(ValueError):
+        write_bundle(store, str(tmp_path))
+    assert (tmp_path / "notes.txt").read_text() == "keep me"
+
+
+def test_rewrite_removes_only_old_shards(store, tmp_path):
+    output = tmp_path / "bundle"
+    write_bundle(store, str(output))
+    manifest = json.loads((output / "manifest.json").read_text())
+    manifest['programs'].append({**manifest['programs'][0], "export": "old.json", "shard": "programs/old.json"})
+    (output / "manifest.json").write_text(json.dumps(manifest))
+    (output / "programs" / "old.json").write_text("{}")
+    (output / "notes.txt").write_text("keep me")
+
+    write_bundle(store, str(output))
+    assert not (output / "programs" / "old.json").exists()
+    assert (output / "notes.txt").exists()
+    export = store.exports()[0]
+    assert load_program(str(output), export) == store.export_data(export)
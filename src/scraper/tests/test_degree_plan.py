@@ -0,0 +1,65 @@
+import io
+
+from degree_plan import Planner, parse_completed, plan_all, read_transcripts, term_name
+from prereq_compiler import compile_prerequisites
+
+
+def requirement(code, term, prereqs=""):
+    return {"label": code, "hours": 3, "term": term,
+            "options": [{"code": code, "credits": 3, "tree": compile_prerequisites(prereqs), "course": True}]}
+
+
+PROGRAM = {
+    "export": "test.json", "name": "Test Program", "credits": {},
+    "requirements": [
+        requirement("MATH 151", 0),
+        requirement("ENGR 102", 0, "Grade of C or better in MATH 151 or MATH 150, or concurrent enrollment"),
+        requirement("MATH 152", 1, "Grade of C or better in MATH 151 or equivalents"),
+        requirement("CSCE 120", 1, "Grade of C or better in ENGR 102 or CSCE 110"),
+    ],
+}
+
+
+def semesters(plan):
+    return {course['course']: semester['term'] for semester in plan['semesters'] for course in semester['courses']}
+
+
+def test_failed_course_is_planned_again():
+    plan = Planner(PROGRAM).plan({"id": "s1", "completed": parse_completed("MATH 151:F")})
+    assert "unscheduled" not in plan
+    assert semesters(plan) == {"MATH 151": term_name(0), "ENGR 102": term_name(0),
+                               "MATH 152": term_name(1), "CSCE 120": term_name(1)}
+    assert plan['hours'] == 12
+
+
+def test_passed_course_is_not_planned_again():
+    plan = Planner(PROGRAM).plan({"id": "s2", "completed": parse_completed("MATH 151:B")})
+    assert "MATH 151" not in semesters(plan)
+    assert plan['hours'] == 9
+
+
+def test_prerequisite_with_failing_grade_is_unmet():
+    program = {**PROGRAM, "requirements": PROGRAM['requirements'][2:3]}
+    plan = Planner(program).plan({"id": "s3", "completed": {"MATH 151": "W"}})
+    assert plan['unscheduled'] == ["MATH 152"]
+
+
+def test_bad_transcripts_get_error_records_and_the_batch_goes_on():
+    lines = io.StringIO('{"id": "a", "completed": ["MATH 151"]}\n'
+                        '{"id": "b", "completed": \n'
+                        '{"id": "c", "completed": "MATH 151"}\n'
+                        '{"id": "d", "completed": [["MATH 151"]]}\n'
+                        '[1, 2]\n'
+                        '{"id": "f", "completed": {"MATH 151": "A"}}\n')
+    plans = list(plan_all(read_transcripts(lines, 'ndjson'), PROGRAM, 1))
+    assert [plan['id'] for plan in plans] == ["a", "2", "c", "d", "5", "f"]
+    assert [("error" in plan) for plan in plans] == [False, True, True, True, True, False]
+    assert plans[1]['error'].startswith("line 2: JSONDecodeError")
+    assert "not str" in plans[2]['error']
+    assert "MATH 151" not in semesters(plans[5])
+
+
+def test_unreadable_csv_row_is_an_error_record():
+    rows = io.StringIO("id,completed,placements,max_hours\ns1,MATH 151:A,,12\ns2,,,lots\ns3,,,\n")
+    plans = list(plan_all(read_transcripts(rows, 'csv'), PROGRAM, 1))
+    assert [("error" in plan) for plan in plans] == [False, True, False]
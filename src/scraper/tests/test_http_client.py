@@ -0,0 +1,17 @@
+import pytest
+import requests
+
+from http_client import HttpClient
+from standin_server import StandInCatalog
+
+
+def test_error_statuses_raise_and_304_is_returned():
+    client = HttpClient(retries=0)
+    with StandInCatalog({"/page/": "<html>page</html>"}) as catalog:
+        response = client.get(catalog.url + "/page/")
+        assert response.status_code == 200
+        assert client.get(catalog.url + "/page/", {"If-None-Match": response.headers['ETag']}).status_code == 304
+        with pytest.raises(requests.HTTPError) as error:
+            client.get(catalog.url + "/missing/")
+    assert error.value.response.status_code == 404
+    assert client.requests == 3
@@ -0,0 +1,45 @@
+import io
+import json
+
+import metrics
+from catalog import run_jobs
+from metrics import METRICS, Metrics
+
+
+class FailingScraper:
+    def fetch_course(self, code):
+        METRICS.request(f"https://example.test/{code}", 200, 0.0, 0.01, 100)
+        raise LookupError(code)
+
+
+def test_request_log_is_bounded(monkeypatch):
+    monkeypatch.setattr(metrics, "MAX_LOGGED_REQUESTS", 5)
+    recorder = Metrics()
+    for number in range(12):
+        recorder.request(f"https://example.test/{number}", 200 if number % 2 else 404, 0.0, 0.5, 10)
+    report = recorder.report()
+    assert (report['requests']['count'], report['requests']['bytes'], report['requests']['logged']) == (12, 120, 5)
+    assert report['requests']['by_status'] == {"200": 6, "404": 6}
+    assert report['requests']['latency']['total'] == 6.0
+    assert [entry['url'].rsplit("/", 1)[1] for entry in report['request_log']] == ["7", "8", "9", "10", "11"]
+
+
+def test_reset_forgets_requests_but_keeps_tracing():
+    recorder = Metrics()
+    recorder.enable_trace()
+    recorder.request("https://example.test/a", 200, 0.0, 0.1, 10)
+    recorder.count("retries")
+    recorder.reset()
+    report = recorder.report()
+    assert report['requests']['count'] == 0
+    assert report['counters'] == {}
+    assert recorder.events is not None and len(recorder.events) == 0
+
+
+def test_worker_jobs_report_their_own_metrics():
+    output = io.StringIO()
+    lines = [json.dumps({"id": number, "course": "CSCE 221"}) for number in range(3)]
+    assert run_jobs(FailingScraper(), lines, output) == 3
+    answers = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [answer['metrics']['requests'] for answer in answers] == [1, 1, 1]
+    assert METRICS.report()['requests']['count'] == 1
@@ -0,0 +1,45 @@
+from prereq_compiler import MET, REVIEW, UNMET, compile_prerequisites, evaluate, grade_passes
+
+MATH_152 = compile_prerequisites("Grade of C or better in MATH 151 or equivalents")
+CHEM_107 = compile_prerequisites("Concurrent enrollment in CHEM 117; grade of C or better in MATH 150, or equivalent, "
+                                 "or acceptable score on Texas A&M University math placement exams")
+ENGR_102 = compile_prerequisites("Grade of C or better in MATH 151 or MATH 150, or concurrent enrollment; "
+                                 "admission to the college of engineering")
+
+
+def test_or_equivalent_needs_the_course():
+    assert evaluate(MATH_152, {}) == UNMET
+    assert evaluate(MATH_152, {"MATH 151": "B"}) == MET
+
+
+def test_or_equivalent_placement_alternative_still_counts():
+    assert evaluate(CHEM_107, {}, enrolled={"CHEM 117"}) == UNMET
+    assert evaluate(CHEM_107, {}, enrolled={"CHEM 117"}, placements={"math"}) == MET
+
+
+def test_failing_and_non_credit_grades_do_not_complete():
+    for grade in ["F", "W", "Q", "U", "I", "NG"]:
+        assert evaluate(MATH_152, {"MATH 151": grade}) == UNMET, grade
+    assert evaluate(compile_prerequisites("MATH 151"), {"MATH 151": "F"}) == UNMET
+
+
+def test_minimum_grade():
+    assert evaluate(MATH_152, {"MATH 151": "D"}) == UNMET
+    assert evaluate(MATH_152, {"MATH 151": "C+"}) == MET
+    assert evaluate(MATH_152, ["MATH 151"]) == MET
+
+
+def test_unchecked_requirement_needs_review():
+    assert evaluate(ENGR_102, {"MATH 151": "A"}) == REVIEW
+    assert evaluate(ENGR_102, {}) == UNMET
+    assert evaluate(compile_prerequisites("Approval of instructor"), {}) == REVIEW
+    assert evaluate(compile_prerequisites("Junior classification or approval of instructor"), {}) == REVIEW
+
+
+def test_grade_passes():
+    assert grade_passes(None, "C")
+    assert grade_passes("S", "C")
+    assert grade_passes("b-", "C")
+    assert not grade_passes("F")
+    assert not grade_passes("W")
+    assert not grade_passes("D", "C")
@@ -0,0 +1,40 @@
+import json
+
+from prereq_compiler import compile_prerequisites
+from prereq_graph import PrereqGraph, build_graph, course_clauses, course_requirements
+
+CSCE_221 = ("Grade C or better in CSCE 120 or CSCE 121; grade of C or better in CSCE 222/ECEN 222 or "
+            "ECEN 222/CSCE 222, or concurrent enrollment")
+
+
+def test_course_clauses():
+    assert course_clauses(compile_prerequisites(CSCE_221)) == [["CSCE 120", "CSCE 121"], ["CSCE 222", "ECEN 222"]]
+    assert course_clauses(compile_prerequisites("MATH 151 or equivalents")) == [["MATH 151"]]
+    assert course_clauses(compile_prerequisites("MATH 150 or acceptable score on math placement exam")) == []
+    assert course_clauses(compile_prerequisites("MATH 151 and MATH 152 or MATH 171")) == [
+        ["MATH 151", "MATH 171"], ["MATH 152", "MATH 171"]]
+
+
+def graph(tmp_path):
+    courses = [
+        {"course": "CSCE 120", "prereqs": "ENGR 102 or CSCE 110"},
+        {"course": "CSCE 221", "prereqs": CSCE_221},
+        {"course": "University Core Curriculum", "prereqs": ""},
+        {"course": "Senior Design", "prereqs": ""},
+    ]
+    path = tmp_path / "courses.json"
+    path.write_text(json.dumps({"Test Program": courses}))
+    return PrereqGraph(build_graph(course_requirements([str(path)])))
+
+
+def test_only_course_codes_become_nodes(tmp_path):
+    assert "University Core Curriculum" not in graph(tmp_path).courses
+    assert "Senior Design" not in graph(tmp_path).courses
+
+
+def test_reachable_with_one_alternative_per_clause(tmp_path):
+    prereqs = graph(tmp_path)
+    assert prereqs.is_reachable("CSCE 221", prereqs.mask(["CSCE 120", "ECEN 222"]))
+    missing = prereqs.missing_prerequisites("CSCE 221", prereqs.mask(["CSCE 121"]))
+    assert [prereqs.codes(clause) for clause in missing] == [["CSCE 222", "ECEN 222"]]
+    assert not prereqs.is_reachable("CSCE 221", prereqs.mask(["CSCE 121"]))
@@ -0,0 +1,30 @@
+import os
+
+import search_index
+from course_store import CourseStore
+from search_index import INDEX_FILE, SearchIndex, index_file, write_index
+
+
+def snapshot(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_index_file_follows_the_store(tmp_path, monkeypatch):
+    db = str(tmp_path / "courses.sqlite")
+    assert index_file(CourseStore(":memory:")) is None
+    monkeypatch.setattr(search_index, "DEFAULT_DB", db)
+    with CourseStore(db) as store:
+        assert index_file(store) == INDEX_FILE
+
+
+def test_another_store_leaves_the_repo_index_alone(tmp_path):
+    before = snapshot(INDEX_FILE)
+    with CourseStore(str(tmp_path / "courses.sqlite")) as store:
+        assert write_index(store) is False
+        path = str(tmp_path / "index.json")
+        assert write_index(store, path) is True
+    assert snapshot(INDEX_FILE) == before
+    assert SearchIndex.load(path).codes == []